@@ -1,5 +1,20 @@
 from typing import Generator
-from fastapi import Depends
+from fastapi import Depends, HTTPException
 from sqlalchemy.orm import Session
+from app import models
 from app.core.database import get_db
 from app.api.auth_deps import get_current_user, reusable_oauth2
+from app.services.quota_service import quota_service, QuotaExceeded
+
+def enforce_quota(user: models.User, action: models.ActionType, units: int = 1) -> None:
+    """
+    Admission check before an operation that calls the Places API: 429 when the tenant is over quota.
+    """
+    try:
+        quota_service.admit(user.tenant, action, units)
+    except QuotaExceeded as e:
+        raise HTTPException(
+            status_code=429,
+            detail=f"API kullanım limitine ulaşıldı ({e.window}). Lütfen {e.retry_after} saniye sonra tekrar deneyin.",
+            headers={"Retry-After": str(e.retry_after)}
+        )
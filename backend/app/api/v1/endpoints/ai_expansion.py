@@ -1,10 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List, Any, Dict
+from typing import List, Any, Dict, Optional
 from app import schemas, models
 from app.api import deps, auth_deps
+from app.models.user import UserRole
 from app.services.ai_expansion_service import seo_audit_service, competitor_service
 from app.services.description_service import ai_description_service
+from app.services.places_limiter import PlacesUnavailable
+from app.services.google_maps import google_maps_service
+from app.services.quota_service import quota_service
 from uuid import UUID
 
 router = APIRouter()
@@ -48,10 +52,18 @@ def discover_competitors(
     
     if not business:
         raise HTTPException(status_code=404, detail="Business not found")
+
+    # Details and the nearby search are often served from the place store and the
+    # spatial index: only the calls that reached the Places API are charged
+    deps.enforce_quota(current_user, models.ActionType.DISCOVERY, 0)
         
     try:
-        competitors = competitor_service.discover_and_track_competitors(db, business)
+        with google_maps_service.count_calls() as calls:
+            competitors = competitor_service.discover_and_track_competitors(db, business)
+        quota_service.charge(current_user.tenant, models.ActionType.DISCOVERY, calls.count)
         return competitors
+    except PlacesUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -133,13 +145,57 @@ def get_competitor_strategy_analysis(
 def get_industry_benchmarks(
     category: str,
     location: str,
+    rating: Optional[float] = None,
+    review_count: Optional[int] = None,
+    score: Optional[float] = None,
+    db: Session = Depends(deps.get_db),
     current_user: models.User = Depends(auth_deps.get_current_user)
 ) -> Any:
     """
-    Get city/industry wide benchmarks.
+    Get city/industry wide benchmarks (from the latest market sweep of the city).
+    rating / review_count / score: also rank these values within the location's distribution.
     """
     from app.services.competitor_intel_service import competitor_intelligence_service
-    return competitor_intelligence_service.get_benchmarks(category, location)
+    values = {"rating": rating, "reviews": review_count, "score": score}
+    return competitor_intelligence_service.get_benchmarks(db, category, location, values=values if any(v is not None for v in values.values()) else None)
+
+@router.post("/market-sweeps", response_model=schemas.MarketSweepOutput)
+def create_market_sweep(
+    sweep_in: schemas.MarketSweepCreate,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(auth_deps.get_current_user)
+) -> Any:
+    """
+    Starts a city-wide market sweep (admin only). Benchmarks are published when it finishes.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    from app.services.market_sweep_service import market_sweep_service
+    from app.workers.market import run_market_sweep
+    sweep = market_sweep_service.create_sweep(
+        db, sweep_in.city, sweep_in.center_lat, sweep_in.center_lng, sweep_in.radius_km,
+        types=sweep_in.types, cell_meters=sweep_in.cell_meters
+    )
+    run_market_sweep.delay(str(sweep.id))
+    return sweep
+
+@router.get("/market-sweeps/{sweep_id}", response_model=schemas.MarketSweepOutput)
+def get_market_sweep(
+    sweep_id: UUID,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(auth_deps.get_current_user)
+) -> Any:
+    """
+    Progress of a market sweep (admin only).
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    sweep = db.get(models.MarketSweep, sweep_id)
+    if not sweep:
+        raise HTTPException(status_code=404, detail="Market sweep not found")
+    return sweep
 
 @router.post("/generate-response", response_model=schemas.ReplyDraftResponse)
 def generate_review_response(
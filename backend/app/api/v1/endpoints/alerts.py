@@ -1,24 +1,100 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Tuple
 from app import schemas, models
 from app.api import deps, auth_deps
+from app.core.config import settings
+from app.core.conditional import make_etag, validators, not_modified
+from app.core.redis import get_async_redis
+from app.core.responses import ORJSONResponse, encode
+from app.db.session import SessionLocal
+from app.services.alert_service import alert_service, alert_channel
 from uuid import UUID
 
 router = APIRouter()
 
-@router.get("", response_model=List[schemas.Alert])
+@router.get("", response_model=List[schemas.Alert], response_class=ORJSONResponse)
 def list_alerts(
+    request: Request,
     db: Session = Depends(deps.get_db),
     current_user: schemas.User = Depends(auth_deps.get_current_user)
 ):
     """
     List all alerts for businesses owned by the tenant.
     """
+    # Alerts are appended and only their is_read flag changes: count, latest date and unread count version the list
+    count, last_created, unread = db.query(
+        func.count(models.Alert.id),
+        func.max(models.Alert.created_at),
+        func.count(models.Alert.id).filter(models.Alert.is_read == False)
+    ).join(models.Business).filter(
+        models.Business.tenant_id == current_user.tenant_id
+    ).one()
+    headers = validators(make_etag(current_user.tenant_id, count, last_created, unread))
+    if not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+
     alerts = db.query(models.Alert).join(models.Business).filter(
         models.Business.tenant_id == current_user.tenant_id
     ).order_by(models.Alert.created_at.desc()).all()
-    return alerts
+    return ORJSONResponse(encode(List[schemas.Alert], alerts, "alert_list"), headers=headers)
+
+@router.get("/unread-count")
+def get_unread_count(
+    db: Session = Depends(deps.get_db),
+    current_user: schemas.User = Depends(auth_deps.get_current_user)
+):
+    """
+    Number of unread alerts of the tenant (partial index, no alert rows are read).
+    """
+    return {"unread_count": alert_service.unread_count(db, current_user.tenant_id)}
+
+def _open_stream(token: str) -> Tuple[UUID, int]:
+    # Short-lived session: the stream must not hold a database connection while it is open
+    db = SessionLocal()
+    try:
+        user = auth_deps.get_current_user(db=db, token=token)
+        return user.tenant_id, alert_service.unread_count(db, user.tenant_id)
+    finally:
+        db.close()
+
+def _event(name: str, data: dict) -> bytes:
+    return f"event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode()
+
+@router.get("/stream")
+async def stream_alerts(request: Request, token: str = Depends(auth_deps.reusable_oauth2)):
+    """
+    Server-Sent Events of the tenant: "unread" with the unread count (on connect and when
+    alerts are read) and "alert" for every new alert. Runs on the event loop, so open
+    streams take no threadpool slot or database connection.
+    """
+    tenant_id, unread_count = await run_in_threadpool(_open_stream, token)
+
+    async def events():
+        pubsub = get_async_redis().pubsub()
+        await pubsub.subscribe(alert_channel(tenant_id))
+        try:
+            yield _event("unread", {"unread_count": unread_count})
+            while not await request.is_disconnected():
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=settings.ALERT_STREAM_HEARTBEAT_SECONDS)
+                if message is None:
+                    # Keeps proxies from closing an idle stream
+                    yield b": keep-alive\n\n"
+                    continue
+                event = json.loads(message["data"])
+                yield _event(event.pop("type"), event)
+        finally:
+            # Closing the connection drops the subscription
+            await pubsub.aclose()
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
 
 @router.post("/{alert_id}/read")
 def mark_alert_as_read(
@@ -35,4 +111,5 @@ def mark_alert_as_read(
     
     alert.is_read = True
     db.commit()
+    alert_service.publish_unread_count(db, current_user.tenant_id)
     return {"message": "Success"}
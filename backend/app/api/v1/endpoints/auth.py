@@ -1,3 +1,4 @@
+import logging
 from datetime import timedelta
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException
@@ -11,6 +12,8 @@ from app.core.config import settings
 from app.services.user_service import UserService
 from app.core.database import get_db
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 @router.post("/login/access-token", response_model=schemas.Token)
@@ -35,7 +38,7 @@ def register(
     db: Session = Depends(get_db),
     user_in: schemas.UserCreate,
 ) -> Any:
-    print(f"DEBUG: Registering user {user_in.email} | Password length: {len(user_in.password)}")
+    logger.info(f"Registering user {user_in.email}")
     user = UserService().get_by_email(db, email=user_in.email)
     if user:
         raise HTTPException(
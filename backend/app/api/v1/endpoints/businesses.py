@@ -1,16 +1,34 @@
 import logging
 import traceback
-from typing import List, Any
+from typing import List, Any, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from uuid import UUID
 from app import schemas, models
 from app.api import deps, auth_deps
+from app.core.config import settings
+from app.core.conditional import make_etag, content_etag, validators, not_modified, newest
+from app.core.responses import ORJSONResponse, encode
+from app.services.serialized_cache import serialized_cache
 from app.services.google_maps import google_maps_service
 from app.services.ranking_engine import ranking_engine
+from app.services.review_service import review_service
+from app.services.metrics_service import metrics_service
+from app.services.place_store import place_store
+from app.services.market_sweep_service import market_sweep_service
+from app.services.places_limiter import PlacesUnavailable
+from app.services.quota_service import quota_service
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+def _parse_sections(sections: Optional[str]) -> frozenset:
+    try:
+        return ranking_engine.parse_sections(sections)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/search", response_model=List[schemas.BusinessSearchResult])
 def search_businesses(
@@ -22,19 +40,22 @@ def search_businesses(
     """
     Search businesses via Google Maps API.
     """
-    results = google_maps_service.search_business(query, location)
-    if not results:
+    deps.enforce_quota(current_user, models.ActionType.SEARCH)
+    places = google_maps_service.search_business(query, location)
+    if not places:
         return []
     
     # Calculate initial scores for search results just for preview
-    for result in results:
+    results = []
+    for place in places:
+        result = place.to_dict()
         try:
             # Map search result fields to the names expected by calculation engine
             compat_data = {
-                "rating": result.get("rating", 0.0),
-                "user_ratings_total": result.get("user_ratings_total", 0),
-                "formatted_address": result.get("address"), # Map engine expects formatted_address
-                "geometry": {"location": result.get("geometry")}
+                "rating": place.rating,
+                "user_ratings_total": place.user_ratings_total,
+                "formatted_address": place.address, # Map engine expects formatted_address
+                "geometry": {"location": place.location}
             }
             adv_metrics = ranking_engine.calculate_advanced_metrics(compat_data)
             result["maprank_score"] = ranking_engine.calculate_score(compat_data, adv_metrics)
@@ -42,25 +63,30 @@ def search_businesses(
             import logging
             logging.error(f"Error calculating score for search result: {str(e)}")
             result["maprank_score"] = 0.0
+        results.append(result)
         
     return results
 
-@router.get("/analyze", response_model=schemas.BusinessAnalysis)
+@router.get("/analyze", response_model=schemas.BusinessAnalysis, response_class=ORJSONResponse)
 def analyze_business_endpoint(
     place_id: str = Query(..., description="The Google Place ID to analyze"),
+    sections: Optional[str] = Query(None, description="Comma-separated analysis sections (score, profile, recommendations, competitors, sentiment, benchmarks, growth); all by default"),
     db: Session = Depends(deps.get_db),
     current_user: schemas.User = Depends(auth_deps.get_current_user)
 ) -> Any:
     """
     Get detailed analysis for a specific business.
     """
+    selected = _parse_sections(sections)
+    deps.enforce_quota(current_user, models.ActionType.ANALYZE)
     try:
         # User requested: no magic cleaning, just the full data
         # Let Google handle the placeID exactly as it comes
         logging.info(f"ANALYSIS REQUEST: User {current_user.email} -> PlaceID: {place_id}")
 
         # 1. Fetch detailed data from Google Maps
-        details = google_maps_service.get_place_details(place_id)
+        # Newest reviews: the payload feeds the review corpus and moves its high-water mark
+        details = google_maps_service.get_place_details(place_id, reviews_sort="newest")
         
         if not details:
             logging.error(f"GOOGLE DATA ERROR: Could not find details for {place_id}")
@@ -75,8 +101,23 @@ def analyze_business_endpoint(
         
         is_my_business = exists.is_my_business if exists else False
         
-        # 3. Run Analysis with contextual perspective
-        analysis = ranking_engine.analyze_business(details, is_my_business=is_my_business)
+        # 3. Feed the review corpus from the details we already have, then read its aggregates
+        review_service.ingest_from_details(db, place_id, details)
+        review_stats = review_service.get_review_stats(db, place_id)
+        
+        # 4. Run Analysis with contextual perspective
+        with google_maps_service.count_calls() as calls:
+            analysis = ranking_engine.analyze_business(
+                details,
+                is_my_business=is_my_business,
+                review_stats=review_stats,
+                series_deltas=metrics_service.get_deltas(db, place_id),
+                sector_benchmarks=market_sweep_service.sector_benchmarks(db, details) if "benchmarks" in selected else None,
+                sections=selected
+            )
+        # The Details call was admitted upfront; the competitor search costs a call
+        # unless the spatial index answered it
+        quota_service.charge(current_user.tenant, models.ActionType.ANALYZE, calls.count)
         
         if exists:
             analysis["is_tracked"] = True
@@ -85,34 +126,58 @@ def analyze_business_endpoint(
             analysis["is_tracked"] = False
             analysis["is_my_business"] = False
         
-        return analysis
-    except HTTPException as e:
-        raise e
+        return ORJSONResponse(encode(schemas.BusinessAnalysis, analysis, "analysis"))
+    except (HTTPException, PlacesUnavailable):
+        raise
     except Exception as e:
         error_trace = traceback.format_exc()
         logging.error(f"Analysis Endpoint Error: {str(e)}")
         logging.error(error_trace)
         raise HTTPException(status_code=500, detail=f"Analysis engine error: {str(e)}")
 
-@router.get("/public-report", response_model=schemas.BusinessAnalysis)
+@router.get("/public-report", response_model=schemas.BusinessAnalysis, response_class=ORJSONResponse)
 def get_public_report(
     place_id: str,
+    request: Request,
+    sections: Optional[str] = Query(None, description="Comma-separated analysis sections; all by default"),
     db: Session = Depends(deps.get_db)
 ) -> Any:
     """
     Get public detailed analysis for a specific business (No Auth Required for sharing).
+    A report is computed once per PUBLIC_REPORT_CACHE_SECONDS and may be cached by shared
+    caches/CDNs for as long, so a widely shared link costs one analysis per window.
     """
+    selected = _parse_sections(sections)
     if ":" in place_id:
         place_id = place_id.split(":")[0]
 
-    details = google_maps_service.get_place_details(place_id)
-    if not details:
+    def load(keys: list) -> dict:
+        details = google_maps_service.get_place_details(place_id, reviews_sort="newest")
+        if not details:
+            return {}
+        review_service.ingest_from_details(db, place_id, details)
+        analysis = ranking_engine.analyze_business(
+            details,
+            review_stats=review_service.get_review_stats(db, place_id),
+            series_deltas=metrics_service.get_deltas(db, place_id),
+            sector_benchmarks=market_sweep_service.sector_benchmarks(db, details) if "benchmarks" in selected else None,
+            sections=selected
+        )
+        analysis["is_tracked"] = False # Public view doesn't imply tracking status
+        return {keys[0]: analysis}
+
+    key = f"{place_id}:{','.join(sorted(selected))}"
+    bodies = serialized_cache.get_many(schemas.BusinessAnalysis, "public_report", [key], load, ttl=settings.PUBLIC_REPORT_CACHE_SECONDS)
+    if not bodies:
         raise HTTPException(status_code=404, detail="Business details not found")
-        
-    analysis = ranking_engine.analyze_business(details)
-    analysis["is_tracked"] = False # Public view doesn't imply tracking status
-    
-    return analysis
+
+    headers = validators(
+        content_etag(bodies[0]),
+        cache_control=f"public, max-age=60, s-maxage={settings.PUBLIC_REPORT_CACHE_SECONDS}, stale-while-revalidate=600"
+    )
+    if not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+    return ORJSONResponse(bodies[0], headers=headers)
 
 @router.post("", response_model=schemas.Business)
 def create_business(
@@ -123,10 +188,9 @@ def create_business(
     """
     Create/Save a business to the user's tenant.
     """
-    print(f"DEBUG: User {current_user.email} (Role: {current_user.role}, Tenant: {current_user.tenant_id}) attempting to add business {business_in.google_place_id}")
+    logger.info(f"User {current_user.email} (Role: {current_user.role}, Tenant: {current_user.tenant_id}) adding business {business_in.google_place_id}")
     
     if current_user.role != "OWNER":
-        print(f"DEBUG: Access denied. User is {current_user.role}, not OWNER")
         raise HTTPException(status_code=400, detail=f"Only owners can add businesses. Your role: {current_user.role}")
 
     # Check if business already exists for this tenant
@@ -136,29 +200,25 @@ def create_business(
     ).first()
     
     if existing_business:
-        print("DEBUG: Business already exists for this tenant.")
         raise HTTPException(status_code=400, detail="Business already exists in this tenant")
         
-    # Fetch details to populate fields
-    print(f"DEBUG: Fetching details for {business_in.google_place_id}")
-    details = google_maps_service.get_place_details(business_in.google_place_id)
+    # Fetch details to populate fields; this also stores the canonical place the business references
+    details = place_store.fetch(db, business_in.google_place_id)
     if not details:
-        print("DEBUG: Google Maps details not found.")
+        logger.warning(f"Google Maps details not found for {business_in.google_place_id}")
         raise HTTPException(status_code=404, detail="Business not found on Google Maps")
         
-    # Run initial analysis to get score/ranking
-    print("DEBUG: Running analysis...")
-    analysis = ranking_engine.analyze_business(details)
+    # Run initial analysis to get score/ranking (the first Ranking stores rank and competitors)
+    analysis = ranking_engine.analyze_business(details, sections={"score", "competitors"})
     
     try:
         # Create Business instance
-        print("DEBUG: Creating Business instance...")
         db_business = models.Business(
             google_place_id=business_in.google_place_id,
             name=details.get("name", business_in.name),
             address=details.get("formatted_address"),
-            total_rating=business_in.total_rating,
-            review_count=business_in.review_count,
+            total_rating=details.get("rating", business_in.total_rating),
+            review_count=details.get("user_ratings_total", business_in.review_count),
             is_my_business=business_in.is_my_business,
             tenant_id=current_user.tenant_id,
         )
@@ -166,7 +226,6 @@ def create_business(
         db.flush() # Flush to get ID
         
         # Create initial Ranking snapshot
-        print("DEBUG: Creating Ranking instance...")
         db_ranking = models.Ranking(
             business_id=db_business.id,
             rank_position=analysis.get("metrics", {}).get("rank_position"), 
@@ -178,17 +237,16 @@ def create_business(
         db.commit()
         db.refresh(db_business)
         
-        print(f"DEBUG: Business {db_business.id} saved successfully.")
+        logger.info(f"Business {db_business.id} saved")
         return db_business
     except Exception as e:
-        error_trace = traceback.format_exc()
-        print(f"CRITICAL: Error saving business: {str(e)}")
-        print(error_trace)
+        logger.exception(f"Error saving business: {str(e)}")
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Save error: {str(e)}")
 
-@router.get("", response_model=List[schemas.Business])
+@router.get("", response_model=List[schemas.Business], response_class=ORJSONResponse)
 def list_businesses(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(deps.get_db),
@@ -196,7 +254,21 @@ def list_businesses(
 ) -> Any:
     """
     Retrieve businesses for the current tenant.
+    Polls are answered with 304 while no business or ranking of the tenant changed.
     """
+    business_count, business_updated = db.query(func.count(models.Business.id), func.max(models.Business.updated_at)).filter(
+        models.Business.tenant_id == current_user.tenant_id
+    ).one()
+    ranking_count, ranking_date = db.query(func.count(models.Ranking.id), func.max(models.Ranking.snapshot_date)).join(models.Business).filter(
+        models.Business.tenant_id == current_user.tenant_id
+    ).one()
+    headers = validators(
+        make_etag(current_user.tenant_id, skip, limit, business_count, business_updated, ranking_count, ranking_date),
+        newest(business_updated, ranking_date)
+    )
+    if not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+
     businesses = db.query(models.Business).filter(
         models.Business.tenant_id == current_user.tenant_id
     ).offset(skip).limit(limit).all()
@@ -216,7 +288,7 @@ def list_businesses(
             logging.error(f"Error populating ranking for business: {str(e)}")
             continue
             
-    return businesses
+    return ORJSONResponse(encode(List[schemas.Business], businesses, "business_list"), headers=headers)
 
 @router.delete("/{business_id}", response_model=schemas.Business)
 def delete_business(
@@ -284,13 +356,22 @@ def delete_business_keyword(
     db.commit()
     return {"message": "Success"}
 
-@router.get("/{business_id}/rankings/history", response_model=List[schemas.Ranking])
+@router.get("/{business_id}/rankings/history", response_model=List[schemas.Ranking], response_class=ORJSONResponse)
 def get_business_ranking_history(
     business_id: UUID,
+    request: Request,
     db: Session = Depends(deps.get_db),
     current_user: schemas.User = Depends(auth_deps.get_current_user)
 ):
+    # Rankings are only ever appended: their count and latest date version the history
+    count, last_date = db.query(func.count(models.Ranking.id), func.max(models.Ranking.snapshot_date)).filter(
+        models.Ranking.business_id == business_id
+    ).one()
+    headers = validators(make_etag(business_id, count, last_date), last_date)
+    if not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+
     rankings = db.query(models.Ranking).filter(
         models.Ranking.business_id == business_id
     ).order_by(models.Ranking.snapshot_date.asc()).all()
-    return rankings
+    return ORJSONResponse(encode(List[schemas.Ranking], rankings, "ranking_history"), headers=headers)
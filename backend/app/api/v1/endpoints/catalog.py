@@ -0,0 +1,30 @@
+from typing import Any
+from fastapi import APIRouter, HTTPException, Request, Response
+from app.services.content_catalog import CATALOG, CATALOG_VERSION
+
+router = APIRouter()
+
+def _catalog_response(request: Request, response: Response, cache_control: str) -> Any:
+    etag = f'"{CATALOG_VERSION}"'
+    headers = {"Cache-Control": cache_control, "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return {"version": CATALOG_VERSION, "items": CATALOG}
+
+@router.get("")
+def get_catalog(request: Request, response: Response) -> Any:
+    """
+    Texts of the growth hacks and industry ideas that analyses reference by id.
+    Public and static: cached for an hour, then revalidated against the version ETag.
+    """
+    return _catalog_response(request, response, "public, max-age=3600")
+
+@router.get("/{version}")
+def get_catalog_version(version: str, request: Request, response: Response) -> Any:
+    """
+    A specific catalog version (as named by an analysis' `catalog_version`); never changes.
+    """
+    if version != CATALOG_VERSION:
+        raise HTTPException(status_code=404, detail="Catalog version not found")
+    return _catalog_response(request, response, "public, max-age=31536000, immutable")
@@ -1,14 +1,91 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List, Any
 from app import schemas, models
 from app.api import deps, auth_deps
+from app.core.conditional import make_etag, validators, not_modified
+from app.core.responses import ORJSONResponse
 from app.services.grid_service import grid_service
+from app.services.heatmap_service import heatmap_service, FORMATS
+from app.services.grid_diff_service import grid_diff_service
+from app.services.places_limiter import PlacesUnavailable
 from uuid import UUID
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
-@router.post("/{business_id}/analyze", response_model=schemas.GridRankSnapshot)
+@router.post("/schedules", response_model=schemas.GridScanSchedule)
+def create_grid_schedule(
+    schedule_in: schemas.GridScanScheduleCreate,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(auth_deps.get_current_user)
+) -> Any:
+    """
+    Register a recurring grid scan for a business.
+    """
+    business = db.query(models.Business).filter(
+        models.Business.id == schedule_in.business_id,
+        models.Business.tenant_id == current_user.tenant_id
+    ).first()
+
+    if not business:
+        raise HTTPException(status_code=404, detail="Business not found")
+
+    try:
+        cadence = models.ScanCadence(schedule_in.cadence.upper())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cadence must be DAILY, WEEKLY or MONTHLY")
+
+    schedule = models.GridScanSchedule(
+        tenant_id=current_user.tenant_id,
+        business_id=business.id,
+        keyword=schedule_in.keyword.strip(),
+        radius_km=schedule_in.radius_km,
+        grid_size=schedule_in.grid_size,
+        cadence=cadence
+    )
+    db.add(schedule)
+    db.commit()
+    db.refresh(schedule)
+    return schedule
+
+@router.get("/schedules", response_model=List[schemas.GridScanSchedule])
+def list_grid_schedules(
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(auth_deps.get_current_user)
+) -> Any:
+    """
+    Recurring grid scans of the tenant.
+    """
+    return db.query(models.GridScanSchedule).filter(
+        models.GridScanSchedule.tenant_id == current_user.tenant_id
+    ).order_by(models.GridScanSchedule.created_at.desc()).all()
+
+@router.delete("/schedules/{schedule_id}")
+def delete_grid_schedule(
+    schedule_id: UUID,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(auth_deps.get_current_user)
+) -> Any:
+    """
+    Stop a recurring grid scan. Snapshots it produced are kept.
+    """
+    schedule = db.query(models.GridScanSchedule).filter(
+        models.GridScanSchedule.id == schedule_id,
+        models.GridScanSchedule.tenant_id == current_user.tenant_id
+    ).first()
+
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+
+    db.delete(schedule)
+    db.commit()
+    return {"status": "success"}
+
+@router.post("/{business_id}/analyze", response_model=schemas.GridRankSnapshot, response_class=ORJSONResponse)
 def run_grid_analysis(
     business_id: UUID,
     keyword: str,
@@ -28,25 +105,36 @@ def run_grid_analysis(
     
     if not business:
         raise HTTPException(status_code=404, detail="Business not found")
-        
+
     try:
-        # 2. Trigger analysis
+        # 2. Center first (a Details lookup, charged only when the location is not stored yet),
+        # then one nearby search per grid point
+        center = grid_service.get_center(
+            db, business,
+            admit_details=lambda: deps.enforce_quota(current_user, models.ActionType.GRID_SCAN)
+        )
+        deps.enforce_quota(current_user, models.ActionType.GRID_SCAN, grid_size * grid_size)
+
+        # 3. Trigger analysis
         snapshot = grid_service.run_analysis(
             db=db,
             business=business,
             keyword=keyword,
             radius_km=radius_km,
-            grid_size=grid_size
+            grid_size=grid_size,
+            center=center
         )
-        return snapshot
+        return ORJSONResponse(grid_service.snapshot_json(snapshot))
+    except (HTTPException, PlacesUnavailable):
+        raise
     except Exception as e:
-        import traceback
-        print(traceback.format_exc())
+        logger.exception(f"Grid analysis failed for business {business_id}")
         raise HTTPException(status_code=500, detail=f"Grid analysis error: {str(e)}")
 
-@router.get("/{business_id}/history", response_model=List[schemas.GridRankSnapshot])
+@router.get("/{business_id}/history", response_model=List[schemas.GridRankSnapshot], response_class=ORJSONResponse)
 def get_grid_history(
     business_id: UUID,
+    request: Request,
     db: Session = Depends(deps.get_db),
     current_user: models.User = Depends(auth_deps.get_current_user)
 ) -> Any:
@@ -61,5 +149,88 @@ def get_grid_history(
     
     if not business:
         raise HTTPException(status_code=404, detail="Business not found")
+
+    # Snapshots are immutable: their count and latest creation date version the history
+    count, last_created = db.query(func.count(models.GridRankSnapshot.id), func.max(models.GridRankSnapshot.created_at)).filter(
+        models.GridRankSnapshot.business_id == business_id
+    ).one()
+    headers = validators(make_etag(business_id, count, last_created), last_created)
+    if not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
         
-    return grid_service.get_history(db, business_id=business_id)
+    return ORJSONResponse(grid_service.history_json(db, business_id=business_id), headers=headers)
+
+
+@router.get("/{business_id}/diff", response_model=schemas.GridDiff)
+def diff_grid_snapshots(
+    business_id: UUID,
+    from_id: UUID = Query(..., alias="from"),
+    to_id: UUID = Query(..., alias="to"),
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(auth_deps.get_current_user)
+) -> Any:
+    """
+    Point-by-point comparison of two grid snapshots of a business.
+    """
+    business = db.query(models.Business).filter(
+        models.Business.id == business_id,
+        models.Business.tenant_id == current_user.tenant_id
+    ).first()
+
+    if not business:
+        raise HTTPException(status_code=404, detail="Business not found")
+
+    packed = grid_diff_service.load_packed(db, business_id, [from_id, to_id])
+    if from_id not in packed or to_id not in packed:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+
+    return grid_diff_service.diff(packed[from_id], packed[to_id])
+
+def _get_snapshot(db: Session, current_user: models.User, business_id: UUID, snapshot_id: UUID) -> models.GridRankSnapshot:
+    snapshot = db.query(models.GridRankSnapshot).join(models.Business).filter(
+        models.GridRankSnapshot.id == snapshot_id,
+        models.GridRankSnapshot.business_id == business_id,
+        models.Business.tenant_id == current_user.tenant_id
+    ).first()
+
+    if not snapshot:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    return snapshot
+
+@router.get("/{business_id}/snapshots/{snapshot_id}/heatmap")
+def get_grid_heatmap(
+    business_id: UUID,
+    snapshot_id: UUID,
+    format: str = Query("png"),
+    size: int = Query(512, ge=128, le=2048),
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(auth_deps.get_current_user)
+) -> Any:
+    """
+    Rendered heatmap image of a grid snapshot. The bounds of the image are
+    returned in the X-Heatmap-Bounds header (west,south,east,north).
+    """
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail="Format must be png or webp")
+
+    snapshot = _get_snapshot(db, current_user, business_id, snapshot_id)
+    path = heatmap_service.get_raster(snapshot, fmt=format, size=size)
+
+    headers = {"Cache-Control": "private, max-age=31536000, immutable"}
+    bounds = heatmap_service.get_bounds(snapshot)
+    if bounds:
+        headers["X-Heatmap-Bounds"] = ",".join(str(v) for v in bounds)
+    return FileResponse(path, media_type=f"image/{format}", headers=headers)
+
+@router.get("/{business_id}/snapshots/{snapshot_id}/overlay")
+def get_grid_overlay(
+    business_id: UUID,
+    snapshot_id: UUID,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(auth_deps.get_current_user)
+) -> Any:
+    """
+    GeoJSON overlay of a grid snapshot: one colored cell per grid point.
+    """
+    snapshot = _get_snapshot(db, current_user, business_id, snapshot_id)
+    return heatmap_service.get_overlay(snapshot)
@@ -0,0 +1,33 @@
+import hmac
+from typing import Any, Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+from app.services.photo_service import photo_cache, sign_reference
+
+router = APIRouter()
+
+@router.get("/photo/{reference}")
+def get_place_photo(
+    reference: str,
+    request: Request,
+    sig: str = Query(...),
+    w: Optional[int] = Query(None, ge=16, le=4096)
+) -> Any:
+    """
+    Places photo as WebP, resized to the nearest configured width. Fetched from Google once,
+    then served from the disk cache; a reference's photo never changes, so clients and CDNs
+    may keep it forever. No auth (used in <img> tags): the URL signature is the credential.
+    """
+    if not hmac.compare_digest(sig, sign_reference(reference)):
+        raise HTTPException(status_code=403, detail="Invalid photo signature")
+
+    found = photo_cache.get(reference, w)
+    if not found:
+        raise HTTPException(status_code=404, detail="Photo not found")
+
+    path, digest = found
+    etag = f'"{digest[:16]}-{photo_cache.variant_width(w)}"'
+    headers = {"Cache-Control": "public, max-age=31536000, immutable", "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type="image/webp", headers=headers)
@@ -1,38 +1,145 @@
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, JSONResponse
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
+from typing import List
+from uuid import UUID
 from app import models, schemas
 from app.api import deps, auth_deps
 from app.services.report_service import report_service
+from app.models.tenant import PlanType
+from app.workers.reports import render_business_report, export_business_reports
 
 router = APIRouter()
 
-@router.get("/{business_id}/download", response_class=StreamingResponse)
+def _get_business(db: Session, business_id: UUID, current_user: models.User) -> models.Business:
+    business = db.query(models.Business).filter(
+        models.Business.id == business_id,
+        models.Business.tenant_id == current_user.tenant_id
+    ).first()
+    if not business:
+        raise HTTPException(status_code=404, detail="Business not found")
+    return business
+
+@router.post("/exports", response_model=schemas.ReportExport)
+def create_report_export(
+    export_in: schemas.ReportExportCreate,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(auth_deps.get_current_user)
+):
+    """
+    Queue a bulk white-label export of many locations (Agency plan).
+    """
+    tenant = db.query(models.Tenant).filter(models.Tenant.id == current_user.tenant_id).first()
+    if not tenant or tenant.plan_type != PlanType.AGENCY:
+        raise HTTPException(status_code=403, detail="Bulk report export requires the Agency plan")
+    if export_in.output_format not in ("zip", "pdf"):
+        raise HTTPException(status_code=400, detail="output_format must be 'zip' or 'pdf'")
+    
+    query = db.query(models.Business.id).filter(models.Business.tenant_id == tenant.id)
+    if export_in.business_ids:
+        query = query.filter(models.Business.id.in_(export_in.business_ids))
+    owned = {row[0] for row in query.all()}
+    # Keep the requested order, drop ids from other tenants
+    business_ids = [b for b in (export_in.business_ids or sorted(owned, key=str)) if b in owned]
+    if not business_ids:
+        raise HTTPException(status_code=404, detail="No businesses to export")
+    
+    export = models.ReportExport(
+        tenant_id=tenant.id,
+        business_ids=[str(b) for b in business_ids],
+        output_format=export_in.output_format,
+        total=len(business_ids)
+    )
+    db.add(export)
+    db.commit()
+    db.refresh(export)
+    export_business_reports.delay(str(export.id))
+    return export
+
+def _get_export(db: Session, export_id: UUID, current_user: models.User) -> models.ReportExport:
+    export = db.query(models.ReportExport).filter(
+        models.ReportExport.id == export_id,
+        models.ReportExport.tenant_id == current_user.tenant_id
+    ).first()
+    if not export:
+        raise HTTPException(status_code=404, detail="Export not found")
+    return export
+
+@router.get("/exports/{export_id}", response_model=schemas.ReportExport)
+def get_report_export(
+    export_id: UUID,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(auth_deps.get_current_user)
+):
+    """
+    Progress of a bulk export (completed / total).
+    """
+    return _get_export(db, export_id, current_user)
+
+@router.get("/exports/{export_id}/download")
+def download_report_export(
+    export_id: UUID,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(auth_deps.get_current_user)
+):
+    """
+    Stream a finished bulk export.
+    """
+    export = _get_export(db, export_id, current_user)
+    if export.status != "ready" or not export.file_path:
+        return JSONResponse(status_code=202, content=jsonable_encoder(schemas.ReportExport.model_validate(export)))
+    
+    if export.output_format == "pdf":
+        return FileResponse(export.file_path, media_type="application/pdf", filename=f"MapRank_Reports_{export.id}.pdf")
+    return FileResponse(export.file_path, media_type="application/zip", filename=f"MapRank_Reports_{export.id}.zip")
+
+@router.post("/{business_id}", response_model=schemas.Report)
+def request_business_report(
+    business_id: UUID,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(auth_deps.get_current_user)
+):
+    """
+    Queue rendering of a white-label PDF report (reuses the cached one if data is unchanged).
+    """
+    business = _get_business(db, business_id, current_user)
+    report, needs_render = report_service.request_report(db, business)
+    if needs_render:
+        render_business_report.delay(str(report.id))
+    return report
+
+@router.get("/{business_id}", response_model=List[schemas.Report])
+def list_business_reports(
+    business_id: UUID,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(auth_deps.get_current_user)
+):
+    """
+    List rendered reports of a business.
+    """
+    business = _get_business(db, business_id, current_user)
+    return db.query(models.Report).filter(
+        models.Report.business_id == business.id
+    ).order_by(models.Report.created_at.desc()).all()
+
+@router.get("/{business_id}/download")
 def download_business_report(
-    business_id: int,
-    current_user: schemas.User = Depends(auth_deps.get_current_user)
+    business_id: UUID,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(auth_deps.get_current_user)
 ):
     """
-    Generate and download a white-label PDF report for a business.
-    """
-    db: Session = SessionLocal()
-    try:
-        business = db.query(models.Business).filter(models.Business.id == business_id).first()
-        if not business:
-            raise HTTPException(status_code=404, detail="Business not found")
-        
-        # Verify ownership (simplified, assumes tenant logic or direct ownership)
-        # In real app: if business.tenant_id != current_user.tenant_id: raise 403
-        
-        pdf_buffer = report_service.generate_business_report(business, current_user)
-        
-        filename = f"MapRank_Report_{business.name.replace(' ', '_')}.pdf"
-        
-        return StreamingResponse(
-            pdf_buffer, 
-            media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename={filename}"}
-        )
-    finally:
-        db.close()
+    Download the white-label PDF report of a business.
+    Streams the cached file; if it is not rendered yet, queues it and answers 202 with the report status.
+    """
+    business = _get_business(db, business_id, current_user)
+    report, needs_render = report_service.request_report(db, business)
+    if needs_render:
+        render_business_report.delay(str(report.id))
+    
+    if report.status != "ready":
+        return JSONResponse(status_code=202, content=jsonable_encoder(schemas.Report.model_validate(report)))
+    
+    filename = f"MapRank_Report_{business.name.replace(' ', '_')}.pdf"
+    return FileResponse(report.file_path, media_type="application/pdf", filename=filename)
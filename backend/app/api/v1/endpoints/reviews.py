@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
 from typing import List
 from app import schemas
 from app.services.review_service import review_service
@@ -9,12 +10,14 @@ router = APIRouter()
 @router.get("", response_model=List[schemas.Review])
 def read_reviews(
     place_id: str,
+    limit: int = 50,
+    db: Session = Depends(deps.get_db),
     current_user: schemas.User = Depends(auth_deps.get_current_user)
 ):
     """
-    Get reviews for a specific place from Google Maps.
+    Get reviews for a specific place from the stored review corpus (synced from Google Maps).
     """
-    reviews = review_service.get_reviews(place_id)
+    reviews = review_service.get_reviews(db, place_id, limit=limit)
     return reviews
 
 @router.post("/draft", response_model=schemas.ReplyDraftResponse)
@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 from app import schemas
 from app.api import deps
 from app.services.tenant_service import tenant_service
+from app.services.quota_service import quota_service
 from app.models.user import User  # For type checking if needed
 
 router = APIRouter()
@@ -22,6 +23,19 @@ def read_tenant_me(
         raise HTTPException(status_code=404, detail="Tenant not found")
     return tenant
 
+@router.get("/me/usage")
+def read_tenant_usage(
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Places API quota of the current tenant: current windows and month-to-date usage.
+    """
+    tenant = tenant_service.get(db, tenant_id=current_user.tenant_id)
+    if not tenant:
+        raise HTTPException(status_code=404, detail="Tenant not found")
+    return quota_service.get_usage(db, tenant)
+
 @router.put("/me", response_model=schemas.Tenant)
 def update_tenant_me(
     *,
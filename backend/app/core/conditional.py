@@ -0,0 +1,60 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+from fastapi import Request
+
+# Private endpoints: clients may keep a copy but must revalidate it on every poll
+PRIVATE_REVALIDATE = "private, no-cache"
+
+def make_etag(*parts: Any) -> str:
+    """
+    Weak ETag from version markers (counts, max timestamps, content hashes). Weak because
+    the compression middleware may send the same representation in several encodings.
+    """
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+def content_etag(body: bytes) -> str:
+    return f'W/"{hashlib.sha1(body).hexdigest()[:20]}"'
+
+def validators(etag: str, last_modified: Optional[datetime] = None, cache_control: str = PRIVATE_REVALIDATE) -> Dict[str, str]:
+    """
+    ETag, Last-Modified and Cache-Control headers, sent with 200s and 304s alike.
+    Naive datetimes are UTC (as stored).
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(_utc(last_modified).replace(microsecond=0), usegmt=True)
+    return headers
+
+def not_modified(request: Request, headers: Dict[str, str]) -> bool:
+    """
+    Whether the client's copy is current: If-None-Match (weak comparison) when sent,
+    otherwise If-Modified-Since against Last-Modified.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        tags = {_opaque(tag) for tag in if_none_match.split(",")}
+        return _opaque(headers["ETag"]) in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and "Last-Modified" in headers:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return parsedate_to_datetime(headers["Last-Modified"]) <= _utc(since)
+    return False
+
+def newest(*timestamps: Optional[datetime]) -> Optional[datetime]:
+    return max((t for t in timestamps if t), default=None)
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
@@ -4,6 +4,9 @@ from typing import Optional
 class Settings(BaseSettings):
     PROJECT_NAME: str = "MapRank API"
     API_V1_STR: str = "/api/v1"
+    # Origin browsers reach the API at (e.g. https://api.maprank.app): URLs the frontend loads
+    # directly, like the photo proxy, are absolute on it. Empty keeps them relative.
+    PUBLIC_API_URL: str = ""
     
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
@@ -18,6 +21,101 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
     REDIS_URL: str = "redis://redis:6379/0"
+
+    # Review corpus: minimum time between two Place Details syncs of the same place
+    REVIEW_SYNC_INTERVAL_MINUTES: int = 60
+
+    # Canonical place store: background jobs reuse stored Place Details younger than this
+    PLACE_DETAILS_MAX_AGE_MINUTES: int = 60
+    PLACE_REFRESH_CONCURRENCY: int = 8
+
+    # In-process spatial index over the place store: bucket size, refresh period, and how many
+    # known places of a type a radius needs before nearby searches are answered locally
+    SPATIAL_INDEX_CELL_METERS: float = 500.0
+    SPATIAL_INDEX_REFRESH_SECONDS: int = 60
+    SPATIAL_INDEX_MIN_RESULTS: int = 20
+
+    # City-wide market sweeps: cell size, smallest size saturated cells are split down to,
+    # parallel searches, searches per checkpoint and worker lease
+    MARKET_SWEEP_CELL_METERS: int = 1000
+    MARKET_SWEEP_MIN_CELL_METERS: int = 250
+    MARKET_SWEEP_CONCURRENCY: int = 4
+    MARKET_SWEEP_CHUNK_SIZE: int = 50
+    MARKET_SWEEP_LEASE_SECONDS: int = 600
+
+    # Benchmark quantile sketches: smallest sample a region needs to be compared against,
+    # and how long a process reuses a sketch it read
+    BENCHMARK_SKETCH_MIN_SAMPLES: int = 30
+    BENCHMARK_SKETCH_CACHE_SECONDS: int = 300
+
+    # Competitor refresher: minimum age of a snapshot before it is refetched
+    COMPETITOR_REFRESH_HOURS: int = 24
+
+    # Rendered PDF reports (local disk or a mounted object-store bucket), and how long a queued
+    # render may stay pending before it is considered lost and queued again
+    REPORTS_DIR: str = "/tmp/maprank/reports"
+    REPORT_EXPORT_PROCESSES: int = 4
+    REPORT_PENDING_TIMEOUT_SECONDS: int = 600
+
+    # Rendered grid heatmaps, cached per snapshot id
+    HEATMAP_DIR: str = "/tmp/maprank/heatmaps"
+
+    # Places photo proxy: disk cache (content-addressed, LRU-evicted above the cap) and WebP variant widths
+    PHOTO_CACHE_DIR: str = "/tmp/maprank/photos"
+    PHOTO_CACHE_MAX_BYTES: int = 2 * 1024 ** 3
+    PHOTO_WIDTHS: list = [160, 320, 640, 1280]
+    PHOTO_WEBP_QUALITY: int = 80
+    PHOTO_FETCH_MAX_WIDTH: int = 1600
+
+    # Scheduled grid scans: points of different grids closer than this share one nearby search,
+    # and a failed scan is retried after this delay instead of at its next cadence
+    GRID_SHARED_POINT_METERS: int = 100
+    GRID_SCAN_CONCURRENCY: int = 8
+    GRID_SCHEDULE_RETRY_MINUTES: int = 30
+
+    # Places API calls a tenant may cause per window, by plan
+    PLACES_QUOTA: dict = {
+        "FREE": {"minute": 30, "day": 300},
+        "PRO": {"minute": 200, "day": 5000},
+        "AGENCY": {"minute": 600, "day": 25000}
+    }
+
+    # Maps backend: google, record (google + write fixtures), replay (fixtures only), synthetic (generated city)
+    MAPS_BACKEND: str = "google"
+    MAPS_FIXTURES_DIR: str = "/tmp/maprank/maps-fixtures"
+    SYNTHETIC_CITY_SEED: int = 42
+    SYNTHETIC_CITY_SIZE: int = 5000
+
+    # Global Places API limiter shared by all processes (token bucket + circuit breaker)
+    PLACES_QPS: float = 10.0
+    PLACES_BURST: int = 20
+    PLACES_INTERACTIVE_RESERVE: float = 0.3 # Share of the bucket scheduled jobs cannot use
+    PLACES_INTERACTIVE_WAIT_SECONDS: float = 5.0
+    PLACES_SCHEDULED_WAIT_SECONDS: float = 120.0
+    PLACES_TIMEOUT_SECONDS: int = 10
+    PLACES_MAX_RETRIES: int = 3
+    PLACES_BACKOFF_BASE_SECONDS: float = 0.5
+    PLACES_CIRCUIT_FAILURES: int = 5
+    PLACES_CIRCUIT_WINDOW_SECONDS: int = 60
+    PLACES_CIRCUIT_COOLDOWN_SECONDS: int = 30
+
+    # Response compression of JSON/text bodies from this size on (brotli when installed and accepted, else gzip)
+    COMPRESSION_MIN_BYTES: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Pre-serialized JSON of immutable objects (grid snapshots) kept in Redis
+    SERIALIZED_CACHE_SECONDS: int = 7 * 24 * 3600
+
+    # Public (shared) reports: how long one analysis is served, by us and by shared caches/CDNs
+    PUBLIC_REPORT_CACHE_SECONDS: int = 300
+
+    # Alert stream (SSE): seconds between keep-alive comments on an idle stream
+    ALERT_STREAM_HEARTBEAT_SECONDS: int = 15
+
+    # Opt-in request profiler ("X-Profile: 1" header, ADMIN users only)
+    PROFILING_ENABLED: bool = False
+    PROFILING_INTERVAL_SECONDS: float = 0.005 # CPU-bound code holds the GIL for ~5 ms, finer gains little
     
     BACKEND_CORS_ORIGINS: list = ["http://localhost:3000", "http://localhost:8000"]
 
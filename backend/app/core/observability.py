@@ -0,0 +1,212 @@
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from prometheus_client import Histogram, Counter as MetricCounter, CollectorRegistry, REGISTRY, generate_latest, CONTENT_TYPE_LATEST
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Time kinds tracked per request: SQL, Google Maps calls, and CPU spent in our engines
+PHASES = ("db", "google", "engine")
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+REQUEST_LATENCY = Histogram(
+    "maprank_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS
+)
+REQUEST_PHASE = Histogram(
+    "maprank_http_request_phase_seconds",
+    "Time a request spent in the database, the Google Maps API and engine CPU",
+    ["route", "phase"],
+    buckets=LATENCY_BUCKETS
+)
+SPAN_DURATION = Histogram(
+    "maprank_span_duration_seconds",
+    "Duration of instrumented spans (engine spans are thread CPU time)",
+    ["kind", "name"],
+    buckets=LATENCY_BUCKETS
+)
+DB_QUERIES = MetricCounter(
+    "maprank_db_queries",
+    "SQL statements executed, by verb",
+    ["verb"]
+)
+RESPONSE_BYTES = MetricCounter(
+    "maprank_http_response_bytes",
+    "Bytes of JSON/text response bodies sent, by route and content encoding",
+    ["route", "encoding"]
+)
+RESPONSE_RAW_BYTES = MetricCounter(
+    "maprank_http_response_uncompressed_bytes",
+    "Bytes of the same response bodies before compression",
+    ["route"]
+)
+SERIALIZED_CACHE = MetricCounter(
+    "maprank_serialized_cache_lookups",
+    "Pre-serialized JSON lookups, by object kind and result (hit/miss)",
+    ["name", "result"]
+)
+
+SQL_VERBS = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+
+class RequestTimings:
+    """
+    Time accumulated by the spans of one request. The object is shared (not copied)
+    with the threadpool threads that run sync endpoints and dependencies.
+    """
+    __slots__ = ("db", "google", "engine", "queries")
+
+    def __init__(self):
+        self.db = 0.0
+        self.google = 0.0
+        self.engine = 0.0
+        self.queries = 0
+
+    def add(self, kind: str, seconds: float) -> None:
+        setattr(self, kind, getattr(self, kind) + seconds)
+
+    def server_timing(self, total: float) -> str:
+        parts = [f"{phase};dur={getattr(self, phase) * 1000:.1f}" for phase in PHASES]
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+def start_request() -> RequestTimings:
+    timings = RequestTimings()
+    _current_timings.set(timings)
+    return timings
+
+def observe_request(method: str, route: str, status: int, elapsed: float, timings: RequestTimings) -> None:
+    REQUEST_LATENCY.labels(method, route, str(status)).observe(elapsed)
+    for phase in PHASES:
+        REQUEST_PHASE.labels(route, phase).observe(getattr(timings, phase))
+
+@contextmanager
+def span(kind: str, name: str, cpu: bool = False):
+    """
+    Times a block (or, as a decorator, a function) into SPAN_DURATION and the current
+    request. cpu=True measures the thread's CPU time instead of wall time, so that
+    engine spans are not inflated by the network calls they make.
+    """
+    clock = time.thread_time if cpu else time.perf_counter
+    start = clock()
+    try:
+        yield
+    finally:
+        elapsed = clock() - start
+        SPAN_DURATION.labels(kind, name).observe(elapsed)
+        timings = _current_timings.get()
+        if timings is not None:
+            timings.add(kind, elapsed)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    verb = statement.lstrip().split(" ", 1)[0].upper()
+    verb = verb if verb in SQL_VERBS else "OTHER"
+    SPAN_DURATION.labels("db", verb).observe(elapsed)
+    DB_QUERIES.labels(verb).inc()
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add("db", elapsed)
+        timings.queries += 1
+
+def metrics_payload() -> bytes:
+    """
+    Prometheus exposition of this process, or of every process sharing
+    PROMETHEUS_MULTIPROC_DIR (uvicorn workers and Celery workers) when it is set.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class SamplingProfiler:
+    """
+    Statistical profiler for a single request: a background thread samples the stacks
+    of every thread every `interval` seconds and keeps those running app code.
+    Sync endpoints run in threadpool threads, so the request cannot be pinned to one
+    thread; on a busy process, samples of concurrent requests are mixed in.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+        self.duration = 0.0
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._started
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.sample_count += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                in_app = False
+                while frame is not None:
+                    code = frame.f_code
+                    in_app = in_app or code.co_filename.startswith(APP_DIR)
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if in_app:
+                    self.samples[tuple(reversed(stack))] += 1
+
+    def report(self, top: int = 40) -> str:
+        """
+        Plain-text report: functions by inclusive samples, then folded stacks
+        (one "a;b;c count" line per stack, readable by flamegraph.pl and speedscope).
+        """
+        inclusive: Counter = Counter()
+        exclusive: Counter = Counter()
+        for stack, count in self.samples.items():
+            for name in set(stack):
+                inclusive[name] += count
+            exclusive[stack[-1]] += count
+
+        total = sum(self.samples.values()) or 1
+        lines = [
+            f"# {self.duration * 1000:.1f} ms, {self.sample_count} ticks every {self.interval * 1000:.1f} ms, {total} stack samples",
+            "",
+            f"{'total %':>8} {'self %':>8}  function"
+        ]
+        for name, count in inclusive.most_common(top):
+            lines.append(f"{count * 100 / total:8.1f} {exclusive[name] * 100 / total:8.1f}  {name}")
+        lines += ["", "# folded stacks"]
+        for stack, count in self.samples.most_common():
+            lines.append(f"{';'.join(stack)} {count}")
+        return "\n".join(lines) + "\n"
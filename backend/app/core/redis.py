@@ -0,0 +1,26 @@
+import redis
+from app.core.config import settings
+
+_client = None
+
+def get_redis() -> redis.Redis:
+    """
+    Process-wide Redis client (connection pool is created on first use).
+    """
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=2, socket_connect_timeout=2)
+    return _client
+
+_async_client = None
+
+def get_async_redis() -> "redis.asyncio.Redis":
+    """
+    Process-wide asyncio Redis client, for code running on the event loop (SSE streams).
+    No socket timeout: pub/sub connections stay idle between messages.
+    """
+    global _async_client
+    if _async_client is None:
+        import redis.asyncio
+        _async_client = redis.asyncio.Redis.from_url(settings.REDIS_URL, socket_connect_timeout=2)
+    return _async_client
@@ -0,0 +1,48 @@
+from decimal import Decimal
+from typing import Any
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from app.core.observability import span
+
+# numpy values come out of the engines; non-str keys out of aggregations
+JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=JSON_OPTIONS)
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson (UUIDs, datetimes and numpy values natively).
+    Bytes are sent as they are, so pre-serialized bodies skip encoding altogether.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
+
+_adapters: dict = {}
+
+def adapter(schema: Any) -> TypeAdapter:
+    if schema not in _adapters:
+        _adapters[schema] = TypeAdapter(schema)
+    return _adapters[schema]
+
+def encode(schema: Any, obj: Any, name: str) -> bytes:
+    """
+    Validates `obj` (ORM objects or dicts) against a response schema and serializes it:
+    what FastAPI does for a response_model, without the jsonable_encoder/json.dumps pass.
+    CPU time is recorded as the engine span "serialize_<name>".
+    """
+    with span("engine", f"serialize_{name}", cpu=True):
+        schema_adapter = adapter(schema)
+        return dumps(schema_adapter.dump_python(schema_adapter.validate_python(obj, from_attributes=True)))
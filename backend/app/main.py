@@ -1,6 +1,8 @@
 from fastapi import FastAPI, Depends, Request, Response, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 import traceback
@@ -8,9 +10,15 @@ import logging
 import time
 
 from app.core.config import settings
+from app.core import security
+from app.core.compression import CompressionMiddleware
+from app.core.observability import start_request, observe_request, SamplingProfiler, metrics_payload, METRICS_CONTENT_TYPE
 from app.api.v1.api import api_router
 from app.core.database import get_db, engine
+from app.services.places_limiter import PlacesUnavailable
+from app.services.place_index import place_index
 from app.models import Base, User, Tenant, Business, Keyword, Ranking, Subscription, UsageLog, GridRankSnapshot, GridPointRank, Report
+from app.models.user import UserRole
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,6 +29,14 @@ app = FastAPI(
     openapi_url=f"{settings.API_V1_STR}/openapi.json"
 )
 
+# Compression of large JSON bodies (innermost, so the route is known when it runs)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_BYTES,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY
+)
+
 # Standard CORS Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -46,6 +62,58 @@ async def add_cors_headers(request: Request, call_next):
     response.headers["Access-Control-Allow-Headers"] = "*"
     return response
 
+def _is_admin(authorization: str) -> bool:
+    """
+    Whether the bearer token belongs to an active ADMIN user (gate of the request profiler).
+    """
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[security.ALGORITHM])
+    except JWTError:
+        return False
+    from app.core.database import SessionLocal
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.id == payload.get("sub")).first()
+        return bool(user and user.is_active and user.role == UserRole.ADMIN)
+    finally:
+        db.close()
+
+# Latency per route template, time split into db / google / engine (also sent as Server-Timing).
+# Admins can send "X-Profile: 1" to get a sampling profile of the request instead of its body.
+@app.middleware("http")
+async def observe_requests(request: Request, call_next):
+    profiler = None
+    if settings.PROFILING_ENABLED and request.headers.get("X-Profile") == "1":
+        if await run_in_threadpool(_is_admin, request.headers.get("Authorization", "")):
+            profiler = SamplingProfiler(settings.PROFILING_INTERVAL_SECONDS)
+            profiler.start()
+
+    timings = start_request()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        elapsed = time.perf_counter() - start
+        route = getattr(request.scope.get("route"), "path", "<unmatched>")
+        observe_request(request.method, route, status, elapsed, timings)
+        if profiler:
+            profiler.stop()
+
+    server_timing = timings.server_timing(elapsed)
+    if profiler:
+        return PlainTextResponse(profiler.report(), headers={
+            "Server-Timing": server_timing,
+            "X-Profiled-Status": str(status),
+            "Cache-Control": "no-store"
+        })
+    response.headers["Server-Timing"] = server_timing
+    return response
+
 # Global Version Control
 APP_VERSION = "v33-STABLE"
 
@@ -53,6 +121,10 @@ APP_VERSION = "v33-STABLE"
 def root():
     return {"message": "MapRank API is alive", "version": APP_VERSION}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(metrics_payload(), media_type=METRICS_CONTENT_TYPE)
+
 @app.get("/health")
 @app.get("/health/v16")
 def health_v16():
@@ -114,7 +186,8 @@ def health_migrate(db: Session = Depends(get_db)):
         new_cols = [
             ("health_score", "FLOAT DEFAULT 0.0"),
             ("profile_completeness", "FLOAT DEFAULT 0.0"),
-            ("last_audit_date", "TIMESTAMP")
+            ("last_audit_date", "TIMESTAMP"),
+            ("updated_at", "TIMESTAMP DEFAULT (now() AT TIME ZONE 'utc')")
         ]
         for col_name, col_type in new_cols:
             try:
@@ -138,7 +211,8 @@ def health_migrate(db: Session = Depends(get_db)):
         # Check for average_rank and visibility_score in snapshots
         snapshot_cols = [
             ("average_rank", "FLOAT"),
-            ("visibility_score", "FLOAT")
+            ("visibility_score", "FLOAT"),
+            ("schedule_id", "UUID REFERENCES grid_scan_schedules(id) ON DELETE SET NULL")
         ]
         for col_name, col_type in snapshot_cols:
             try:
@@ -147,6 +221,133 @@ def health_migrate(db: Session = Depends(get_db)):
             except Exception:
                 db.rollback()
 
+        # Rendered report cache columns
+        report_cols = [
+            ("ranking_id", "BIGINT"),
+            ("snapshot_id", "UUID"),
+            ("template_version", "VARCHAR"),
+            ("status", "VARCHAR DEFAULT 'pending'"),
+            ("file_path", "VARCHAR"),
+            ("error", "VARCHAR"),
+            ("rendered_at", "TIMESTAMP")
+        ]
+        for col_name, col_type in report_cols:
+            try:
+                db.execute(text(f"ALTER TABLE reports ADD COLUMN IF NOT EXISTS {col_name} {col_type}"))
+                db.commit()
+            except Exception:
+                db.rollback()
+        try:
+            db.execute(text("CREATE INDEX IF NOT EXISTS ix_reports_cache_key ON reports (business_id, ranking_id, template_version)"))
+            db.commit()
+        except Exception:
+            db.rollback()
+        # One live report per cache key: older duplicates (from concurrent requests) are retired first,
+        # keeping ready reports over pending ones and then the newest
+        try:
+            db.execute(text(
+                "UPDATE reports r SET status = 'failed', error = 'Superseded' FROM reports o "
+                "WHERE r.status IN ('pending', 'ready') AND o.status IN ('pending', 'ready') AND r.id <> o.id "
+                "AND r.business_id = o.business_id "
+                "AND r.ranking_id IS NOT DISTINCT FROM o.ranking_id "
+                "AND r.snapshot_id IS NOT DISTINCT FROM o.snapshot_id "
+                "AND r.template_version IS NOT DISTINCT FROM o.template_version "
+                "AND ((o.status = 'ready')::int, o.created_at, o.id) > ((r.status = 'ready')::int, r.created_at, r.id)"
+            ))
+            db.execute(text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS uq_reports_cache_key ON reports (business_id, "
+                "coalesce(ranking_id, 0), coalesce(snapshot_id, '00000000-0000-0000-0000-000000000000'::uuid), "
+                "coalesce(template_version, '')) WHERE status IN ('pending', 'ready')"
+            ))
+            db.commit()
+        except Exception as e:
+            logger.warning(f"Index uq_reports_cache_key error: {str(e)}")
+            db.rollback()
+
+        # Usage accounting: cost column, per-tenant index and new action types
+        try:
+            db.execute(text("ALTER TABLE usage_logs ADD COLUMN IF NOT EXISTS units INTEGER DEFAULT 1"))
+            db.execute(text("CREATE INDEX IF NOT EXISTS ix_usage_logs_tenant_time ON usage_logs (tenant_id, timestamp)"))
+            db.commit()
+        except Exception:
+            db.rollback()
+        for action in ("GRID_SCAN", "DISCOVERY"):
+            try:
+                db.execute(text(f"ALTER TYPE actiontype ADD VALUE IF NOT EXISTS '{action}'"))
+                db.commit()
+            except Exception:
+                db.rollback()
+
+        # Canonical places: backfill from the tenant rows, then reference them
+        try:
+            db.execute(text(
+                "INSERT INTO places (google_place_id, name, address, rating, review_count, created_at) "
+                "SELECT DISTINCT ON (google_place_id) google_place_id, name, address, total_rating, review_count, now() "
+                "FROM businesses ON CONFLICT DO NOTHING"
+            ))
+            db.execute(text(
+                "INSERT INTO places (google_place_id, name, address, rating, review_count, photo_count, created_at) "
+                "SELECT DISTINCT ON (google_place_id) google_place_id, name, address, rating, review_count, photo_count, now() "
+                "FROM competitors ON CONFLICT DO NOTHING"
+            ))
+            db.commit()
+        except Exception as e:
+            logger.warning(f"Places backfill error: {str(e)}")
+            db.rollback()
+        for col_name, col_type in (("region", "VARCHAR"), ("score", "FLOAT")):
+            try:
+                db.execute(text(f"ALTER TABLE places ADD COLUMN IF NOT EXISTS {col_name} {col_type}"))
+                db.commit()
+            except Exception:
+                db.rollback()
+        for col_name in ("changed_at", "created_at", "region"):
+            try:
+                db.execute(text(f"CREATE INDEX IF NOT EXISTS ix_places_{col_name} ON places ({col_name})"))
+                db.commit()
+            except Exception:
+                db.rollback()
+        for table in ("businesses", "competitors"):
+            try:
+                db.execute(text(
+                    f"ALTER TABLE {table} ADD CONSTRAINT fk_{table}_place "
+                    "FOREIGN KEY (google_place_id) REFERENCES places (google_place_id)"
+                ))
+                db.commit()
+            except Exception:
+                db.rollback() # Already there
+
+        # Saturation counters of market sweeps
+        for col_name in ("split_tasks", "saturated_tasks"):
+            try:
+                db.execute(text(f"ALTER TABLE market_sweeps ADD COLUMN IF NOT EXISTS {col_name} INTEGER DEFAULT 0"))
+                db.commit()
+            except Exception:
+                db.rollback()
+
+        # Partial index of the unread alert counter
+        try:
+            db.execute(text("CREATE INDEX IF NOT EXISTS ix_alerts_unread ON alerts (business_id) WHERE is_read = false"))
+            db.commit()
+        except Exception as e:
+            logger.warning(f"Index ix_alerts_unread error: {str(e)}")
+            db.rollback()
+
+        # Unique (business_id, google_place_id) for the competitor discovery upsert
+        # Older rows may contain duplicates from concurrent discoveries: keep the first one
+        try:
+            db.execute(text(
+                "DELETE FROM competitors a USING competitors b "
+                "WHERE a.business_id = b.business_id AND a.google_place_id = b.google_place_id AND a.ctid > b.ctid"
+            ))
+            db.execute(text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS uq_competitors_business_place "
+                "ON competitors (business_id, google_place_id)"
+            ))
+            db.commit()
+        except Exception as e:
+            logger.warning(f"Index uq_competitors_business_place error: {str(e)}")
+            db.rollback()
+
         return {
             "status": "ok", 
             "message": "Database sync successful", 
@@ -169,6 +370,7 @@ def startup_event():
         health_migrate(db)
     finally:
         db.close()
+    place_index.start_refresher()
 
 @app.get("/health/test-hash")
 def test_hash(pw: str = "test_password_with_long_string"):
@@ -196,11 +398,21 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
     return add_cors_to_response(response)
 
+@app.exception_handler(PlacesUnavailable)
+async def places_unavailable_handler(request: Request, exc: PlacesUnavailable):
+    response = JSONResponse(
+        status_code=503,
+        content={"detail": "Google Maps verilerine şu anda ulaşılamıyor, lütfen biraz sonra tekrar deneyin.", "version": APP_VERSION},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+    return add_cors_to_response(response)
+
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     response = JSONResponse(
         status_code=exc.status_code,
-        content={"detail": exc.detail, "version": APP_VERSION}
+        content={"detail": exc.detail, "version": APP_VERSION},
+        headers=getattr(exc, "headers", None)
     )
     return add_cors_to_response(response)
 
@@ -1,10 +1,14 @@
 from .base import Base
 from .user import User
-from .tenant import Tenant
+from .tenant import Tenant, PlanType
 from .business import Business, Keyword, Ranking, Alert
-from .grid_rank import GridRankSnapshot, GridPointRank
-from .billing import Subscription, UsageLog
-from .report import Report
+from .grid_rank import GridRankSnapshot, GridPointRank, GridScanSchedule, ScanCadence
+from .billing import Subscription, UsageLog, ActionType
+from .report import Report, ReportExport
 from .competitor import Competitor
 from .seo_audit import SEOAudit
 from .ai_prediction import AIPrediction
+from .review import Review, ReviewSyncState
+from .metric_series import PlaceMetricSeries
+from .place import Place
+from .market import MarketSweep, MarketSweepPlace, SectorBenchmark
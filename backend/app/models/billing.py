@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, BigInteger
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, BigInteger, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import enum
@@ -15,6 +15,8 @@ class ActionType(str, enum.Enum):
     SEARCH = "SEARCH"
     REPORT = "REPORT"
     ANALYZE = "ANALYZE"
+    GRID_SCAN = "GRID_SCAN"
+    DISCOVERY = "DISCOVERY"
 
 class Subscription(Base):
     __tablename__ = "subscriptions"
@@ -32,6 +34,11 @@ class UsageLog(Base):
 
     id = Column(BigInteger, primary_key=True, autoincrement=True)
     action_type = Column(Enum(ActionType), nullable=False)
+    units = Column(Integer, default=1) # Places API calls caused by the action
     timestamp = Column(DateTime, default=datetime.utcnow)
     
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"))
+
+    __table_args__ = (
+        Index("ix_usage_logs_tenant_time", "tenant_id", "timestamp"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, Integer, ForeignKey, DateTime, JSON, BigInteger, Boolean
+from sqlalchemy import Column, String, Float, Integer, ForeignKey, DateTime, JSON, BigInteger, Boolean, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -9,7 +9,9 @@ class Business(Base):
     __tablename__ = "businesses"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    google_place_id = Column(String, index=True, nullable=False)
+    google_place_id = Column(String, ForeignKey("places.google_place_id"), index=True, nullable=False)
+    place = relationship("Place", back_populates="businesses")
+    # Copies of the canonical place, kept in sync by the place refresh
     name = Column(String, nullable=False)
     address = Column(String)
     total_rating = Column(Float)
@@ -31,6 +33,8 @@ class Business(Base):
     health_score = Column(Float, default=0.0)
     profile_completeness = Column(Float, default=0.0)
     last_audit_date = Column(DateTime)
+    # Version marker of the row (conditional GETs of the business list)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 class Keyword(Base):
     __tablename__ = "keywords"
@@ -71,3 +75,8 @@ class Alert(Base):
     
     business_id = Column(UUID(as_uuid=True), ForeignKey("businesses.id", ondelete="CASCADE"))
     business = relationship("Business", back_populates="alerts")
+
+    __table_args__ = (
+        # Unread alerts only: the unread counter and the duplicate check never look at read ones
+        Index("ix_alerts_unread", "business_id", postgresql_where=text("is_read = false")),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, Integer, ForeignKey, DateTime, JSON, Boolean
+from sqlalchemy import Column, String, Float, Integer, ForeignKey, DateTime, JSON, Boolean, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -12,7 +12,9 @@ class Competitor(Base):
     business_id = Column(UUID(as_uuid=True), ForeignKey("businesses.id", ondelete="CASCADE"), nullable=False)
     
     # Mirroring some Google Data for easy access without constant API calls
-    google_place_id = Column(String, nullable=False)
+    # (copied from the canonical place by the place refresh)
+    google_place_id = Column(String, ForeignKey("places.google_place_id"), nullable=False)
+    place = relationship("Place", back_populates="competitors")
     name = Column(String, nullable=False)
     address = Column(String)
     rating = Column(Float)
@@ -32,3 +34,8 @@ class Competitor(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     business = relationship("Business", back_populates="competitors", foreign_keys=[business_id])
+
+    __table_args__ = (
+        # Target of the discovery upsert (ON CONFLICT)
+        UniqueConstraint("business_id", "google_place_id", name="uq_competitors_business_place"),
+    )
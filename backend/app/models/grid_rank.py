@@ -1,10 +1,16 @@
-from sqlalchemy import Column, String, Float, Integer, ForeignKey, DateTime, JSON
+from sqlalchemy import Column, String, Float, Integer, ForeignKey, DateTime, JSON, Boolean, Enum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
+import enum
 from datetime import datetime
 from .base import Base
 
+class ScanCadence(str, enum.Enum):
+    DAILY = "DAILY"
+    WEEKLY = "WEEKLY"
+    MONTHLY = "MONTHLY"
+
 class GridRankSnapshot(Base):
     __tablename__ = "grid_rank_snapshots"
 
@@ -17,6 +23,7 @@ class GridRankSnapshot(Base):
     center_lng = Column(Float, nullable=False)
     average_rank = Column(Float, nullable=True)
     visibility_score = Column(Float, nullable=True)
+    schedule_id = Column(UUID(as_uuid=True), ForeignKey("grid_scan_schedules.id", ondelete="SET NULL"), nullable=True) # Null = on-demand scan
     created_at = Column(DateTime, default=datetime.utcnow)
 
     business = relationship("Business", back_populates="grid_snapshots")
@@ -34,3 +41,21 @@ class GridPointRank(Base):
     point_metadata = Column(JSON, nullable=True) # Extra info like competitor ratings at this spot
 
     snapshot = relationship("GridRankSnapshot", back_populates="points")
+
+class GridScanSchedule(Base):
+    __tablename__ = "grid_scan_schedules"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
+    business_id = Column(UUID(as_uuid=True), ForeignKey("businesses.id", ondelete="CASCADE"), nullable=False)
+    keyword = Column(String, nullable=False)
+    radius_km = Column(Float, default=1.0)
+    grid_size = Column(Integer, default=5)
+    cadence = Column(Enum(ScanCadence), default=ScanCadence.WEEKLY)
+    is_active = Column(Boolean, default=True)
+    next_run_at = Column(DateTime, default=datetime.utcnow, index=True)
+    last_run_at = Column(DateTime, nullable=True)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    business = relationship("Business")
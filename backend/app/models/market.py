@@ -0,0 +1,65 @@
+from sqlalchemy import Column, String, Float, Integer, ForeignKey, DateTime, JSON, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from datetime import datetime
+from .base import Base
+
+class MarketSweep(Base):
+    __tablename__ = "market_sweeps"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    city = Column(String, nullable=False, index=True) # normalized city name
+    center_lat = Column(Float, nullable=False)
+    center_lng = Column(Float, nullable=False)
+    radius_km = Column(Float, nullable=False)
+    cell_meters = Column(Integer, nullable=False)
+    types = Column(JSON, nullable=False) # ["restaurant", "cafe", ...] searched in every cell
+
+    # Resumable progress: tasks are (type, cell) pairs in a fixed order, checkpoint = next task
+    status = Column(String, default="pending") # pending, running, paused, done, failed
+    total_tasks = Column(Integer, default=0)
+    checkpoint = Column(Integer, default=0)
+    locked_until = Column(DateTime, nullable=True) # lease of the worker running it
+    error = Column(String, nullable=True)
+    # Searches whose cell had to be split, and those still saturated at the smallest cell size
+    split_tasks = Column(Integer, default=0)
+    saturated_tasks = Column(Integer, default=0)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+class MarketSweepPlace(Base):
+    __tablename__ = "market_sweep_places"
+
+    # Places a sweep found per category (searched type)
+    sweep_id = Column(UUID(as_uuid=True), ForeignKey("market_sweeps.id", ondelete="CASCADE"), primary_key=True)
+    category = Column(String, primary_key=True)
+    google_place_id = Column(String, ForeignKey("places.google_place_id"), primary_key=True)
+
+class SectorBenchmark(Base):
+    __tablename__ = "sector_benchmarks"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    category = Column(String, nullable=False) # Google place type
+    city = Column(String, nullable=False) # normalized city name
+    center_lat = Column(Float)
+    center_lng = Column(Float)
+    radius_km = Column(Float)
+
+    sample_size = Column(Integer, default=0)
+    avg_rating = Column(Float)
+    avg_reviews = Column(Float)
+    avg_response_rate = Column(Float)
+    avg_velocity = Column(Float)
+    # { "p10": 3.9, "p25": 4.1, "p50": 4.4, "p75": 4.6, "p90": 4.8 }
+    rating_quantiles = Column(JSON)
+    review_quantiles = Column(JSON)
+
+    sweep_id = Column(UUID(as_uuid=True), ForeignKey("market_sweeps.id", ondelete="SET NULL"), nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # One row per (category, city); also the index of the benchmark lookups
+        UniqueConstraint("category", "city", name="uq_sector_benchmarks_category_city"),
+    )
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, Integer, DateTime, JSON
+from datetime import datetime
+from .base import Base
+
+class PlaceMetricSeries(Base):
+    __tablename__ = "place_metric_series"
+
+    google_place_id = Column(String, primary_key=True)
+
+    # Ring buffers of daily samples: slot = day ordinal % length, null = no sample that day
+    last_day = Column(Integer) # date.toordinal() of the newest sample
+    review_totals = Column(JSON)
+    ratings = Column(JSON)
+    photo_counts = Column(JSON)
+
+    # Rolling deltas recomputed on every sample
+    # { "reviews_7d": 4, "reviews_30d": 15.0, "reviews_90d": 41, "rating_30d": 0.1, "photos_30d": 2, ... }
+    deltas = Column(JSON)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, String, Float, Integer, DateTime, JSON
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from .base import Base
+
+class Place(Base):
+    __tablename__ = "places"
+
+    # One row per Google place, shared by every tenant that tracks it (as a Business or a Competitor)
+    google_place_id = Column(String, primary_key=True)
+    name = Column(String)
+    address = Column(String)
+    rating = Column(Float)
+    review_count = Column(Integer)
+    photo_count = Column(Integer)
+    types = Column(JSON) # ["restaurant", "food", ...]
+    lat = Column(Float)
+    lng = Column(Float)
+    region = Column(String, index=True) # "country/city/district", see benchmark_sketches.parse_region
+    score = Column(Float) # MapRank score from the details alone, as counted in the benchmark sketches
+
+    # Latest normalized Place Details payload (null for places only seen in search results)
+    details = Column(JSON)
+    content_hash = Column(String) # sha1 of the stable part of `details`
+    fetched_at = Column(DateTime, index=True)
+    changed_at = Column(DateTime, index=True) # last fetch where content_hash changed
+
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+    businesses = relationship("Business", back_populates="place")
+    competitors = relationship("Competitor", back_populates="place")
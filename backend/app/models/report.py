@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, DateTime, JSON
+from sqlalchemy import Column, String, ForeignKey, DateTime, JSON, BigInteger, Integer, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -10,8 +10,47 @@ class Report(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String, nullable=False)
-    content_json = Column(JSON, nullable=False)
+    content_json = Column(JSON, nullable=False) # Data rendered into the document
     created_at = Column(DateTime, default=datetime.utcnow)
     
     business_id = Column(UUID(as_uuid=True), ForeignKey("businesses.id", ondelete="CASCADE"), nullable=False)
     business = relationship("Business", backref="reports")
+
+    # Rendered PDF cache: a ready report is reused while (business, ranking, grid snapshot, template) is unchanged
+    ranking_id = Column(BigInteger, nullable=True)
+    snapshot_id = Column(UUID(as_uuid=True), nullable=True) # latest grid scan, drawn as the heatmap
+    template_version = Column(String, nullable=True)
+    status = Column(String, default="pending") # pending, ready, failed
+    file_path = Column(String, nullable=True)
+    error = Column(String, nullable=True)
+    rendered_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_reports_cache_key", "business_id", "ranking_id", "template_version"),
+        # One live (pending or ready) report per cache key; the key columns may be NULL
+        Index(
+            "uq_reports_cache_key", "business_id",
+            text("coalesce(ranking_id, 0)"),
+            text("coalesce(snapshot_id, '00000000-0000-0000-0000-000000000000'::uuid)"),
+            text("coalesce(template_version, '')"),
+            unique=True, postgresql_where=text("status IN ('pending', 'ready')")
+        ),
+    )
+
+class ReportExport(Base):
+    __tablename__ = "report_exports"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False, index=True)
+    business_ids = Column(JSON, nullable=False) # ["<uuid>", ...] in output order
+    output_format = Column(String, default="zip") # zip, pdf (one merged document)
+
+    # Progress tracking
+    status = Column(String, default="pending") # pending, running, ready, failed
+    total = Column(Integer, default=0)
+    completed = Column(Integer, default=0)
+    file_path = Column(String, nullable=True)
+    error = Column(String, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
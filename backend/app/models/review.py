@@ -0,0 +1,37 @@
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, JSON, Index, UniqueConstraint
+from datetime import datetime
+from .base import Base
+
+class Review(Base):
+    __tablename__ = "reviews"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    google_place_id = Column(String, nullable=False)
+
+    # Natural key from Google: a review is identified by (place, author, time)
+    author_name = Column(String, nullable=False)
+    time = Column(BigInteger, nullable=False) # Unix epoch seconds as returned by Places API
+    rating = Column(Integer)
+    text = Column(String, default="")
+    language = Column(String)
+    relative_time_description = Column(String)
+    profile_photo_url = Column(String)
+
+    # Precomputed at ingestion so widgets never re-run the text analysis
+    sentiment = Column(String) # positive, neutral, negative
+    tokens = Column(JSON) # ["lezzetli", "hizmet", ...]
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("google_place_id", "author_name", "time", name="uq_reviews_place_author_time"),
+        Index("ix_reviews_place_time", "google_place_id", "time"),
+    )
+
+class ReviewSyncState(Base):
+    __tablename__ = "review_sync_states"
+
+    # One row per place: the newest review time ingested so far (high-water mark)
+    google_place_id = Column(String, primary_key=True)
+    last_review_time = Column(BigInteger, default=0)
+    last_synced_at = Column(DateTime, default=datetime.utcnow)
@@ -4,6 +4,6 @@ from .tenant import Tenant, TenantCreate, TenantUpdate
 from .business import Business, BusinessCreate, BusinessSearchResult, BusinessAnalysis, Keyword, KeywordCreate, Ranking, Alert, AlertCreate
 from .billing import Subscription, UsageLog
 from .review import Review, ReviewBase, ReplyDraftRequest, ReplyDraftResponse
-from .report import Report, ReportCreate
-from .grid_rank import GridPointOutput, GridRankSnapshot, GridRankHistory
-from .ai_expansion import SEOAuditOutput, CompetitorOutput, AIPredictionOutput, DescriptionRequest, DescriptionResponse
+from .report import Report, ReportCreate, ReportExport, ReportExportCreate
+from .grid_rank import GridPointOutput, GridRankSnapshot, GridRankHistory, GridDiffPoint, GridDiff, GridScanScheduleCreate, GridScanSchedule
+from .ai_expansion import SEOAuditOutput, CompetitorOutput, AIPredictionOutput, DescriptionRequest, DescriptionResponse, MarketSweepCreate, MarketSweepOutput
@@ -60,3 +60,32 @@ class DescriptionRequest(BaseModel):
 
 class DescriptionResponse(BaseModel):
     description: str
+
+# --- Market Sweep Schemas ---
+class MarketSweepCreate(BaseModel):
+    city: str
+    center_lat: float
+    center_lng: float
+    radius_km: float = Field(10.0, gt=0, le=50)
+    types: Optional[List[str]] = None # default: every sector type
+    cell_meters: Optional[int] = Field(None, ge=250, le=5000)
+
+class MarketSweepOutput(BaseModel):
+    id: UUID
+    city: str
+    center_lat: float
+    center_lng: float
+    radius_km: float
+    cell_meters: int
+    types: List[str]
+    status: str
+    total_tasks: int
+    checkpoint: int
+    split_tasks: int = 0
+    saturated_tasks: int = 0
+    error: Optional[str]
+    created_at: datetime
+    finished_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
@@ -20,6 +20,7 @@ class Subscription(SubscriptionBase):
 
 class UsageLogBase(BaseModel):
     action_type: ActionType
+    units: int = 1
     timestamp: datetime = datetime.utcnow()
     tenant_id: UUID
 
@@ -59,11 +59,12 @@ class Recommendation(BaseModel):
     message: str
 
 class BusinessAnalysis(BaseModel):
+    # Fields outside the requested sections keep their defaults (see ranking_engine.SECTIONS)
     score: float
     metrics: dict
-    targets: dict
-    recommendations: List[Recommendation]
-    analysis_text: str
+    targets: Optional[dict] = None
+    recommendations: List[Recommendation] = []
+    analysis_text: Optional[str] = None
     formatted_address: Optional[str] = None
     formatted_phone_number: Optional[str] = None
     website: Optional[str] = None
@@ -80,15 +81,22 @@ class BusinessAnalysis(BaseModel):
     photo_count: Optional[int] = 0
     profile_completeness_percent: Optional[float] = 0.0
     keyword_relevance_score: Optional[float] = 0.0
+    review_delta_7d: Optional[float] = None
+    review_delta_90d: Optional[float] = None
+    rating_delta_30d: Optional[float] = None
+    photo_delta_30d: Optional[float] = None
     competitor_keywords: Optional[List[Dict[str, Any]]] = None
     
     # Premium Fields
     sentiment_trends: Optional[List[Dict[str, Any]]] = None
     visibility_score: Optional[float] = None
     market_share_estimate: Optional[float] = None
-    growth_hacks: Optional[List[str]] = None
+    # Content catalog references ({"id", "params"}), resolved against GET /catalog
+    growth_hacks: Optional[List[Dict[str, Any]]] = None
     sector_benchmarks: Optional[Dict[str, Any]] = None
-    growth_ideas: Optional[List[str]] = None
+    percentiles: Optional[Dict[str, Any]] = None
+    growth_ideas: Optional[List[Dict[str, Any]]] = None
+    catalog_version: Optional[str] = None
     strategic_insights: Optional[Dict[str, Any]] = None
     business_types: Optional[List[str]] = None
 
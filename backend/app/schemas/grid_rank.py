@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
@@ -33,3 +33,50 @@ class GridRankSnapshot(GridRankBase):
 
 class GridRankHistory(BaseModel):
     snapshots: List[GridRankSnapshot]
+
+class GridDiffPoint(BaseModel):
+    lat: float
+    lng: float
+    from_rank: Optional[float]
+    to_rank: Optional[float]
+    rank_delta: float # > 0 = moved up
+    from_winner: Optional[str]
+    to_winner: Optional[str]
+
+class GridDiff(BaseModel):
+    from_snapshot_id: UUID
+    to_snapshot_id: UUID
+    keyword_changed: bool
+    resampled: bool
+    compared_points: int
+    improved_points: int
+    declined_points: int
+    average_rank_delta: float
+    visibility_delta: float
+    gained_cells: int
+    lost_cells: int
+    winner_changes: int
+    points: List[GridDiffPoint]
+
+class GridScanScheduleCreate(BaseModel):
+    business_id: UUID
+    keyword: str
+    radius_km: float = Field(1.0, gt=0, lt=10)
+    grid_size: int = Field(5, ge=3, le=9)
+    cadence: str = "WEEKLY" # DAILY, WEEKLY, MONTHLY
+
+class GridScanSchedule(BaseModel):
+    id: UUID
+    business_id: UUID
+    keyword: str
+    radius_km: float
+    grid_size: int
+    cadence: str
+    is_active: bool
+    next_run_at: datetime
+    last_run_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
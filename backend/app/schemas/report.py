@@ -13,7 +13,31 @@ class ReportCreate(ReportBase):
 class Report(ReportBase):
     id: UUID
     created_at: datetime
-    content_json: Dict[str, Any]
+    content_json: Optional[Dict[str, Any]] = None
+    ranking_id: Optional[int] = None
+    snapshot_id: Optional[UUID] = None
+    template_version: Optional[str] = None
+    status: str = "pending" # pending, ready, failed
+    error: Optional[str] = None
+    rendered_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class ReportExportCreate(BaseModel):
+    business_ids: Optional[List[UUID]] = None # None = every business of the tenant
+    output_format: str = "zip" # zip, pdf
+
+class ReportExport(BaseModel):
+    id: UUID
+    business_ids: List[UUID]
+    output_format: str
+    status: str
+    total: int = 0
+    completed: int = 0
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -4,8 +4,8 @@ from typing import Optional, List
 class ReviewBase(BaseModel):
     author_name: str
     rating: int
-    text: str
-    relative_time_description: str
+    text: str = ""
+    relative_time_description: Optional[str] = None
     time: int
     profile_photo_url: Optional[str] = None
 
@@ -13,6 +13,9 @@ class Review(ReviewBase):
     sentiment: Optional[str] = "neutral" # positive, negative, neutral
     reply_draft: Optional[str] = None
 
+    class Config:
+        from_attributes = True
+
 class ReplyDraftRequest(BaseModel):
     review_text: str
     rating: int
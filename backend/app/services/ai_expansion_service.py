@@ -2,12 +2,22 @@ import logging
 from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
 from app import models, schemas
-from app.services.google_maps import google_maps_service
 from app.services.ranking_engine import ranking_engine
-from datetime import datetime
+from app.services.place_summary import GENERIC_TYPES, PlaceSummary
+from app.services.metrics_service import metrics_service
+from app.services.place_store import place_store
+from app.services.place_index import place_index
+from app.core.config import settings
+from sqlalchemy import func, update, bindparam
+from sqlalchemy.dialects.postgresql import insert
+from datetime import datetime, timedelta
+import uuid
 
 logger = logging.getLogger(__name__)
 
+# Assumed metrics for competitors we only know from a nearby search
+BASELINE_METRICS = {"owner_response_rate": 70, "review_velocity_30d": 5, "photo_count": 10, "profile_completeness_percent": 80, "keyword_relevance_score": 75}
+
 class SEOAuditService:
     def run_audit(self, db: Session, business: models.Business) -> models.SEOAudit:
         """
@@ -15,8 +25,8 @@ class SEOAuditService:
         """
         logger.info(f"Running SEO Audit for business: {business.name}")
         
-        # 1. Fetch full data from Google
-        details = google_maps_service.get_place_details(business.google_place_id)
+        # 1. Full data from the place store (fetched from Google when older than the max age)
+        details = place_store.get(db, business.google_place_id, timedelta(minutes=settings.PLACE_DETAILS_MAX_AGE_MINUTES))
         if not details:
             raise Exception("Could not fetch business details for audit")
             
@@ -95,8 +105,8 @@ class CompetitorService:
         logger.info(f"Auto-discovering competitors for: {business.name}")
         
         # 1. Get business location
-        details = google_maps_service.get_place_details(business.google_place_id)
-        location = details.get("geometry", {}).get("location")
+        details = place_store.get(db, business.google_place_id, timedelta(minutes=settings.PLACE_DETAILS_MAX_AGE_MINUTES))
+        location = (details or {}).get("geometry", {}).get("location")
         
         if not location:
             logger.warning(f"No location found for business {business.id}")
@@ -104,46 +114,127 @@ class CompetitorService:
             
         # 2. Search nearby
         types = details.get("types", [])
-        primary_type = next((t for t in types if t not in {"point_of_interest", "establishment", "premise"}), None)
+        primary_type = next((t for t in types if t not in GENERIC_TYPES), None)
         
-        raw_competitors = google_maps_service.search_nearby(
+        raw_competitors = place_index.search_nearby(
             location=location,
             type=primary_type,
             radius=3000 # 3km radius
         )
         
-        added_competitors = []
-        for comp_data in raw_competitors:
-            # Skip self
-            if comp_data["google_place_id"] == business.google_place_id:
+        return self.upsert_competitors(db, business, raw_competitors)
+
+    def upsert_competitors(self, db: Session, business: models.Business, places: List[PlaceSummary]) -> List[models.Competitor]:
+        """
+        Tracks the given places as competitors of a business in one INSERT ... ON CONFLICT.
+        Competitors that already exist get their rating/review_count/visibility_score refreshed,
+        so rediscovery doubles as a competitor refresh.
+        """
+        now = datetime.utcnow()
+        rows = {}
+        for comp_data in places:
+            # Skip self (and duplicates, a row may only be touched once per statement)
+            if comp_data.google_place_id == business.google_place_id or comp_data.google_place_id in rows:
                 continue
                 
-            # Check if already exists for this business
-            existing = db.query(models.Competitor).filter(
-                models.Competitor.business_id == business.id,
-                models.Competitor.google_place_id == comp_data["google_place_id"]
-            ).first()
+            # Heuristic Analysis for Discovery Type
+            # In a real app, we would fetch full details for each, but let's be efficient
+            rows[comp_data.google_place_id] = {
+                "id": uuid.uuid4(),
+                "business_id": business.id,
+                "google_place_id": comp_data.google_place_id,
+                "name": comp_data.name,
+                "address": comp_data.address,
+                "rating": comp_data.rating,
+                "review_count": comp_data.user_ratings_total,
+                "discovery_type": "auto",
+                "is_tracked": True,
+                "visibility_score": ranking_engine.calculate_score(comp_data.to_dict(), BASELINE_METRICS),
+                "created_at": now,
+                "updated_at": now
+            }
+        
+        if not rows:
+            return []
             
-            if not existing:
-                # Heuristic Analysis for Discovery Type
-                # In a real app, we would fetch full details for each, but let's be efficient
-                competitor = models.Competitor(
-                    business_id=business.id,
-                    google_place_id=comp_data["google_place_id"],
-                    name=comp_data["name"],
-                    address=comp_data.get("address"),
-                    rating=comp_data.get("rating"),
-                    review_count=comp_data.get("user_ratings_total", 0),
-                    discovery_type="auto",
-                    is_tracked=True,
-                    visibility_score=ranking_engine.calculate_score(comp_data, {"owner_response_rate": 70, "review_velocity_30d": 5, "photo_count": 10, "profile_completeness_percent": 80, "keyword_relevance_score": 75}) # Baseline score
-                )
-                db.add(competitor)
-                added_competitors.append(competitor)
-                
+        # Competitor rows reference the canonical place
+        place_store.ensure(db, places)
+        stmt = insert(models.Competitor).values(list(rows.values()))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["business_id", "google_place_id"],
+            set_={
+                "name": stmt.excluded.name,
+                "address": stmt.excluded.address,
+                "rating": stmt.excluded.rating,
+                "review_count": stmt.excluded.review_count,
+                "visibility_score": stmt.excluded.visibility_score,
+                "updated_at": stmt.excluded.updated_at
+            }
+        ).returning(models.Competitor)
+        
+        competitors = db.scalars(stmt).all()
         db.commit()
-        logger.info(f"Auto-tracked {len(added_competitors)} new competitors for {business.name}")
-        return added_competitors
+        logger.info(f"Upserted {len(competitors)} competitors for {business.name}")
+        return competitors
+
+    def refresh_tracked_competitors(self, db: Session, batch_size: int = 100) -> int:
+        """
+        Refreshes the stored metrics of every tracked competitor.
+        A popular place is tracked by many businesses (across tenants), so each unique
+        google_place_id is read once from the place store (which fetches it only when older
+        than COMPETITOR_REFRESH_HOURS) and the result is fanned out to all its rows.
+        """
+        cutoff = datetime.utcnow() - timedelta(hours=settings.COMPETITOR_REFRESH_HOURS)
+        place_ids = [row[0] for row in db.query(models.Competitor.google_place_id).filter(
+            models.Competitor.is_tracked == True
+        ).group_by(models.Competitor.google_place_id).having(
+            func.min(models.Competitor.updated_at) < cutoff
+        ).all()]
+        
+        logger.info(f"Refreshing {len(place_ids)} unique competitor places")
+        
+        refreshed = 0
+        max_age = timedelta(hours=settings.COMPETITOR_REFRESH_HOURS)
+        for start in range(0, len(place_ids), batch_size):
+            batch = place_ids[start:start + batch_size]
+            details_by_place = place_store.get_many(db, batch, max_age)
+            
+            now = datetime.utcnow()
+            params = []
+            for place_id in batch:
+                details = details_by_place.get(place_id)
+                if not details:
+                    continue
+                deltas = metrics_service.get_deltas(db, place_id)
+                metrics = ranking_engine.calculate_advanced_metrics(details, series_deltas=deltas)
+                params.append({
+                    "place_id": place_id,
+                    "new_rating": details.get("rating"),
+                    "new_review_count": details.get("user_ratings_total", 0),
+                    "new_photo_count": metrics["photo_count"],
+                    "new_review_velocity_30d": metrics["review_velocity_30d"],
+                    "new_visibility_score": ranking_engine.calculate_score(details, metrics),
+                    "new_updated_at": now
+                })
+            
+            if params:
+                # One executemany UPDATE per batch, matching every row that tracks the place
+                stmt = update(models.Competitor.__table__).where(
+                    models.Competitor.__table__.c.google_place_id == bindparam("place_id")
+                ).values(
+                    rating=bindparam("new_rating"),
+                    review_count=bindparam("new_review_count"),
+                    photo_count=bindparam("new_photo_count"),
+                    review_velocity_30d=bindparam("new_review_velocity_30d"),
+                    visibility_score=bindparam("new_visibility_score"),
+                    updated_at=bindparam("new_updated_at")
+                )
+                db.execute(stmt, params)
+            db.commit()
+            refreshed += len(params)
+        
+        logger.info(f"Refreshed {refreshed}/{len(place_ids)} competitor places")
+        return refreshed
 
 seo_audit_service = SEOAuditService()
 competitor_service = CompetitorService()
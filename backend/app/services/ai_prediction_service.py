@@ -3,6 +3,7 @@ import random
 from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
 from app import models, schemas
+from app.core.observability import span
 from app.services.ranking_engine import ranking_engine
 
 logger = logging.getLogger(__name__)
@@ -63,6 +64,7 @@ class AIPredictionService:
         return prediction
 
 class SentimentIntelligenceService:
+    @span("engine", "extract_intelligence", cpu=True)
     def extract_intelligence(self, reviews: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         NLP Simulation to extract keywords and sentiment from reviews.
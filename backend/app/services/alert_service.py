@@ -0,0 +1,64 @@
+import logging
+from typing import Any, Dict, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app import models, schemas
+from app.core.redis import get_redis
+from app.core.responses import dumps
+
+logger = logging.getLogger(__name__)
+
+def alert_channel(tenant_id) -> str:
+    return f"alerts:{tenant_id}"
+
+class AlertService:
+    """
+    Creates alerts and pushes them, with the tenant's unread count, to a per-tenant
+    Redis channel that the /alerts/stream connections of the tenant subscribe to.
+    Publishing is best effort: when Redis is down the alert is still stored.
+    """
+
+    def create(self, db: Session, business: models.Business, type: str, title: str, message: str) -> Optional[models.Alert]:
+        """
+        Stores and publishes an alert. Returns None when the same alert is still unread
+        (periodic checks keep finding the same condition until it changes).
+        """
+        duplicate = db.query(models.Alert.id).filter(
+            models.Alert.business_id == business.id,
+            models.Alert.is_read == False,
+            models.Alert.message == message
+        ).first()
+        if duplicate:
+            return None
+
+        alert = models.Alert(business_id=business.id, type=type, title=title, message=message)
+        db.add(alert)
+        db.commit()
+        db.refresh(alert)
+        self._publish(business.tenant_id, {
+            "type": "alert",
+            "alert": schemas.Alert.model_validate(alert).model_dump(),
+            "unread_count": self.unread_count(db, business.tenant_id)
+        })
+        return alert
+
+    def unread_count(self, db: Session, tenant_id) -> int:
+        # Served from the ix_alerts_unread partial index
+        return db.query(func.count(models.Alert.id)).join(models.Business).filter(
+            models.Business.tenant_id == tenant_id,
+            models.Alert.is_read == False
+        ).scalar() or 0
+
+    def publish_unread_count(self, db: Session, tenant_id) -> None:
+        """
+        Tells the tenant's streams that the unread count changed (alerts were read).
+        """
+        self._publish(tenant_id, {"type": "unread", "unread_count": self.unread_count(db, tenant_id)})
+
+    def _publish(self, tenant_id, event: Dict[str, Any]) -> None:
+        try:
+            get_redis().publish(alert_channel(tenant_id), dumps(event))
+        except Exception as e:
+            logger.warning(f"Could not publish alert event for tenant {tenant_id}: {e}")
+
+alert_service = AlertService()
@@ -0,0 +1,410 @@
+import bisect
+import logging
+import math
+import re
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple, Iterable
+from sqlalchemy.orm import Session
+from app import models
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.services.place_summary import GENERIC_TYPES
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "sketch"
+METRICS = ("rating", "reviews", "score")
+QUANTILES = (10, 25, 50, 75, 90)
+
+def normalize_region(name: str) -> str:
+    # Turkish dotted/dotless I would otherwise lowercase to "i̇" / "i"
+    name = (name or "").replace("İ", "i").replace("I", "ı")
+    return " ".join(name.lower().split())
+
+class LinearBins:
+    """
+    Equal-width bins over [low, high]; values outside are clamped.
+    """
+    def __init__(self, low: float, high: float, step: float):
+        self.low, self.step = low, step
+        self.size = int(round((high - low) / step)) + 1
+
+    def index(self, value: float) -> int:
+        return min(self.size - 1, max(0, int(round((value - self.low) / self.step))))
+
+    def value(self, index: int) -> float:
+        return round(self.low + index * self.step, 6)
+
+class LogBins:
+    """
+    Bin 0 holds zero, bin k >= 1 holds [growth^(k-1), growth^k): a fixed relative error for counts.
+    """
+    def __init__(self, growth: float, high: float):
+        self.log_growth = math.log(growth)
+        self.size = int(math.log(high) / self.log_growth) + 2
+
+    def index(self, value: float) -> int:
+        if value < 1:
+            return 0
+        return min(self.size - 1, 1 + int(math.log(value) / self.log_growth))
+
+    def value(self, index: int) -> float:
+        if index == 0:
+            return 0.0
+        # Geometric middle of the bin
+        return math.exp((index - 0.5) * self.log_growth)
+
+BINS = {
+    "rating": LinearBins(1.0, 5.0, 0.1), # Google ratings have one decimal: exact
+    "reviews": LogBins(1.05, 1_000_000), # within 5%
+    "score": LinearBins(0.0, 100.0, 0.5)
+}
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch of one metric: counts over fixed bins. Two sketches of the same
+    metric merge by adding their counts, so district sketches add up to their city's and the
+    cities' to the country's, and a changed value is moved by -1/+1 on two bins. Quantile and
+    percentile-rank queries cost O(bins), independent of how many places were added.
+    """
+    __slots__ = ("metric", "bins", "counts", "_cumulative")
+
+    def __init__(self, metric: str, counts: Optional[List[int]] = None):
+        self.metric = metric
+        self.bins = BINS[metric]
+        self.counts = counts or [0] * self.bins.size
+        self._cumulative: Optional[List[int]] = None
+
+    @property
+    def total(self) -> int:
+        return self.cumulative[-1]
+
+    @property
+    def cumulative(self) -> List[int]:
+        if self._cumulative is None:
+            running, cumulative = 0, []
+            for count in self.counts:
+                running += count
+                cumulative.append(running)
+            self._cumulative = cumulative
+        return self._cumulative
+
+    def add(self, value: float, weight: int = 1) -> None:
+        self.counts[self.bins.index(value)] += weight
+        self._cumulative = None
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self._cumulative = None
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Value below which a fraction q of the places fall.
+        """
+        total = self.total
+        if total <= 0:
+            return None
+        index = bisect.bisect_left(self.cumulative, max(1, math.ceil(q * total)))
+        return self.bins.value(min(index, self.bins.size - 1))
+
+    def percentile_rank(self, value: float) -> Optional[float]:
+        """
+        Share of the places (in %) below value, counting half of its own bin (mid-rank).
+        """
+        total = self.total
+        if total <= 0:
+            return None
+        index = self.bins.index(value)
+        below = self.cumulative[index - 1] if index > 0 else 0
+        return round(100.0 * (below + 0.5 * self.counts[index]) / total, 1)
+
+    def to_mapping(self) -> Dict[int, int]:
+        # Sparse: most bins of a small region are empty
+        return {i: c for i, c in enumerate(self.counts) if c}
+
+    @classmethod
+    def from_mapping(cls, metric: str, mapping: Dict[Any, Any]) -> "QuantileSketch":
+        sketch = cls(metric)
+        for index, count in mapping.items():
+            index = int(index)
+            if 0 <= index < sketch.bins.size:
+                # Moves racing a rebuild can leave a bin slightly negative
+                sketch.counts[index] = max(0, int(count))
+        return sketch
+
+def parse_region(details: Optional[Dict[str, Any]] = None, address: Optional[str] = None, city: Optional[str] = None) -> Optional[str]:
+    """
+    "country/city/district" of a place (unknown parts empty), from the address components of a
+    Place Details payload, else from a Turkish formatted address ("..., 34710 Kadıköy/İstanbul, Türkiye").
+    `city` (e.g. of the market sweep that found the place) fills in a city the address lacks.
+    """
+    country = district = ""
+    found_city = ""
+    components = (details or {}).get("address_components") or []
+    for component in components:
+        types = component.get("types") or []
+        if "country" in types:
+            country = component.get("long_name", "")
+        elif "administrative_area_level_1" in types:
+            found_city = component.get("long_name", "")
+        elif "administrative_area_level_2" in types:
+            district = component.get("long_name", "")
+
+    address = address or (details or {}).get("formatted_address")
+    if not components and address:
+        parts = [p.strip() for p in address.split(",")]
+        if len(parts) >= 2 and "/" in parts[-2]:
+            country = parts[-1]
+            district, _, found_city = re.sub(r"^\d{5}\s*", "", parts[-2]).rpartition("/")
+        elif city and len(parts) >= 2:
+            # Nearby Search vicinity: "street, district"
+            district = parts[-1]
+
+    found_city = normalize_region(found_city) or normalize_region(city)
+    if not found_city:
+        return None
+    return "/".join((normalize_region(country), found_city, normalize_region(district)))
+
+def region_keys(region: Optional[str]) -> List[Tuple[str, str]]:
+    """
+    (level, name) of every level a region rolls up to, finest first. Districts are
+    named within their city, since district names repeat across cities.
+    """
+    if not region:
+        return []
+    country, city, district = (region.split("/") + ["", "", ""])[:3]
+    keys = []
+    if city and district:
+        keys.append(("district", f"{city}/{district}"))
+    if city:
+        keys.append(("city", city))
+    if country:
+        keys.append(("country", country))
+    return keys
+
+def location_region(location: str) -> Optional[str]:
+    """
+    Region of a free-text location: "Kadıköy/İstanbul" (a district) or "İstanbul" (a city).
+    """
+    district, _, city = (location or "").rpartition("/")
+    if not normalize_region(city):
+        return None
+    return f"/{normalize_region(city)}/{normalize_region(district)}"
+
+def place_categories(types: Optional[Iterable[str]]) -> List[str]:
+    return [t for t in types or () if t not in GENERIC_TYPES]
+
+def place_score(details: Dict[str, Any]) -> Optional[float]:
+    """
+    MapRank score of a place from its details alone (no review corpus or metric series).
+    """
+    if not details.get("rating"):
+        return None
+    from app.services.ranking_engine import ranking_engine
+    return ranking_engine.calculate_score(details, ranking_engine.calculate_advanced_metrics(details))
+
+class SketchEntry:
+    """
+    What one place contributes to the sketches.
+    """
+    __slots__ = ("categories", "region", "values")
+
+    def __init__(self, types: Optional[Iterable[str]], region: Optional[str], rating: Optional[float], review_count: Optional[int], score: Optional[float]):
+        self.categories = place_categories(types)
+        self.region = region
+        # Unrated places have nothing to compare against
+        self.values = {}
+        if rating:
+            self.values = {"rating": rating, "reviews": review_count or 0}
+            if score is not None:
+                self.values["score"] = score
+
+    def bins(self) -> Dict[str, int]:
+        """
+        Redis key -> bin index of every bin this place counts in.
+        """
+        result = {}
+        for category in self.categories:
+            for level, name in region_keys(self.region):
+                for metric, value in self.values.items():
+                    result[sketch_key(metric, category, level, name)] = BINS[metric].index(value)
+        return result
+
+def sketch_key(metric: str, category: str, level: str, name: str) -> str:
+    return f"{KEY_PREFIX}:{metric}:{category}:{level}:{name}"
+
+class BenchmarkSketchService:
+    """
+    Per-(category, region) quantile sketches of rating, review count and MapRank score, so that
+    "83rd percentile among dentists in Kadıköy" is a read of three small hashes instead of a
+    sort over every place. Sketches live in Redis hashes (bin -> count) shared by API and workers:
+    the place store moves a place's bins with HINCRBY whenever the place changes, at every level
+    of its region at once. A periodic rebuild from the places table corrects the drift of
+    updates whose transaction rolled back.
+    """
+
+    def __init__(self):
+        self._cache: Dict[str, Tuple[float, QuantileSketch]] = {}
+        self._lock = threading.Lock()
+
+    def move(self, old: Optional[SketchEntry], new: Optional[SketchEntry]) -> None:
+        """
+        Replaces a place's old contribution by its new one. Never raises: an unreachable
+        Redis only delays the place until the next rebuild.
+        """
+        old_bins = old.bins() if old else {}
+        new_bins = new.bins() if new else {}
+        if old_bins == new_bins:
+            return
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            for key, index in old_bins.items():
+                if new_bins.get(key) != index:
+                    pipe.hincrby(key, index, -1)
+            for key, index in new_bins.items():
+                if old_bins.get(key) != index:
+                    pipe.hincrby(key, index, 1)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Benchmark sketches not updated: {str(e)}")
+
+    def get(self, metric: str, category: str, level: str, name: str) -> QuantileSketch:
+        """
+        A sketch as of at most BENCHMARK_SKETCH_CACHE_SECONDS ago (empty if unknown).
+        """
+        key = sketch_key(metric, category, level, name)
+        now = time.monotonic()
+        cached = self._cache.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+        try:
+            sketch = QuantileSketch.from_mapping(metric, get_redis().hgetall(key))
+        except Exception as e:
+            # Keep serving the last copy (or nothing) until the next attempt
+            logger.warning(f"Benchmark sketch {key} unavailable: {str(e)}")
+            sketch = cached[1] if cached else QuantileSketch(metric)
+        with self._lock:
+            self._cache[key] = (now + settings.BENCHMARK_SKETCH_CACHE_SECONDS, sketch)
+        return sketch
+
+    def lookup(self, category: str, region: Optional[str]) -> Optional[Tuple[str, str, Dict[str, QuantileSketch]]]:
+        """
+        (level, name, sketches by metric) of the finest level of the region with at least
+        BENCHMARK_SKETCH_MIN_SAMPLES rated places of the category.
+        """
+        for level, name in region_keys(region):
+            sketches = {metric: self.get(metric, category, level, name) for metric in METRICS}
+            if sketches["rating"].total >= settings.BENCHMARK_SKETCH_MIN_SAMPLES:
+                return level, name, sketches
+        return None
+
+    def percentiles(self, details: Dict[str, Any], values: Dict[str, float]) -> Optional[Dict[str, Any]]:
+        """
+        Percentile ranks of a place's values among the places of its category around it.
+        """
+        region = parse_region(details)
+        for category in place_categories(details.get("types")):
+            found = self.lookup(category, region)
+            if found:
+                level, name, sketches = found
+                result = {"category": category, "level": level, "region": name, "sample_size": sketches["rating"].total}
+                for metric, value in values.items():
+                    if value is not None and sketches[metric].total:
+                        result[metric] = sketches[metric].percentile_rank(value)
+                return result
+        return None
+
+    def percentiles_in(self, category: str, location: str, values: Dict[str, float]) -> Dict[str, Optional[float]]:
+        """
+        Percentile ranks of values among a category in a free-text location.
+        """
+        found = self.lookup(category, location_region(location))
+        if not found:
+            return {}
+        sketches = found[2]
+        return {metric: sketches[metric].percentile_rank(value) for metric, value in values.items() if value is not None}
+
+    def distribution(self, category: str, location: str) -> Optional[Dict[str, Any]]:
+        """
+        Quantiles of every metric of a category in a free-text location ("Kadıköy/İstanbul").
+        """
+        found = self.lookup(category, location_region(location))
+        if not found:
+            return None
+        level, name, sketches = found
+        return {
+            "level": level,
+            "region": name,
+            "sample_size": sketches["rating"].total,
+            "quantiles": {
+                metric: {f"p{q}": self._round(sketch.quantile(q / 100)) for q in QUANTILES}
+                for metric, sketch in sketches.items()
+            }
+        }
+
+    def _round(self, value: Optional[float]) -> Optional[float]:
+        return round(value, 1) if value is not None else None
+
+    def rebuild(self, db: Session) -> int:
+        """
+        Recomputes every sketch from the places table: one sketch per (category, region) is
+        filled from the places, then merged up into its city and country. Returns the number
+        of sketches written.
+        """
+        self._backfill(db)
+        leaves: Dict[Tuple[str, str, str], QuantileSketch] = {}
+        query = db.query(
+            models.Place.types, models.Place.region, models.Place.rating, models.Place.review_count, models.Place.score
+        ).filter(models.Place.region != None, models.Place.rating != None)
+        for types, region, rating, review_count, score in query.yield_per(5000):
+            entry = SketchEntry(types, region, rating, review_count, score)
+            for category in entry.categories:
+                for metric, value in entry.values.items():
+                    leaf = leaves.get((metric, category, region))
+                    if leaf is None:
+                        leaf = leaves[(metric, category, region)] = QuantileSketch(metric)
+                    leaf.add(value)
+
+        sketches: Dict[str, QuantileSketch] = {}
+        for (metric, category, region), leaf in leaves.items():
+            for level, name in region_keys(region):
+                key = sketch_key(metric, category, level, name)
+                if key in sketches:
+                    sketches[key].merge(leaf)
+                else:
+                    sketches[key] = QuantileSketch(metric).merge(leaf)
+
+        redis_client = get_redis()
+        stale = {key.decode() for key in redis_client.scan_iter(match=f"{KEY_PREFIX}:*", count=1000)} - set(sketches)
+        items = list(sketches.items())
+        for start in range(0, len(items), 500):
+            # Each key is swapped in one MULTI, readers never see it half written
+            pipe = redis_client.pipeline(transaction=True)
+            for key, sketch in items[start:start + 500]:
+                pipe.delete(key)
+                pipe.hset(key, mapping=sketch.to_mapping())
+            pipe.execute()
+        if stale:
+            redis_client.delete(*stale)
+        self._cache.clear()
+        logger.info(f"Benchmark sketches rebuilt: {len(sketches)} sketches from {len(leaves)} regions")
+        return len(sketches)
+
+    def _backfill(self, db: Session) -> None:
+        # Places stored before regions and scores were recorded
+        last_id = ""
+        while True:
+            batch = db.query(models.Place).filter(
+                models.Place.region == None, models.Place.details != None, models.Place.google_place_id > last_id
+            ).order_by(models.Place.google_place_id).limit(1000).all()
+            if not batch:
+                return
+            for place in batch:
+                place.region = parse_region(place.details)
+                place.score = place_score(place.details)
+            last_id = batch[-1].google_place_id
+            db.commit()
+
+benchmark_sketch_service = BenchmarkSketchService()
@@ -44,25 +44,53 @@ class CompetitorIntelligenceService:
             ]
         }
 
-    def get_benchmarks(self, category: str, location: str) -> Dict[str, Any]:
+    def get_benchmarks(self, db: Session, category: str, location: str, values: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
         """
-        Calculates industry/city averages.
+        City/industry averages from the latest market sweep of the city. When the city has
+        not been swept, the most sampled city of the category stands in for it.
+        The distribution (and the percentile ranks of `values`, e.g. {"rating": 4.6}) comes
+        from the benchmark sketches of the location, "Kadıköy/İstanbul" or "İstanbul".
         """
-        # Mocking sector data
-        sectors = {
-            "restaurant": {"rating": 4.2, "reviews": 150, "velocity": 8.5},
-            "furniture_store": {"rating": 4.5, "reviews": 85, "velocity": 3.2},
-            "health": {"rating": 4.7, "reviews": 210, "velocity": 12.0}
+        from app.services.market_sweep_service import market_sweep_service
+        from app.services.benchmark_sketches import benchmark_sketch_service
+        category = category.lower()
+        distribution = benchmark_sketch_service.distribution(category, location)
+        if distribution and values:
+            distribution["percentile_ranks"] = benchmark_sketch_service.percentiles_in(category, location, values)
+        benchmark = market_sweep_service.get_benchmark(db, category, city=location)
+        if not benchmark:
+            benchmark = db.query(models.SectorBenchmark).filter(
+                models.SectorBenchmark.category == category
+            ).order_by(models.SectorBenchmark.sample_size.desc()).first()
+
+        if not benchmark:
+            return {
+                "category": category,
+                "location": location,
+                "averages": None,
+                "market_competition": None,
+                "sample_size": 0,
+                "distribution": distribution,
+                "benchmark_text": f"{category} sektörü için henüz pazar taraması yapılmadı."
+            }
+
+        data = {
+            "rating": round(benchmark.avg_rating, 1),
+            "reviews": round(benchmark.avg_reviews),
+            "velocity": benchmark.avg_velocity,
+            "response_rate": benchmark.avg_response_rate
         }
-        
-        data = sectors.get(category.lower(), {"rating": 4.3, "reviews": 100, "velocity": 5.0})
-        
         return {
             "category": category,
             "location": location,
+            "benchmark_city": benchmark.city,
             "averages": data,
+            "quantiles": {"rating": benchmark.rating_quantiles, "reviews": benchmark.review_quantiles},
+            "sample_size": benchmark.sample_size,
+            "updated_at": benchmark.updated_at,
+            "distribution": distribution,
             "market_competition": "High" if data["velocity"] > 10 else "Medium",
-            "benchmark_text": f"{location} bölgesindeki {category} sektörü için ortalama puan {data['rating']}, aylık yorum hızı ise {data['velocity']}."
+            "benchmark_text": f"{benchmark.city} bölgesindeki {category} sektörü için ortalama puan {data['rating']}, aylık yorum hızı ise {data['velocity']} ({benchmark.sample_size} işletme)."
         }
 
 competitor_intelligence_service = CompetitorIntelligenceService()
@@ -0,0 +1,103 @@
+import hashlib
+import json
+from typing import Dict, Any
+
+# Growth hacks and industry ideas. Clients download them once as a versioned catalog
+# (GET /catalog); analyses only reference entries by id, with the values of their
+# {placeholders} in "params".
+CATALOG: Dict[str, str] = {
+    "hack.own.01": 'Google İşletme profilinize haftalık en az 3 fotoğraf ekleyin (Etkileşimi %35 artırır).',
+    "hack.own.02": 'Müşteri yorumlarına ilk 24 saat içinde yanıt verin; algoritma hızı sever.',
+    "hack.own.03": 'En popüler ürününüzü işletme açıklamasında stratejik olarak geçirin.',
+    "hack.own.04": "Bölgenizdeki rakiplerin yoğun olduğu saatlerde 'Google Post' paylaşarak öne çıkın.",
+    "hack.own.05": "Müşterilerinizden belirli anahtar kelimeleri (örn: 'lezzetli', 'hızlı') yorumlarında geçirmelerini rica edin.",
+    "hack.own.06": "Google Haritalar üzerinden gelen mesajlara 1 saat içinde dönerek 'Hızlı Yanıtlayıcı' rozeti kazanın.",
+    "hack.own.07": "Haftalık kampanya görselleri paylaşarak profilinizi 'Canlı' tutun.",
+    "hack.own.08": 'Yorum yapan her müşteriye mutlaka ismiyle hitap ederek kişiselleştirilmiş yanıt verin.',
+    "hack.own.09": 'İşletme kategorinizin altındaki tüm servis seçeneklerini (Paket servis, temassız vb.) işaretleyin.',
+    "hack.own.10": 'Web sitenizdeki verilerle Google My Business verilerini (NAP - Name, Address, Phone) eşitleyin.',
+    "hack.rival.01": '{name} isimli rakibi geçmek için yorum sayınızı onların üzerine çıkarın.',
+    "hack.rival.02": 'Bu rakibin en çok bahsedilen anahtar kelimelerini ({keyword}) kendi açıklamanızda kullanın.',
+    "hack.rival.03": "Rakipten daha güncel fotoğraflar yükleyerek Google'ın 'Yeni' algoritmasını tetikleyin.",
+    "hack.rival.04": 'Bu rakibe yorum yapan müşterilerin şikayet ettiği noktaları siz avantajınıza çevirin.',
+    "hack.rival.05": "Rakibin zayıf olduğu 'Yanıt Hızı' alanında fark yaratarak müşterileri kendinize çekin.",
+    "hack.rival.06": 'Rakibin yoğun olduğu saatlerde yerel Google reklamı vererek onların önüne çıkın.',
+    "hack.rival.07": 'Rakiple benzer anahtar kelimelerde daha yüksek puanlı yorumlar biriktirin.',
+    "hack.rival.08": 'Rakibin profilindeki eksik ürün/hizmetleri kendi profilinizde öne çıkarın.',
+    "hack.rival.09": 'Bölgedeki yerel rehberlerden (Local Guides) yorum alarak otoritenizi rakibin üzerine taşıyın.',
+    "hack.rival.10": "Rakibin 'Google Post' paylaşmadığı günlerde siz paylaşım yaparak güncel kalın.",
+    "idea.furniture.01": 'AR (Artırılmış Gerçeklik) ile evde yerleşim simülasyonu sunun.',
+    "idea.furniture.02": 'Eski mobilya yenileme (upcycling) atölyeleri düzenleyerek trafik çekin.',
+    "idea.furniture.03": 'Mimarlar için özel B2B sadakat ve komisyon programı başlatın.',
+    "idea.furniture.04": "Kişiye özel ölçü ve 'Ücretsiz Keşif' hizmetini standartlaştırın.",
+    "idea.furniture.05": 'Mobilya kiralama modeli ile kısa dönemli konaklama yerlerine paketler sunun.',
+    "idea.furniture.06": 'Gayrimenkul ofisleri ile ortaklık yaparak yeni ev alanlara paket indirimler tanımlayın.',
+    "idea.food.01": "TikTok/Reels için 'Mutfak Arkası' ve 'Hazırlanış' videolarıyla viral içerik üretin.",
+    "idea.food.02": "Öğle arası için '30 Dakikada Servis' garantili iş menüleri oluşturun.",
+    "idea.food.03": "Mekanınızın bir köşesini tamamen 'Influencer' dostu bir fotoğraf alanına çevirin.",
+    "idea.food.04": "Online siparişlerde 'Yemek Kartı' entegrasyonunu ve özel mobil indirimleri öne çıkarın.",
+    "idea.food.05": "Sürpriz 'Gizli Menü' ürünleri ile topluluk bağlılığını artırın.",
+    "idea.food.06": "Yoğun olmayan saatlerde (14:00-17:00) 'Happy Hour' veya 'Mutfak Atölyesi' düzenleyin.",
+    "idea.health.01": "Yapay zeka asistanı ile 7/24 randevu ve 'Sıkça Sorulan Sorular' botu kurun.",
+    "idea.health.02": "Hastalar için 'Dijital Tedavi Takip' portalı oluşturarak güven bağını güçlendirin.",
+    "idea.health.03": "Bölgesel olarak 'Ücretsiz Sağlık Taraması' veya 'Bilgilendirme Seminerleri' düzenleyin.",
+    "idea.health.04": 'Kliniğinizin hijyen ve teknoloji standartlarını gösteren 3D sanal tur hazırlayın.',
+    "idea.health.05": "Hasta gizliliğine uygun 'Başarı Hikayeleri' ve 'Önce/Sonra' içerikleriyle sosyal kanıt oluşturun.",
+    "idea.health.06": 'Diğer branşlardaki yerel doktorlarla çapraz yönlendirme (referral) ağı kurun.',
+    "idea.lodging.01": "Yerel turizm rehberleri ile anlaşarak 'Gizli Rotalar' konaklama paketleri sunun.",
+    "idea.lodging.02": "Otel lobisini 'Co-working' alanına çevirerek dijital göçebeleri (Digital Nomads) çekin.",
+    "idea.lodging.03": 'Hangi odanın hangi manzaraya baktığını gösteren interaktif seçim ekranı kurun.',
+    "idea.lodging.04": "Müşterilerinizin uçuş verileriyle entegre 'Akıllı Transfer' hizmeti başlatın.",
+    "idea.lodging.05": 'Sürdürülebilirlik (Zero-waste) sertifikası alarak çevre duyarlı turistleri hedefleyin.',
+    "idea.lodging.06": "Kendi bünyenizdeki restoran/spa için dışarıdan gelenlere özel 'Day Pass' satın.",
+    "idea.services.01": "Hizmet sürecini canlı izleyebilecekleri 'İş Takip' bildirim sistemi kurun.",
+    "idea.services.02": "Yıllık 'Bakım Aboneliği' (Subscription) modeli ile nakit akışını stabilize edin.",
+    "idea.services.03": "Yapılan iş için 'Dijital Garanti Belgesi' ve servis geçmişi portalı sunun.",
+    "idea.services.04": 'Kapıdan alıp kapıya teslim (Valet) modelini tüm hizmetlere entegre edin.',
+    "idea.services.05": "Acil durumlar için '60 Dakikada Müdahale' premium servisi başlatın.",
+    "idea.services.06": 'Müşterilerinizin ev/araç bakım zamanlarını hatırlatan otomatik SMS sistemi kurun.',
+    "idea.corporate.01": "Tedarik zinciri şeffaflığı için 'Müşteri İzleme Paneli' (Dashboard) kurun.",
+    "idea.corporate.02": 'Endüstriyel 4.0 dönüşümü için IoT tabanlı üretim izleme verilerini pazarlamada kullanın.',
+    "idea.corporate.03": "B2B müşterileri için 'Otomatik Yeniden Sipariş' (Auto-stock) entegrasyonu sunun.",
+    "idea.corporate.04": "Çalışan memnuniyetini ve İSG standartlarını öne çıkararak 'İşveren Markası' yaratın.",
+    "idea.corporate.05": "Sektörel 'Whitepaper' ve 'Pazar Analizleri' yayınlayarak otorite konumuna geçin.",
+    "idea.corporate.06": "Global pazarlar için çok dilli profesyonel bir 'E-Katalog' ve 'Teklif Sihirbazı' oluşturun.",
+    "idea.default.01": "Mağaza içi trafiği artırmak için 'Click & Collect' (Online al, mağazadan al) modeline geçin.",
+    "idea.default.02": 'QR kod ile anında Google Yorum toplama standları kurun.',
+    "idea.default.03": "Bölgedeki tamamlayıcı işletmelerle 'Hediye Çeki' işbirlikleri yapın.",
+    "idea.default.04": 'Veri madenciliği ile müşterilerinize doğum günlerinde kişiselleştirilmiş teklifler gönderin.',
+    "idea.default.05": 'Abonelik modeli ile düzenli ürün/hizmet alımını teşvik edin.',
+    "idea.default.06": 'Yapay zeka destekli stok yönetim sistemi ile kayıpları minimize edin.'
+}
+
+OWN_HACKS = [f"hack.own.{i:02d}" for i in range(1, 11)]
+RIVAL_HACKS = [f"hack.rival.{i:02d}" for i in range(1, 11)]
+
+# (types selecting the ideas, idea ids); the first match wins
+INDUSTRY_IDEAS = [
+    (('furniture_store', 'home_goods_store'), [f"idea.furniture.{i:02d}" for i in range(1, 7)]),
+    (('restaurant', 'cafe', 'food', 'bar', 'bakery'), [f"idea.food.{i:02d}" for i in range(1, 7)]),
+    (('health', 'dentist', 'doctor', 'hospital', 'pharmacy'), [f"idea.health.{i:02d}" for i in range(1, 7)]),
+    (('lodging', 'hotel', 'campground'), [f"idea.lodging.{i:02d}" for i in range(1, 7)]),
+    (('car_repair', 'laundry', 'electrician', 'plumber', 'painter'), [f"idea.services.{i:02d}" for i in range(1, 7)]),
+    (('establishment', 'factory', 'warehouse', 'logistics'), [f"idea.corporate.{i:02d}" for i in range(1, 7)])
+]
+DEFAULT_IDEAS = [f"idea.default.{i:02d}" for i in range(1, 7)]
+
+# Changes whenever an entry does: clients key their cached copy on it
+CATALOG_VERSION = hashlib.sha1(json.dumps(CATALOG, sort_keys=True, ensure_ascii=False).encode()).hexdigest()[:12]
+
+def ref(entry_id: str, **params: Any) -> Dict[str, Any]:
+    """
+    Reference to a catalog entry, as analyses return it.
+    """
+    return {"id": entry_id, "params": params} if params else {"id": entry_id}
+
+def render(entry: Dict[str, Any]) -> str:
+    """
+    Text of a reference (for server-side consumers such as reports).
+    """
+    text = CATALOG.get(entry["id"], "")
+    for key, value in (entry.get("params") or {}).items():
+        text = text.replace("{" + key + "}", str(value))
+    return text
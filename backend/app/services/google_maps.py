@@ -1,12 +1,102 @@
-import googlemaps
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from googlemaps.exceptions import ApiError, TransportError, Timeout
 from app.core.config import settings
-from typing import Dict, Any, List
+from app.core.observability import span
+from typing import Dict, Any, List, Callable, Iterator, Optional, Tuple
+from app.services.place_summary import PlaceSummary
+from app.services.places_limiter import places_limiter, PlacesUnavailable
+from app.services.maps_backends import build_maps_client
+
+logger = logging.getLogger(__name__)
+
+# Google statuses worth retrying; anything else (NOT_FOUND, INVALID_REQUEST...) is a real answer
+TRANSIENT_STATUSES = {"OVER_QUERY_LIMIT", "UNKNOWN_ERROR"}
+
+# Nearby Search pages: 20 results each, at most 3 pages (60 results) per query
+NEARBY_PAGE_SIZE = 20
+NEARBY_MAX_PAGES = 3
+# A next_page_token is only valid a moment after it is issued
+NEARBY_PAGE_DELAY_SECONDS = 2.0
+
+class CallCount:
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def add(self) -> None:
+        with self._lock:
+            self.count += 1
+
+# Counter of the innermost count_calls() block of the current context
+_call_count: ContextVar[Optional[CallCount]] = ContextVar("places_call_count", default=None)
 
 class GoogleMapsService:
     def __init__(self):
-        self.client = googlemaps.Client(key=settings.GOOGLE_MAPS_API_KEY)
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        """
+        Maps backend selected by MAPS_BACKEND, built on first use rather than at import.
+        Rate limiting and retries are done by _call across all processes, not per client.
+        """
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = build_maps_client()
+        return self._client
+
+    @contextmanager
+    def count_calls(self) -> Iterator[CallCount]:
+        """
+        Counts the Places API calls made inside the block, so that an operation whose cost
+        depends on the data can be charged for the calls it made. Thread pools see the
+        counter when their tasks run in a copy of the caller's context.
+        """
+        counter = CallCount()
+        token = _call_count.set(counter)
+        try:
+            yield counter
+        finally:
+            _call_count.reset(token)
 
-    def search_business(self, query: str, location: str = "Turkey") -> List[Dict[str, Any]]:
+    def _call(self, method: Callable[..., Dict[str, Any]], **params) -> Dict[str, Any]:
+        """
+        Calls a client method through the global rate limiter, retrying transient
+        failures with exponential backoff. Raises PlacesUnavailable when Google
+        cannot answer, so that callers never mistake an outage for "no results".
+        """
+        counter = _call_count.get()
+        if counter is not None:
+            counter.add()
+        for attempt in range(settings.PLACES_MAX_RETRIES + 1):
+            places_limiter.acquire()
+            try:
+                result = method(**params)
+            except (TransportError, Timeout) as e:
+                error = e
+            except ApiError as e:
+                if e.status not in TRANSIENT_STATUSES:
+                    raise
+                error = e
+            else:
+                places_limiter.record_success()
+                return result
+
+            places_limiter.record_failure()
+            logger.warning(f"Google API transient error (attempt {attempt + 1}): {error}")
+            if attempt < settings.PLACES_MAX_RETRIES:
+                time.sleep(places_limiter.backoff(attempt))
+
+        raise PlacesUnavailable(f"Google Places API failed: {error}")
+
+    @span("google", "search_business")
+    def search_business(self, query: str, location: str = "Turkey") -> List[PlaceSummary]:
         """
         Searches for businesses using Text Search API.
         """
@@ -14,47 +104,62 @@ class GoogleMapsService:
         full_query = f"{query} near {location}"
         
         try:
-            places_result = self.client.places(query=full_query)
+            places_result = self._call(self.client.places, query=full_query)
             
             results = []
             if places_result.get('status') == 'OK':
                 for place in places_result.get('results', []):
-                    results.append({
-                        "google_place_id": place.get("place_id"),
-                        "name": place.get("name"),
-                        "address": place.get("formatted_address"),
-                        "rating": place.get("rating", 0),
-                        "user_ratings_total": place.get("user_ratings_total", 0),
-                        "geometry": place.get("geometry", {}).get("location")
-                    })
+                    results.append(PlaceSummary.from_place(place, address_field="formatted_address"))
             return results
+        except PlacesUnavailable:
+            raise
         except Exception as e:
-            print(f"Google API Error: {e}")
+            logger.error(f"Google API Error: {e}")
             return []
 
-    def get_place_details(self, place_id: str) -> Dict[str, Any]:
+    @span("google", "get_place_details")
+    def get_place_details(self, place_id: str, reviews_sort: str = None) -> Dict[str, Any]:
         """
         Fetches full detailed information about a specific place.
         Ensuring completeness as requested ("full data from google").
+        reviews_sort: "newest" returns the 5 latest reviews instead of the most relevant ones.
         """
         try:
             # Removed field restrictions to get absolutely everything Google offers
             # This ensures we never get 404 due to missing requested fields
-            details = self.client.place(place_id=place_id)
+            params = {"place_id": place_id}
+            if reviews_sort:
+                params["reviews_sort"] = reviews_sort
+            details = self._call(self.client.place, **params)
             
             if details and details.get('status') == 'OK':
                 return details.get('result', {})
             
-            print(f"Google API Warning: Status {details.get('status')} for place {place_id}")
+            logger.warning(f"Google API Warning: Status {details.get('status')} for place {place_id}")
             return details.get('result') if details else None
             
+        except PlacesUnavailable:
+            raise
         except Exception as e:
-            import traceback
-            print(f"Google API Critical Error: {str(e)}")
-            print(traceback.format_exc())
+            logger.error(f"Google API Error (Details) for {place_id}: {str(e)}")
             return None
 
-    def search_nearby(self, location: Dict[str, float], keyword: str = None, type: str = None, radius: int = 1500) -> List[Dict[str, Any]]:
+    @span("google", "get_place_photo")
+    def get_place_photo(self, reference: str, max_width: int = 1600) -> Optional[bytes]:
+        """
+        Downloads a Places photo (image bytes), None when Google does not return one.
+        """
+        try:
+            chunks = self._call(self.client.places_photo, photo_reference=reference, max_width=max_width)
+            return b"".join(chunk for chunk in chunks if chunk) or None
+        except PlacesUnavailable:
+            raise
+        except Exception as e:
+            logger.error(f"Google API Error (Photo): {str(e)}")
+            return None
+
+    @span("google", "search_nearby")
+    def search_nearby(self, location: Dict[str, float], keyword: str = None, type: str = None, radius: int = 1500) -> List[PlaceSummary]:
         """
         Searches for nearby competitors using Places Nearby API.
         """
@@ -70,27 +175,57 @@ class GoogleMapsService:
             if type:
                 params["type"] = type
                 
-            places_result = self.client.places_nearby(**params)
-            
-            results = []
-            if places_result.get('status') == 'OK':
-                for place in places_result.get('results', []):
-                    # Filter out purely geographic results to ensure we get businesses
-                    types = place.get("types", [])
-                    if "locality" in types or "political" in types or "route" in types:
-                        continue
-                        
-                    results.append({
-                        "google_place_id": place.get("place_id"),
-                        "name": place.get("name"),
-                        "rating": place.get("rating", 0),
-                        "user_ratings_total": place.get("user_ratings_total", 0),
-                        "address": place.get("vicinity"),
-                        "types": types
-                    })
-            return results
+            places_result = self._call(self.client.places_nearby, **params)
+            return self._business_results(places_result) if places_result.get('status') == 'OK' else []
+        except PlacesUnavailable:
+            raise
         except Exception as e:
-            print(f"Google API Error (Nearby): {e}")
+            logger.error(f"Google API Error (Nearby): {e}")
             return []
 
+    @span("google", "search_nearby_all")
+    def search_nearby_all(self, location: Dict[str, float], type: str = None, keyword: str = None, radius: int = 1500) -> Tuple[List[PlaceSummary], bool]:
+        """
+        Nearby Search following next_page_token, up to the 60 results Google returns for a query.
+        Also returns whether the query is saturated (all 60 came back, so the area likely holds
+        more places than Google will list; a smaller area is needed to see them).
+        """
+        params = {"location": location, "radius": radius}
+        if keyword:
+            params["keyword"] = keyword
+        if type:
+            params["type"] = type
+
+        results: List[PlaceSummary] = []
+        returned = 0
+        for page in range(NEARBY_MAX_PAGES):
+            try:
+                places_result = self._call(self.client.places_nearby, **params)
+            except PlacesUnavailable:
+                raise
+            except Exception as e:
+                logger.error(f"Google API Error (Nearby, page {page + 1}): {e}")
+                break
+            if places_result.get('status') != 'OK':
+                break
+            returned += len(places_result.get('results', []))
+            results.extend(self._business_results(places_result))
+            token = places_result.get('next_page_token')
+            if not token:
+                break
+            if settings.MAPS_BACKEND in ("google", "record"):
+                time.sleep(NEARBY_PAGE_DELAY_SECONDS)
+            params = {"page_token": token}
+        return results, returned >= NEARBY_PAGE_SIZE * NEARBY_MAX_PAGES
+
+    def _business_results(self, places_result: Dict[str, Any]) -> List[PlaceSummary]:
+        results = []
+        for place in places_result.get('results', []):
+            # Filter out purely geographic results to ensure we get businesses
+            types = place.get("types", [])
+            if "locality" in types or "political" in types or "route" in types:
+                continue
+            results.append(PlaceSummary.from_place(place))
+        return results
+
 google_maps_service = GoogleMapsService()
@@ -0,0 +1,193 @@
+import logging
+from typing import Dict, Any, List, Optional
+from uuid import UUID
+import numpy as np
+from sqlalchemy.orm import Session
+from app import models
+from app.core.observability import span
+from .grid_engine import grid_engine
+from .heatmap_service import pack_grid, NOT_RANKED
+
+logger = logging.getLogger(__name__)
+
+# Ranks at or below this count as a "cell" won (Google's local 3-pack)
+TOP_CELL_RANK = 3
+# Two grids share their geometry when every point is within ~10 m
+SAME_POINT_DEGREES = 1e-4
+
+class PackedSnapshot:
+    """
+    A grid snapshot as (rows x cols) numpy arrays instead of ORM point objects.
+    """
+    __slots__ = ("id", "keyword", "created_at", "visibility_score", "lats", "lngs", "ranks", "winners")
+
+    def __init__(self, snapshot: models.GridRankSnapshot, lats, lngs, ranks, winners):
+        self.id = snapshot.id
+        self.keyword = snapshot.keyword
+        self.created_at = snapshot.created_at
+        self.visibility_score = snapshot.visibility_score
+        self.lats = lats
+        self.lngs = lngs
+        self.ranks = ranks
+        self.winners = winners
+
+class GridDiffService:
+    """
+    Compares grid snapshots point by point: rank deltas, cells gained/lost, winner changes.
+    """
+
+    def load_packed(self, db: Session, business_id: UUID, snapshot_ids: List[UUID]) -> Dict[UUID, PackedSnapshot]:
+        """
+        Loads several snapshots of a business with one column query for all of their points.
+        """
+        snapshots = db.query(models.GridRankSnapshot).filter(
+            models.GridRankSnapshot.id.in_(snapshot_ids),
+            models.GridRankSnapshot.business_id == business_id
+        ).all()
+        if not snapshots:
+            return {}
+
+        rows = db.query(
+            models.GridPointRank.snapshot_id,
+            models.GridPointRank.lat,
+            models.GridPointRank.lng,
+            models.GridPointRank.rank,
+            models.GridPointRank.is_competitor_winner,
+            models.GridPointRank.point_metadata
+        ).filter(models.GridPointRank.snapshot_id.in_([s.id for s in snapshots])).all()
+
+        grouped: Dict[UUID, list] = {s.id: [] for s in snapshots}
+        for row in rows:
+            grouped[row[0]].append(row)
+
+        packed = {}
+        for snapshot in snapshots:
+            points = grouped[snapshot.id]
+            count = len(points)
+            lats = np.fromiter((p[1] for p in points), dtype=float, count=count)
+            lngs = np.fromiter((p[2] for p in points), dtype=float, count=count)
+            # Points the Places API could not answer are unknown (NaN), not "out of the top 20"
+            ranks = np.fromiter(
+                (np.nan if (p[5] or {}).get("unavailable") else p[3] or NOT_RANKED for p in points),
+                dtype=float, count=count
+            )
+            winners = np.array([p[4] for p in points], dtype=object)
+            packed[snapshot.id] = PackedSnapshot(snapshot, *pack_grid(snapshot.grid_size, lats, lngs, ranks, winners))
+        return packed
+
+    @span("engine", "grid_diff", cpu=True)
+    def diff(self, before: PackedSnapshot, after: PackedSnapshot) -> Dict[str, Any]:
+        """
+        Diffs `after` against `before` on the geometry of `before`.
+        rank_delta > 0 means the business moved up (e.g. 8 -> 3 = +5).
+        When the geometries differ, `after` is resampled onto the points of `before`
+        with bilinear interpolation; points outside the `after` grid are left out, as are
+        points that were unavailable in either scan.
+        """
+        aligned = self._same_geometry(before, after)
+        if aligned:
+            after_ranks = after.ranks
+            after_winners = after.winners
+        else:
+            after_ranks, after_winners = self._resample(after, before.lats, before.lngs)
+
+        before_ranks = before.ranks
+        valid = ~np.isnan(after_ranks) & ~np.isnan(before_ranks)
+        deltas = np.where(valid, np.nan_to_num(before_ranks) - np.nan_to_num(after_ranks), 0)
+
+        gained = valid & (before_ranks > TOP_CELL_RANK) & (after_ranks <= TOP_CELL_RANK)
+        lost = valid & (before_ranks <= TOP_CELL_RANK) & (after_ranks > TOP_CELL_RANK)
+        winner_changed = valid & (before.winners != after_winners)
+
+        points = []
+        rows, cols = before_ranks.shape
+        for r in range(rows):
+            for c in range(cols):
+                if not valid[r, c]:
+                    continue
+                points.append({
+                    "lat": float(before.lats[r, c]),
+                    "lng": float(before.lngs[r, c]),
+                    "from_rank": self._rank(before_ranks[r, c]),
+                    "to_rank": self._rank(after_ranks[r, c]),
+                    "rank_delta": round(float(deltas[r, c]), 1),
+                    "from_winner": before.winners[r, c],
+                    "to_winner": after_winners[r, c]
+                })
+
+        compared = after_ranks[valid]
+        before_visibility = before.visibility_score or 0.0
+        if aligned:
+            after_visibility = after.visibility_score or 0.0
+        else:
+            # Visibility over the resampled points, so both sides cover the same area
+            before_visibility = grid_engine.calculate_visibility_score(np.rint(before_ranks[valid]).astype(int).tolist())
+            after_visibility = grid_engine.calculate_visibility_score(np.rint(compared).astype(int).tolist())
+
+        return {
+            "from_snapshot_id": before.id,
+            "to_snapshot_id": after.id,
+            "keyword_changed": before.keyword != after.keyword,
+            "resampled": not aligned,
+            "compared_points": int(valid.sum()),
+            "improved_points": int((deltas > 0).sum()),
+            "declined_points": int((deltas < 0).sum()),
+            "average_rank_delta": round(float(deltas[valid].mean()), 2) if compared.size else 0.0,
+            "visibility_delta": round(after_visibility - before_visibility, 1),
+            "gained_cells": int(gained.sum()),
+            "lost_cells": int(lost.sum()),
+            "winner_changes": int(winner_changed.sum()),
+            "points": points
+        }
+
+    def _same_geometry(self, a: PackedSnapshot, b: PackedSnapshot) -> bool:
+        return (
+            a.lats.shape == b.lats.shape
+            and bool(np.all(np.abs(a.lats - b.lats) < SAME_POINT_DEGREES))
+            and bool(np.all(np.abs(a.lngs - b.lngs) < SAME_POINT_DEGREES))
+        )
+
+    def _resample(self, grid: PackedSnapshot, lats: np.ndarray, lngs: np.ndarray):
+        """
+        Ranks of `grid` interpolated at (lats, lngs) (NaN outside the grid) and the
+        winner of the nearest grid point.
+        """
+        rows, cols = grid.ranks.shape
+        if rows < 2 or cols < 2:
+            # Single row or point: nothing to interpolate against
+            return np.full(lats.shape, np.nan), np.full(lats.shape, None, dtype=object)
+
+        # Rows share a latitude; the longitude step of each row is close enough to the mean
+        row_lats = grid.lats[:, 0]
+        fy = (row_lats[0] - lats) / ((row_lats[0] - row_lats[-1]) / (rows - 1))
+        west = grid.lngs[:, 0].mean()
+        east = grid.lngs[:, -1].mean()
+        fx = (lngs - west) / ((east - west) / (cols - 1))
+
+        inside = (fy >= -0.5) & (fy <= rows - 0.5) & (fx >= -0.5) & (fx <= cols - 0.5)
+        fy = np.clip(fy, 0, rows - 1)
+        fx = np.clip(fx, 0, cols - 1)
+        y0 = np.floor(fy).astype(np.intp)
+        x0 = np.floor(fx).astype(np.intp)
+        y1 = np.minimum(y0 + 1, rows - 1)
+        x1 = np.minimum(x0 + 1, cols - 1)
+        wy = fy - y0
+        wx = fx - x0
+
+        m = grid.ranks
+        top = m[y0, x0] * (1 - wx) + m[y0, x1] * wx
+        bottom = m[y1, x0] * (1 - wx) + m[y1, x1] * wx
+        ranks = np.where(inside, top * (1 - wy) + bottom * wy, np.nan)
+
+        winners = grid.winners[np.rint(fy).astype(np.intp), np.rint(fx).astype(np.intp)]
+        return ranks, np.where(inside, winners, None)
+
+    def _rank(self, value: float) -> Optional[float]:
+        """
+        Rank for the API: None when out of the top 20, interpolated ranks keep one decimal.
+        """
+        if value >= NOT_RANKED:
+            return None
+        return round(float(value), 1)
+
+grid_diff_service = GridDiffService()
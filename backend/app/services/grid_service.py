@@ -1,12 +1,30 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional, Callable, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from app import models, schemas
+from app.core.config import settings
+from app.core.observability import span
 from .grid_engine import grid_engine
 from .google_maps import google_maps_service
+from .place_store import place_store
+from .place_summary import PlaceSummary
+from .quota_service import quota_service
+from .places_limiter import PlacesUnavailable
+from .serialized_cache import serialized_cache, json_array
 import logging
+import math
 
 logger = logging.getLogger(__name__)
 
+METERS_PER_DEGREE = 111320.0
+
+CADENCE_INTERVALS = {
+    models.ScanCadence.DAILY: timedelta(days=1),
+    models.ScanCadence.WEEKLY: timedelta(weeks=1),
+    models.ScanCadence.MONTHLY: timedelta(days=30)
+}
+
 class GridService:
     def run_analysis(
         self, 
@@ -14,27 +32,177 @@ class GridService:
         business: models.Business, 
         keyword: str, 
         radius_km: float = 1.0, 
-        grid_size: int = 5
+        grid_size: int = 5,
+        center: Optional[Tuple[float, float]] = None
     ) -> models.GridRankSnapshot:
+        center_lat, center_lng = center or self.get_center(db, business)
+        logger.info(f"Grid analysis started at: {center_lat}, {center_lng} for keyword: '{keyword}'")
+
+        return self._build_snapshot(
+            db, business, keyword, radius_km, grid_size, center_lat, center_lng,
+            search=lambda lat, lng: self._search_or_none(keyword, lat, lng)
+        )
+
+    def get_center(self, db: Session, business: models.Business, admit_details: Optional[Callable[[], None]] = None) -> Tuple[float, float]:
+        """
+        Location of the business. Place Details are only fetched when the canonical place has
+        no stored location yet; `admit_details` is called first to admit (charge) that call.
+        """
         # 0. Initial validation
         if not business.google_place_id:
             logger.error(f"Business {business.id} has no Google Place ID")
             raise Exception("Business is missing Google Place ID")
 
-        # 1. Get location from business address or use stored lat/lng if available
-        # For now, let's get details to find geometry
-        logger.info(f"Fetching details for business: {business.name} ({business.google_place_id})")
-        details = google_maps_service.get_place_details(business.google_place_id)
-        
-        if not details or 'geometry' not in details:
+        # 1. Location of the canonical place
+        location = place_store.stored_location(db, business.google_place_id)
+        if not location:
+            if admit_details:
+                admit_details()
+            location = place_store.get_location(db, business.google_place_id)
+
+        if not location:
             logger.error(f"Could not find coordinates for place_id: {business.google_place_id}")
             raise Exception("Could not find business location for grid analysis. Please verify the business address.")
             
-        center_lat = details['geometry']['location']['lat']
-        center_lng = details['geometry']['location']['lng']
-        
-        logger.info(f"Grid analysis started at: {center_lat}, {center_lng} for keyword: '{keyword}'")
+        return location['lat'], location['lng']
+
+    def plan_due_schedules(self, db: Session, now: Optional[datetime] = None) -> List[List[str]]:
+        """
+        Claims the schedules due at `now` (moves their next run forward) and groups them
+        by keyword, so that each group can share its nearby searches in one batch.
+        """
+        now = now or datetime.utcnow()
+        due = db.query(models.GridScanSchedule).filter(
+            models.GridScanSchedule.is_active == True,
+            models.GridScanSchedule.next_run_at <= now
+        ).with_for_update(skip_locked=True).all()
 
+        groups: Dict[str, List[str]] = {}
+        for schedule in due:
+            schedule.next_run_at = now + CADENCE_INTERVALS[schedule.cadence]
+            groups.setdefault(self._normalize_keyword(schedule.keyword), []).append(str(schedule.id))
+        db.commit()
+        return list(groups.values())
+
+    def run_scheduled_batch(self, db: Session, schedule_ids: List[str]) -> List[models.GridRankSnapshot]:
+        """
+        Runs several scheduled scans together. Grid points of different schedules with the same
+        keyword that fall in the same GRID_SHARED_POINT_METERS cell are served by one nearby
+        search, and each business is ranked from that shared result list.
+        """
+        schedules = db.query(models.GridScanSchedule).filter(
+            models.GridScanSchedule.id.in_(schedule_ids),
+            models.GridScanSchedule.is_active == True
+        ).all()
+
+        # 1. Grid of every schedule
+        plans = []
+        for schedule in schedules:
+            try:
+                # Scheduled scans count against the tenant quota like on-demand ones:
+                # the center first, so that a business without a location costs nothing
+                tenant = schedule.business.tenant
+                center = self.get_center(
+                    db, schedule.business,
+                    admit_details=lambda: quota_service.admit(tenant, models.ActionType.GRID_SCAN)
+                )
+                quota_service.admit(tenant, models.ActionType.GRID_SCAN, schedule.grid_size * schedule.grid_size)
+            except Exception as e:
+                self._retry_later(schedule, e)
+                continue
+            points = grid_engine.generate_grid(center[0], center[1], schedule.radius_km, schedule.grid_size)
+            plans.append((schedule, center, points))
+
+        # 2. One nearby search per (keyword, shared cell)
+        searches: Dict[tuple, Tuple[str, float, float]] = {}
+        for schedule, _, points in plans:
+            keyword = self._normalize_keyword(schedule.keyword)
+            for lat, lng in points:
+                searches.setdefault(self._shared_key(keyword, lat, lng), (schedule.keyword, lat, lng))
+
+        with ThreadPoolExecutor(max_workers=settings.GRID_SCAN_CONCURRENCY) as pool:
+            results = dict(zip(searches, pool.map(lambda args: self._search_or_none(*args), searches.values())))
+
+        total_points = sum(len(points) for _, _, points in plans)
+        logger.info(f"Scheduled grid batch: {total_points} grid points served by {len(searches)} nearby searches")
+
+        # 3. Snapshots from the shared results, each in its own savepoint so that a failed one
+        # is undone without losing the others or the schedule updates
+        snapshots = []
+        for schedule, (center_lat, center_lng), _ in plans:
+            keyword = self._normalize_keyword(schedule.keyword)
+            try:
+                with db.begin_nested():
+                    snapshot = self._build_snapshot(
+                        db, schedule.business, schedule.keyword, schedule.radius_km, schedule.grid_size,
+                        center_lat, center_lng,
+                        search=lambda lat, lng, keyword=keyword: results[self._shared_key(keyword, lat, lng)],
+                        schedule_id=schedule.id,
+                        commit=False
+                    )
+                schedule.last_run_at = snapshot.created_at
+                schedule.last_error = None
+                snapshots.append(snapshot)
+            except Exception as e:
+                logger.error(f"Scheduled grid scan {schedule.id} failed: {str(e)}")
+                self._retry_later(schedule, e)
+
+        db.commit()
+        return snapshots
+
+    def _retry_later(self, schedule: models.GridScanSchedule, error: Exception) -> None:
+        # plan_due_schedules already moved the next run a whole cadence ahead
+        schedule.last_error = str(error)
+        schedule.next_run_at = datetime.utcnow() + timedelta(minutes=settings.GRID_SCHEDULE_RETRY_MINUTES)
+
+    def _normalize_keyword(self, keyword: str) -> str:
+        return " ".join(keyword.lower().split())
+
+    def _shared_key(self, keyword: str, lat: float, lng: float) -> tuple:
+        """
+        Cell of a ~GRID_SHARED_POINT_METERS lattice containing the point.
+        """
+        step_lat = settings.GRID_SHARED_POINT_METERS / METERS_PER_DEGREE
+        step_lng = step_lat / max(math.cos(math.radians(lat)), 0.01)
+        return keyword, round(lat / step_lat), round(lng / step_lng)
+
+    def _search_or_none(self, keyword: str, lat: float, lng: float) -> Optional[List[PlaceSummary]]:
+        """
+        Nearby results at a point, or None when the Places API is unavailable.
+        """
+        try:
+            return self._search_point(keyword, lat, lng)
+        except PlacesUnavailable as e:
+            logger.warning(f"Grid point ({lat}, {lng}) unavailable: {str(e)}")
+            return None
+
+    def _search_point(self, keyword: str, lat: float, lng: float) -> List[PlaceSummary]:
+        # We use nearby search with keyword at this specific coordinate
+        return google_maps_service.search_nearby(
+            location={"lat": lat, "lng": lng},
+            keyword=keyword,
+            radius=500 # Small radius for localized rank
+        )
+
+    @span("engine", "grid_snapshot", cpu=True)
+    def _build_snapshot(
+        self,
+        db: Session,
+        business: models.Business,
+        keyword: str,
+        radius_km: float,
+        grid_size: int,
+        center_lat: float,
+        center_lng: float,
+        search: Callable[[float, float], List[PlaceSummary]],
+        schedule_id=None,
+        commit: bool = True
+    ) -> models.GridRankSnapshot:
+        """
+        Creates the snapshot and its points; `search` returns the nearby results at a grid point,
+        or None when they are unknown (Places API unavailable). Such points are stored without a
+        rank and flagged as unavailable, and they are left out of the snapshot scores.
+        """
         # 2. Create Snapshot record
         snapshot = models.GridRankSnapshot(
             business_id=business.id,
@@ -42,7 +210,8 @@ class GridService:
             radius_km=radius_km,
             grid_size=grid_size,
             center_lat=center_lat,
-            center_lng=center_lng
+            center_lng=center_lng,
+            schedule_id=schedule_id
         )
         db.add(snapshot)
         db.flush()
@@ -52,23 +221,29 @@ class GridService:
         logger.info(f"Generated {len(grid_points)} grid points for analysis")
 
         ranks = []
+        unavailable = 0
         for idx, (lat, lng) in enumerate(grid_points):
             # 4. Simulate search at this point
-            # We use nearby search with keyword at this specific coordinate
             try:
-                nearby = google_maps_service.search_nearby(
-                    location={"lat": lat, "lng": lng},
-                    keyword=keyword,
-                    radius=500 # Small radius for localized rank
-                )
+                nearby = search(lat, lng)
+                if nearby is None:
+                    unavailable += 1
+                    db.add(models.GridPointRank(
+                        snapshot_id=snapshot.id,
+                        lat=lat,
+                        lng=lng,
+                        rank=None,
+                        point_metadata={"unavailable": True}
+                    ))
+                    continue
                 
                 # 5. Find business in results
                 rank = None
                 winner = None
                 if nearby:
-                    winner = nearby[0]['name']
+                    winner = nearby[0].name
                     for r_idx, result in enumerate(nearby):
-                        if result.get('google_place_id') == business.google_place_id:
+                        if result.google_place_id == business.google_place_id:
                             rank = r_idx + 1
                             break
                 
@@ -96,6 +271,11 @@ class GridService:
                 ranks.append(21) # Count as failure/not found
         
         # 7. Calculate Final Scores
+        if unavailable == len(grid_points):
+            raise PlacesUnavailable("Google Places API is unavailable, grid scan aborted")
+        if unavailable:
+            logger.warning(f"Snapshot {snapshot.id}: {unavailable}/{len(grid_points)} points unavailable")
+
         if ranks:
             snapshot.average_rank = sum(ranks) / len(ranks)
             snapshot.visibility_score = grid_engine.calculate_visibility_score(ranks)
@@ -105,8 +285,11 @@ class GridService:
         
         logger.info(f"Analysis complete. Avg Rank: {snapshot.average_rank}, Visibility: {snapshot.visibility_score}")
         
-        db.commit()
-        db.refresh(snapshot)
+        if commit:
+            db.commit()
+            db.refresh(snapshot)
+        else:
+            db.flush()
         return snapshot
 
     def get_history(self, db: Session, business_id: str) -> List[models.GridRankSnapshot]:
@@ -114,4 +297,27 @@ class GridService:
             models.GridRankSnapshot.business_id == business_id
         ).order_by(models.GridRankSnapshot.created_at.desc()).all()
 
+    def history_json(self, db: Session, business_id: str) -> bytes:
+        """
+        get_history as a JSON array. Snapshots never change after the scan, so each one is
+        serialized once; only the ids are queried when all of them are cached.
+        """
+        ids = [row.id for row in db.query(models.GridRankSnapshot.id).filter(
+            models.GridRankSnapshot.business_id == business_id
+        ).order_by(models.GridRankSnapshot.created_at.desc())]
+
+        def load(missing: list) -> dict:
+            snapshots = db.query(models.GridRankSnapshot).options(
+                selectinload(models.GridRankSnapshot.points)
+            ).filter(models.GridRankSnapshot.id.in_(missing)).all()
+            return {snapshot.id: snapshot for snapshot in snapshots}
+
+        return json_array(serialized_cache.get_many(schemas.GridRankSnapshot, "grid_snapshot", ids, load))
+
+    def snapshot_json(self, snapshot: models.GridRankSnapshot) -> bytes:
+        """
+        JSON of a new snapshot, cached for the history requests to come.
+        """
+        return serialized_cache.put(schemas.GridRankSnapshot, "grid_snapshot", snapshot.id, snapshot)
+
 grid_service = GridService()
@@ -0,0 +1,224 @@
+import json
+import logging
+import os
+from io import BytesIO
+from typing import Dict, Any, Optional, Tuple
+import numpy as np
+from PIL import Image, ImageDraw
+from app import models
+from app.core.config import settings
+from app.core.observability import span
+
+logger = logging.getLogger(__name__)
+
+NOT_RANKED = 21 # Out of the top 20, same convention as GridService
+
+# Rank -> RGBA lookup table (index = rank), interpolated between color stops
+_STOPS = np.array([1, 3, 10, 20, 21], dtype=float)
+_STOP_COLORS = np.array([
+    [16, 185, 129],   # emerald: top 3
+    [132, 204, 22],   # lime
+    [245, 158, 11],   # amber
+    [239, 68, 68],    # red
+    [100, 116, 139],  # slate: not ranked
+], dtype=float)
+_RANKS = np.arange(NOT_RANKED + 1, dtype=float)
+RANK_COLORS = np.zeros((NOT_RANKED + 1, 4), dtype=np.uint8)
+for _channel in range(3):
+    RANK_COLORS[:, _channel] = np.interp(_RANKS, _STOPS, _STOP_COLORS[:, _channel]).astype(np.uint8)
+RANK_COLORS[:, 3] = 180 # Semi-transparent, drawn over a map
+# Points whose rank is unknown (Places API unavailable during the scan)
+NO_DATA_COLOR = np.array([226, 232, 240, 120], dtype=np.uint8)
+
+# Part of the cached file names: bumped when rendering changes
+RENDER_VERSION = 2
+
+FORMATS = {"png": "PNG", "webp": "WEBP"}
+
+def pack_grid(grid_size: int, lats: np.ndarray, lngs: np.ndarray, *columns: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """
+    Reshapes flat point arrays into (rows x cols) matrices ordered north-west first,
+    the same order GridEngine.generate_grid produces. Extra columns follow the same order.
+    An incomplete scan (not a full square) comes back as a single row.
+    """
+    if lats.size == 0:
+        empty = np.zeros((0, 0))
+        return (empty, empty) + tuple(np.zeros((0, 0), dtype=c.dtype) for c in columns)
+
+    order = np.lexsort((lngs, -lats))
+    count = lats.size
+    size = grid_size if grid_size and grid_size * grid_size == count else int(round(np.sqrt(count)))
+    shape = (size, size) if size * size == count else (1, count)
+    return tuple(a[order].reshape(shape) for a in (lats, lngs) + columns)
+
+class HeatmapService:
+    """
+    Renders a GridRankSnapshot as a raster heatmap (PNG/WebP) or a GeoJSON cell overlay.
+    Snapshots never change after the scan, so rendered images are cached on disk by snapshot id.
+    """
+
+    def get_raster(self, snapshot: models.GridRankSnapshot, fmt: str = "png", size: int = 512) -> str:
+        """
+        Path of the rendered heatmap, rendering it on the first request.
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported heatmap format: {fmt}")
+
+        path = os.path.join(self._snapshot_dir(snapshot), f"{size}-v{RENDER_VERSION}.{fmt}")
+        if os.path.exists(path):
+            return path
+
+        packed = self.pack_points(snapshot)
+        image = self.render(snapshot, size, packed)
+        buffer = BytesIO()
+        image.save(buffer, format=FORMATS[fmt])
+
+        self._write(path, buffer.getvalue())
+        self._write_bounds(snapshot, packed)
+        return path
+
+    def get_bounds(self, snapshot: models.GridRankSnapshot) -> Optional[Tuple[float, float, float, float]]:
+        """
+        (west, south, east, north) of the snapshot's raster, None without points. Kept next to the
+        rendered images, so that serving a cached raster does not load the snapshot's points.
+        """
+        path = os.path.join(self._snapshot_dir(snapshot), "bounds.json")
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                bounds = json.loads(f.read())
+            return tuple(bounds) if bounds else None
+        return self._write_bounds(snapshot, self.pack_points(snapshot))
+
+    def _write_bounds(self, snapshot: models.GridRankSnapshot, packed: Tuple[np.ndarray, np.ndarray, np.ndarray]) -> Optional[Tuple[float, float, float, float]]:
+        lats, lngs, ranks = packed
+        bounds = self.bounds(lats, lngs) if ranks.size else None
+        self._write(os.path.join(self._snapshot_dir(snapshot), "bounds.json"), json.dumps(bounds).encode())
+        return bounds
+
+    def _snapshot_dir(self, snapshot: models.GridRankSnapshot) -> str:
+        return os.path.join(settings.HEATMAP_DIR, str(snapshot.id))
+
+    def _write(self, path: str, data: bytes) -> None:
+        # Write then rename, so that readers never see a partial file
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    @span("engine", "heatmap_render", cpu=True)
+    def render(self, snapshot: models.GridRankSnapshot, size: int = 512, packed: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None) -> Image.Image:
+        lats, lngs, ranks = packed or self.pack_points(snapshot)
+        if ranks.size == 0:
+            return Image.new("RGBA", (size, size), (0, 0, 0, 0))
+
+        # Interpolate ranks between known grid points (normalized by the weight of the known
+        # neighbours), then colorize the whole raster with one LUT lookup
+        known = ~np.isnan(ranks)
+        weight = self._upsample(known.astype(float), size)
+        smooth = self._upsample(np.where(known, ranks, 0.0), size) / np.maximum(weight, 1e-9)
+        pixels = RANK_COLORS[np.clip(np.rint(smooth), 1, NOT_RANKED).astype(np.intp)]
+        # Pixels closest to an unknown point get the "no data" color
+        rows, cols = ranks.shape
+        nearest_r = np.rint(np.linspace(0, rows - 1, size)).astype(np.intp)
+        nearest_c = np.rint(np.linspace(0, cols - 1, size)).astype(np.intp)
+        pixels[~known[nearest_r][:, nearest_c]] = NO_DATA_COLOR
+        image = Image.fromarray(pixels, mode="RGBA")
+
+        # Rank labels at each grid point
+        draw = ImageDraw.Draw(image)
+        ys = np.linspace(0, size - 1, rows) if rows > 1 else np.array([size / 2])
+        xs = np.linspace(0, size - 1, cols) if cols > 1 else np.array([size / 2])
+        for r in range(rows):
+            for c in range(cols):
+                if not known[r, c]:
+                    label = "?"
+                else:
+                    label = "20+" if ranks[r, c] >= NOT_RANKED else str(int(ranks[r, c]))
+                left, top, right, bottom = draw.textbbox((0, 0), label)
+                x = min(max(xs[c] - (right - left) / 2, 0), size - (right - left))
+                y = min(max(ys[r] - (bottom - top) / 2, 0), size - (bottom - top))
+                draw.text((x, y), label, fill=(255, 255, 255, 255))
+        return image
+
+    def get_overlay(self, snapshot: models.GridRankSnapshot) -> Dict[str, Any]:
+        """
+        GeoJSON FeatureCollection with one rectangle per grid point (vector overlay).
+        Unknown points have a null rank and `unavailable: true`.
+        """
+        lats, lngs, ranks = self.pack_points(snapshot)
+        features = []
+        if ranks.size:
+            rows, cols = ranks.shape
+            half_lat = (np.abs(np.diff(lats[:, 0])).mean() / 2) if rows > 1 else 0.0005
+            half_lng = (np.abs(np.diff(lngs, axis=1)).mean(axis=1) / 2) if cols > 1 else np.full(rows, 0.0005)
+            for r in range(rows):
+                for c in range(cols):
+                    lat, lng = float(lats[r, c]), float(lngs[r, c])
+                    dlat, dlng = float(half_lat), float(half_lng[r])
+                    unavailable = bool(np.isnan(ranks[r, c]))
+                    rank = None if unavailable else int(ranks[r, c])
+                    color = NO_DATA_COLOR if unavailable else RANK_COLORS[rank]
+                    features.append({
+                        "type": "Feature",
+                        "geometry": {
+                            "type": "Polygon",
+                            "coordinates": [[
+                                [lng - dlng, lat - dlat], [lng + dlng, lat - dlat],
+                                [lng + dlng, lat + dlat], [lng - dlng, lat + dlat],
+                                [lng - dlng, lat - dlat]
+                            ]]
+                        },
+                        "properties": {
+                            "rank": None if unavailable or rank >= NOT_RANKED else rank,
+                            "unavailable": unavailable,
+                            "color": "#{:02x}{:02x}{:02x}".format(*color[:3])
+                        }
+                    })
+
+        return {
+            "type": "FeatureCollection",
+            "bbox": list(self.bounds(lats, lngs)) if ranks.size else None,
+            "features": features
+        }
+
+    def pack_points(self, snapshot: models.GridRankSnapshot) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Packs snapshot points into (rows x cols) lat/lng/rank arrays, north-west first,
+        the same order GridEngine.generate_grid produces. Ranks of unavailable points are NaN.
+        """
+        points = snapshot.points
+        count = len(points)
+        lats = np.fromiter((p.lat for p in points), dtype=float, count=count)
+        lngs = np.fromiter((p.lng for p in points), dtype=float, count=count)
+        ranks = np.fromiter(
+            (np.nan if (p.point_metadata or {}).get("unavailable") else p.rank or NOT_RANKED for p in points),
+            dtype=float, count=count
+        )
+        return pack_grid(snapshot.grid_size, lats, lngs, ranks)
+
+    def bounds(self, lats: np.ndarray, lngs: np.ndarray) -> Tuple[float, float, float, float]:
+        """
+        (west, south, east, north) covered by the raster.
+        """
+        return float(lngs.min()), float(lats.min()), float(lngs.max()), float(lats.max())
+
+    def _upsample(self, matrix: np.ndarray, size: int) -> np.ndarray:
+        """
+        Bilinear interpolation of a small (rows x cols) matrix to (size x size).
+        """
+        rows, cols = matrix.shape
+        ys = np.linspace(0, rows - 1, size)
+        xs = np.linspace(0, cols - 1, size)
+        y0 = np.floor(ys).astype(np.intp)
+        x0 = np.floor(xs).astype(np.intp)
+        y1 = np.minimum(y0 + 1, rows - 1)
+        x1 = np.minimum(x0 + 1, cols - 1)
+        wy = (ys - y0)[:, None]
+        wx = (xs - x0)[None, :]
+
+        top = matrix[y0][:, x0] * (1 - wx) + matrix[y0][:, x1] * wx
+        bottom = matrix[y1][:, x0] * (1 - wx) + matrix[y1][:, x1] * wx
+        return top * (1 - wy) + bottom * wy
+
+heatmap_service = HeatmapService()
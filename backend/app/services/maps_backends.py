@@ -0,0 +1,291 @@
+import hashlib
+import io
+import json
+import logging
+import math
+import os
+import random
+from typing import Dict, Any, List, Optional, Tuple
+from app.core.config import settings
+from app.services.place_summary import SECTORS
+
+logger = logging.getLogger(__name__)
+
+# Maps backends expose the subset of googlemaps.Client used by GoogleMapsService
+# (places, place, places_nearby, places_photo) and return the same raw payloads, so every code
+# path above them runs unchanged against recorded or synthetic data.
+
+def fixture_key(method: str, params: Dict[str, Any]) -> str:
+    """
+    Stable file name of a request: method + hash of its canonical parameters.
+    """
+    canonical = json.dumps(params, sort_keys=True, default=str)
+    return f"{method}/{hashlib.sha1(canonical.encode()).hexdigest()}.json"
+
+def photo_fixture_key(params: Dict[str, Any]) -> str:
+    # Photos are stored as raw image bytes next to the JSON fixtures
+    return fixture_key("places_photo", params)[:-len(".json")] + ".bin"
+
+class RecordingClient:
+    """
+    Wraps the real client and writes every response to MAPS_FIXTURES_DIR.
+    """
+
+    def __init__(self, inner, fixtures_dir: str):
+        self.inner = inner
+        self.fixtures_dir = fixtures_dir
+
+    def _record(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        result = getattr(self.inner, method)(**params)
+        path = os.path.join(self.fixtures_dir, fixture_key(method, params))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(result, f)
+        return result
+
+    def places(self, **params):
+        return self._record("places", params)
+
+    def place(self, **params):
+        return self._record("place", params)
+
+    def places_nearby(self, **params):
+        return self._record("places_nearby", params)
+
+    def places_photo(self, **params):
+        data = b"".join(self.inner.places_photo(**params))
+        path = os.path.join(self.fixtures_dir, photo_fixture_key(params))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        return [data]
+
+class ReplayClient:
+    """
+    Serves responses recorded by RecordingClient; unknown requests get ZERO_RESULTS / NOT_FOUND.
+    """
+
+    def __init__(self, fixtures_dir: str):
+        self.fixtures_dir = fixtures_dir
+        self._cache: Dict[str, Dict[str, Any]] = {}
+
+    def _replay(self, method: str, params: Dict[str, Any], missing_status: str) -> Dict[str, Any]:
+        key = fixture_key(method, params)
+        if key not in self._cache:
+            path = os.path.join(self.fixtures_dir, key)
+            if not os.path.exists(path):
+                logger.warning(f"No recorded fixture for {method} {params}")
+                return {"status": missing_status, "results": []}
+            with open(path) as f:
+                self._cache[key] = json.load(f)
+        return self._cache[key]
+
+    def places(self, **params):
+        return self._replay("places", params, "ZERO_RESULTS")
+
+    def place(self, **params):
+        return self._replay("place", params, "NOT_FOUND")
+
+    def places_nearby(self, **params):
+        return self._replay("places_nearby", params, "ZERO_RESULTS")
+
+    def places_photo(self, **params):
+        path = os.path.join(self.fixtures_dir, photo_fixture_key(params))
+        if not os.path.exists(path):
+            logger.warning(f"No recorded photo for {params}")
+            return []
+        with open(path, "rb") as f:
+            return [f.read()]
+
+NAME_PARTS = {
+    "food": (["Lezzet", "Köşe", "Anadolu", "Deniz", "Ocakbaşı", "Sofra"], ["Restoran", "Kafe", "Fırın", "Lokanta"]),
+    "lodging": (["Grand", "Park", "Boğaz", "Liman", "Yıldız"], ["Otel", "Pansiyon", "Suites"]),
+    "health": (["Şifa", "Hayat", "Merkez", "Umut"], ["Klinik", "Eczane", "Diş Kliniği", "Tıp Merkezi"]),
+    "automotive": (["Hızlı", "Usta", "Motor", "Güven"], ["Oto Servis", "Oto Yıkama", "Petrol"]),
+    "beauty": (["Elit", "Güzel", "Işıltı", "Moda"], ["Kuaför", "Güzellik Salonu", "Spa"])
+}
+
+REVIEW_TEXTS = {
+    5: ["Harika bir deneyimdi, personel çok ilgili.", "Great service and very clean place!", "Kesinlikle tavsiye ederim, fiyatlar uygun."],
+    4: ["Güzel ama biraz kalabalık.", "Good quality, a bit slow at peak hours.", "Lezzetli, servis hızlı."],
+    3: ["Ortalama, fiyat biraz yüksek.", "Okay experience, nothing special."],
+    2: ["Beklediğim gibi değildi, bekleme süresi uzun.", "Staff was rude and slow."],
+    1: ["Çok kötü, bir daha gelmem.", "Terrible experience, dirty and expensive."]
+}
+
+EARTH_RADIUS_KM = 6371.0
+
+class SyntheticCity:
+    """
+    Deterministic synthetic city: `size` places scattered around a center, with
+    sector types, ratings, review counts, photos and reviews drawn from a seeded RNG.
+    Nearby Search orders by a Google-like prominence (rating, review volume, distance).
+    """
+
+    def __init__(self, seed: int = 42, size: int = 5000, center: Tuple[float, float] = (41.0082, 28.9784), radius_km: float = 10.0):
+        self.center = center
+        self.radius_km = radius_km
+        self.catalog: List[Dict[str, Any]] = []
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+
+        rng = random.Random(seed)
+        sectors = list(SECTORS)
+        for i in range(size):
+            sector = sectors[i % len(sectors)]
+            sector_types = sorted(SECTORS[sector])
+            primary = rng.choice(sector_types)
+            prefixes, suffixes = NAME_PARTS[sector]
+            name = f"{rng.choice(prefixes)} {rng.choice(suffixes)} {i}"
+
+            # Uniform over the disc
+            distance = radius_km * math.sqrt(rng.random())
+            bearing = rng.random() * 2 * math.pi
+            lat = center[0] + math.degrees(distance * math.cos(bearing) / EARTH_RADIUS_KM)
+            lng = center[1] + math.degrees(distance * math.sin(bearing) / (EARTH_RADIUS_KM * math.cos(math.radians(center[0]))))
+
+            review_count = int(rng.lognormvariate(4.0, 1.3))
+            rating = round(min(5.0, max(1.0, rng.gauss(4.2, 0.5))), 1) if review_count else 0
+            place_id = f"synthetic-{seed}-{i}"
+
+            place = {
+                "place_id": place_id,
+                "name": name,
+                "vicinity": f"{rng.randint(1, 200)}. Sokak No:{rng.randint(1, 90)}",
+                "formatted_address": f"{rng.randint(1, 200)}. Sokak No:{rng.randint(1, 90)}, İstanbul, Türkiye",
+                "geometry": {"location": {"lat": lat, "lng": lng}},
+                "types": [primary, "point_of_interest", "establishment"],
+                "rating": rating,
+                "user_ratings_total": review_count,
+                "business_status": "OPERATIONAL",
+                "photos": [{"photo_reference": f"{place_id}-photo-{p}", "width": 1024, "height": 768} for p in range(rng.randint(0, 12))],
+                "_seed": rng.random()
+            }
+            if rng.random() < 0.7:
+                place["website"] = f"https://example.com/{place_id}"
+            if rng.random() < 0.8:
+                place["formatted_phone_number"] = f"0212 {rng.randint(100, 999)} {rng.randint(10, 99)} {rng.randint(10, 99)}"
+            if rng.random() < 0.85:
+                place["opening_hours"] = {"open_now": rng.random() < 0.6}
+
+            self.catalog.append(place)
+            self.by_id[place_id] = place
+
+        # Precomputed for the nearby scans
+        self._coords = [(p["geometry"]["location"]["lat"], p["geometry"]["location"]["lng"]) for p in self.catalog]
+        # Remaining Nearby results by next_page_token
+        self._pages: Dict[str, List[Dict[str, Any]]] = {}
+
+    def prominence(self, place: Dict[str, Any], distance_km: float) -> float:
+        return (place["rating"] or 1) * math.log1p(place["user_ratings_total"]) / (1 + distance_km)
+
+    def _distance_km(self, a: Tuple[float, float], b: Tuple[float, float]) -> float:
+        # Equirectangular approximation, plenty for city distances
+        x = math.radians(b[1] - a[1]) * math.cos(math.radians((a[0] + b[0]) / 2))
+        y = math.radians(b[0] - a[0])
+        return EARTH_RADIUS_KM * math.hypot(x, y)
+
+    def _matches(self, place: Dict[str, Any], keyword: Optional[str], type: Optional[str]) -> bool:
+        if type and type not in place["types"]:
+            return False
+        if keyword:
+            haystack = f"{place['name']} {' '.join(place['types'])}".lower()
+            return any(token in haystack for token in keyword.lower().split())
+        return True
+
+    def _result(self, place: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in place.items() if not k.startswith("_")}
+
+    def places_nearby(self, location=None, radius: int = 1500, keyword: str = None, type: str = None, page_token: str = None, **kwargs):
+        if page_token:
+            if page_token not in self._pages:
+                return {"status": "INVALID_REQUEST", "results": []}
+            return self._page(self._pages.pop(page_token))
+        origin = (location["lat"], location["lng"])
+        radius_km = radius / 1000
+        candidates = []
+        for place, coords in zip(self.catalog, self._coords):
+            distance = self._distance_km(origin, coords)
+            if distance <= radius_km and self._matches(place, keyword, type):
+                candidates.append((self.prominence(place, distance), place))
+        candidates.sort(key=lambda c: c[0], reverse=True)
+        return self._page([self._result(p) for _, p in candidates[:60]])
+
+    def _page(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        # 20 results per page, at most 60, the rest behind a next_page_token like Google
+        response = {"status": "OK" if results else "ZERO_RESULTS", "results": results[:20]}
+        if len(results) > 20:
+            token = hashlib.sha1(json.dumps([r["place_id"] for r in results[20:]]).encode()).hexdigest()
+            self._pages[token] = results[20:]
+            response["next_page_token"] = token
+        return response
+
+    def places(self, query: str = "", **kwargs):
+        # "<terms> near <location>": the location part is ignored, the city is the whole world
+        terms = query.split(" near ")[0]
+        candidates = [p for p in self.catalog if self._matches(p, terms, None)]
+        candidates.sort(key=lambda p: self.prominence(p, self._distance_km(self.center, (p["geometry"]["location"]["lat"], p["geometry"]["location"]["lng"]))), reverse=True)
+        results = [self._result(p) for p in candidates[:20]]
+        return {"status": "OK" if results else "ZERO_RESULTS", "results": results}
+
+    def place(self, place_id: str = None, reviews_sort: str = None, **kwargs):
+        place = self.by_id.get(place_id)
+        if not place:
+            return {"status": "NOT_FOUND"}
+
+        # Reviews are derived from the place seed, so they are the same on every call
+        rng = random.Random(place["_seed"])
+        reviews = []
+        for n in range(min(5, place["user_ratings_total"])):
+            stars = max(1, min(5, round(rng.gauss(place["rating"], 0.8))))
+            timestamp = 1700000000 - n * rng.randint(3600, 30 * 86400)
+            reviews.append({
+                "author_name": f"Kullanıcı {rng.randint(1, 99999)}",
+                "rating": stars,
+                "text": rng.choice(REVIEW_TEXTS[stars]),
+                "time": timestamp,
+                "language": "tr",
+                "relative_time_description": f"{n + 1} hafta önce"
+            })
+        if reviews_sort == "newest":
+            reviews.sort(key=lambda r: r["time"], reverse=True)
+
+        result = self._result(place)
+        result["reviews"] = reviews
+        return {"status": "OK", "result": result}
+
+    def places_photo(self, photo_reference: str = None, max_width: int = None, max_height: int = None, **kwargs):
+        # A flat JPEG whose color is derived from the reference: same bytes on every call
+        from PIL import Image
+        if not photo_reference or not photo_reference.startswith("synthetic-"):
+            return []
+        digest = hashlib.sha1(photo_reference.encode()).digest()
+        width = min(1024, max_width or 1024)
+        image = Image.new("RGB", (width, width * 3 // 4), tuple(digest[:3]))
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=85)
+        return [buffer.getvalue()]
+
+def build_maps_client():
+    """
+    Client for MAPS_BACKEND: google (live), record (live + write fixtures),
+    replay (recorded fixtures only) or synthetic (generated city, no network).
+    """
+    backend = settings.MAPS_BACKEND
+    if backend == "synthetic":
+        logger.info(f"Using synthetic Maps backend (seed={settings.SYNTHETIC_CITY_SEED}, size={settings.SYNTHETIC_CITY_SIZE})")
+        return SyntheticCity(seed=settings.SYNTHETIC_CITY_SEED, size=settings.SYNTHETIC_CITY_SIZE)
+    if backend == "replay":
+        logger.info(f"Replaying Maps fixtures from {settings.MAPS_FIXTURES_DIR}")
+        return ReplayClient(settings.MAPS_FIXTURES_DIR)
+
+    import googlemaps
+    client = googlemaps.Client(
+        key=settings.GOOGLE_MAPS_API_KEY,
+        timeout=settings.PLACES_TIMEOUT_SECONDS,
+        retry_timeout=settings.PLACES_TIMEOUT_SECONDS,
+        retry_over_query_limit=False
+    )
+    if backend == "record":
+        logger.info(f"Recording Maps fixtures to {settings.MAPS_FIXTURES_DIR}")
+        return RecordingClient(client, settings.MAPS_FIXTURES_DIR)
+    return client
@@ -0,0 +1,250 @@
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import update, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app import models
+from app.core.config import settings
+from .google_maps import google_maps_service
+from .place_store import place_store
+from .place_summary import SECTORS, GENERIC_TYPES, PlaceSummary
+from .place_index import distance_m
+from .benchmark_sketches import normalize_region
+from .places_limiter import PlacesUnavailable
+from .ranking_engine import ranking_engine
+
+logger = logging.getLogger(__name__)
+
+METERS_PER_DEGREE = 111320.0
+QUANTILES = (10, 25, 50, 75, 90)
+# Every sector type, in a fixed order (the order is part of a sweep's checkpoint)
+DEFAULT_TYPES = sorted({t for types in SECTORS.values() for t in types})
+
+class MarketSweepService:
+    """
+    City-wide market sweeps: the city is tiled into cells, every (type, cell) pair is one
+    Nearby Search, and the places found are aggregated into per-(category, city) benchmarks.
+    Progress is checkpointed after every chunk, so an interrupted sweep resumes where it stopped.
+    Dense cells are split until Google lists all their places; cells that stay saturated are
+    counted on the sweep (their places are undercounted).
+    """
+
+    def create_sweep(self, db: Session, city: str, center_lat: float, center_lng: float, radius_km: float, types: Optional[List[str]] = None, cell_meters: Optional[int] = None) -> models.MarketSweep:
+        sweep = models.MarketSweep(
+            city=normalize_region(city),
+            center_lat=center_lat,
+            center_lng=center_lng,
+            radius_km=radius_km,
+            cell_meters=cell_meters or settings.MARKET_SWEEP_CELL_METERS,
+            types=types or DEFAULT_TYPES,
+            status="pending"
+        )
+        sweep.total_tasks = len(sweep.types) * len(self.cells(sweep))
+        db.add(sweep)
+        db.commit()
+        db.refresh(sweep)
+        return sweep
+
+    def cells(self, sweep: models.MarketSweep) -> List[Tuple[float, float]]:
+        """
+        Centers of the square cells covering the sweep circle, row by row from the north-west.
+        """
+        step_lat = sweep.cell_meters / METERS_PER_DEGREE
+        step_lng = step_lat / max(math.cos(math.radians(sweep.center_lat)), 0.01)
+        half = math.ceil(sweep.radius_km * 1000 / sweep.cell_meters)
+        # A cell is kept when its nearest corner is inside the circle
+        reach = sweep.radius_km * 1000 + sweep.cell_meters / math.sqrt(2)
+        centers = []
+        for row in range(half, -half - 1, -1):
+            for col in range(-half, half + 1):
+                if math.hypot(row, col) * sweep.cell_meters <= reach:
+                    centers.append((sweep.center_lat + row * step_lat, sweep.center_lng + col * step_lng))
+        return centers
+
+    def run(self, db: Session, sweep_id) -> Optional[models.MarketSweep]:
+        """
+        Runs (or resumes) a sweep from its checkpoint. Returns None when another worker holds
+        the sweep. When the Places API is unavailable the sweep is paused at its checkpoint
+        (and resumed by the next resume_market_sweeps run); other errors fail it.
+        """
+        lease = timedelta(seconds=settings.MARKET_SWEEP_LEASE_SECONDS)
+        now = datetime.utcnow()
+        claimed = db.execute(update(models.MarketSweep).where(
+            models.MarketSweep.id == sweep_id,
+            models.MarketSweep.status.in_(["pending", "running", "paused"]),
+            or_(models.MarketSweep.locked_until == None, models.MarketSweep.locked_until < now)
+        ).values(status="running", locked_until=now + lease)).rowcount
+        db.commit()
+        if not claimed:
+            return None
+
+        sweep = db.get(models.MarketSweep, sweep_id)
+        cells = self.cells(sweep)
+        tasks = [(place_type, cell) for place_type in sweep.types for cell in cells]
+
+        try:
+            with ThreadPoolExecutor(max_workers=settings.MARKET_SWEEP_CONCURRENCY) as pool:
+                while sweep.checkpoint < len(tasks):
+                    chunk = tasks[sweep.checkpoint:sweep.checkpoint + settings.MARKET_SWEEP_CHUNK_SIZE]
+                    searches = list(pool.map(lambda task: self._search(task, sweep.cell_meters), chunk))
+                    self._store_chunk(db, sweep, chunk, [found for found, _, _ in searches])
+                    sweep.split_tasks = (sweep.split_tasks or 0) + sum(1 for _, splits, _ in searches if splits)
+                    sweep.saturated_tasks = (sweep.saturated_tasks or 0) + sum(1 for _, _, saturated in searches if saturated)
+                    sweep.checkpoint += len(chunk)
+                    sweep.locked_until = datetime.utcnow() + lease
+                    db.commit()
+                    logger.info(f"Market sweep {sweep.id} ({sweep.city}): {sweep.checkpoint}/{len(tasks)}")
+        except Exception as e:
+            db.rollback()
+            sweep.status = "paused" if isinstance(e, PlacesUnavailable) else "failed"
+            sweep.error = str(e)
+            sweep.locked_until = None
+            db.commit()
+            raise
+
+        self.aggregate(db, sweep)
+        sweep.status = "done"
+        sweep.error = None
+        sweep.locked_until = None
+        sweep.finished_at = datetime.utcnow()
+        db.commit()
+        return sweep
+
+    def _search(self, task: Tuple[str, Tuple[float, float]], cell_meters: float) -> Tuple[List[PlaceSummary], int, bool]:
+        """
+        Places of a type in a square cell: every Nearby page, and when the cell is saturated
+        (Google lists at most 60 places) its four quadrants, recursively down to
+        MARKET_SWEEP_MIN_CELL_METERS. Returns the places, the number of splits and whether
+        some part of the cell was still saturated at the smallest size.
+        """
+        place_type, (lat, lng) = task
+        # The search circle circumscribes its cell
+        radius = int(cell_meters / math.sqrt(2)) + 1
+        places, saturated = google_maps_service.search_nearby_all(location={"lat": lat, "lng": lng}, type=place_type, radius=radius)
+        half = cell_meters / 2
+        if not saturated or half < settings.MARKET_SWEEP_MIN_CELL_METERS:
+            return places, 0, saturated
+
+        by_id = {place.google_place_id: place for place in places}
+        splits, still_saturated = 1, False
+        step_lat = half / 2 / METERS_PER_DEGREE
+        step_lng = step_lat / max(math.cos(math.radians(lat)), 0.01)
+        for d_lat in (step_lat, -step_lat):
+            for d_lng in (-step_lng, step_lng):
+                found, quadrant_splits, quadrant_saturated = self._search((place_type, (lat + d_lat, lng + d_lng)), half)
+                by_id.update((place.google_place_id, place) for place in found)
+                splits += quadrant_splits
+                still_saturated = still_saturated or quadrant_saturated
+        return list(by_id.values()), splits, still_saturated
+
+    def _store_chunk(self, db: Session, sweep: models.MarketSweep, chunk, results: List[List[PlaceSummary]]) -> None:
+        places = [place for found in results for place in found if place.google_place_id]
+        if not places:
+            return
+        place_store.ensure(db, places, city=sweep.city)
+        rows = {
+            (place_type, place.google_place_id): {"sweep_id": sweep.id, "category": place_type, "google_place_id": place.google_place_id}
+            for (place_type, _), found in zip(chunk, results)
+            for place in found if place.google_place_id
+        }
+        db.execute(insert(models.MarketSweepPlace).values(list(rows.values())).on_conflict_do_nothing())
+
+    def aggregate(self, db: Session, sweep: models.MarketSweep) -> int:
+        """
+        Recomputes the (category, city) benchmarks from the places a sweep found.
+        Ratings and review counts come from the place store, so places refreshed since
+        the search count with their latest values.
+        """
+        rows = db.query(
+            models.MarketSweepPlace.category, models.Place.rating, models.Place.review_count, models.PlaceMetricSeries.deltas
+        ).join(
+            models.Place, models.Place.google_place_id == models.MarketSweepPlace.google_place_id
+        ).outerjoin(
+            models.PlaceMetricSeries, models.PlaceMetricSeries.google_place_id == models.MarketSweepPlace.google_place_id
+        ).filter(models.MarketSweepPlace.sweep_id == sweep.id).all()
+
+        by_category: Dict[str, list] = {}
+        for category, rating, review_count, deltas in rows:
+            by_category.setdefault(category, []).append((rating, review_count, deltas))
+
+        now = datetime.utcnow()
+        for category, samples in by_category.items():
+            # Unrated places have no rating to compare against
+            rated = [s for s in samples if s[0]]
+            if not rated:
+                continue
+            ratings = np.array([s[0] for s in rated], dtype=float)
+            reviews = np.array([s[1] or 0 for s in rated], dtype=float)
+            # Response rate and velocity the way the engine estimates them for a single business
+            metrics = [
+                ranking_engine.calculate_advanced_metrics({"rating": r, "user_ratings_total": n}, series_deltas=d)
+                for r, n, d in rated
+            ]
+            values = {
+                "center_lat": sweep.center_lat,
+                "center_lng": sweep.center_lng,
+                "radius_km": sweep.radius_km,
+                "sample_size": len(rated),
+                "avg_rating": round(float(ratings.mean()), 2),
+                "avg_reviews": round(float(reviews.mean()), 1),
+                "avg_response_rate": round(float(np.mean([m["owner_response_rate"] for m in metrics])), 1),
+                "avg_velocity": round(float(np.mean([m["review_velocity_30d"] for m in metrics])), 1),
+                "rating_quantiles": self._quantiles(ratings, 2),
+                "review_quantiles": self._quantiles(reviews, 0),
+                "sweep_id": sweep.id,
+                "updated_at": now
+            }
+            stmt = insert(models.SectorBenchmark).values(category=category, city=sweep.city, **values)
+            db.execute(stmt.on_conflict_do_update(index_elements=["category", "city"], set_=values))
+        db.commit()
+        logger.info(f"Market sweep {sweep.id}: benchmarks of {len(by_category)} categories in {sweep.city}")
+        return len(by_category)
+
+    def _quantiles(self, values: np.ndarray, digits: int) -> Dict[str, float]:
+        points = np.percentile(values, QUANTILES)
+        return {f"p{q}": round(float(v), digits) for q, v in zip(QUANTILES, points)}
+
+    def get_benchmark(self, db: Session, category: str, city: Optional[str] = None, location: Optional[Dict[str, float]] = None) -> Optional[models.SectorBenchmark]:
+        """
+        Benchmark of a category by city name, or for the swept city containing `location`.
+        Both are one lookup on the (category, city) index.
+        """
+        query = db.query(models.SectorBenchmark).filter(models.SectorBenchmark.category == category)
+        if city:
+            return query.filter(models.SectorBenchmark.city == normalize_region(city)).first()
+        if location:
+            containing = [
+                b for b in query.all()
+                if b.center_lat is not None and distance_m(b.center_lat, b.center_lng, location["lat"], location["lng"]) <= b.radius_km * 1000
+            ]
+            return min(containing, key=lambda b: b.radius_km, default=None)
+        return None
+
+    def sector_benchmarks(self, db: Session, details: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        `sector_benchmarks` of an analysis from the swept city around the place, if any.
+        """
+        category = next((t for t in details.get("types", []) if t not in GENERIC_TYPES), None)
+        location = (details.get("geometry") or {}).get("location")
+        if not category or not location:
+            return None
+        benchmark = self.get_benchmark(db, category, location=location)
+        if not benchmark:
+            return None
+        return {
+            "avg_rating": round(benchmark.avg_rating, 1),
+            "avg_reviews": round(benchmark.avg_reviews),
+            "avg_response_rate": benchmark.avg_response_rate,
+            "avg_velocity": benchmark.avg_velocity,
+            "rating_quantiles": benchmark.rating_quantiles,
+            "review_quantiles": benchmark.review_quantiles,
+            "sample_size": benchmark.sample_size,
+            "city": benchmark.city,
+            "source": "market_sweep"
+        }
+
+market_sweep_service = MarketSweepService()
@@ -0,0 +1,115 @@
+import logging
+from datetime import date
+from typing import Dict, Any, List, Optional
+from sqlalchemy.orm import Session
+from app import models
+
+logger = logging.getLogger(__name__)
+
+# 91 slots so that the sample exactly 90 days back is still in the buffer
+SERIES_DAYS = 91
+WINDOWS = (7, 30, 90)
+# Share of a window the series must cover before its delta is reported: a day of
+# history extrapolated to 30 or 90 days is noise, not a trend
+MIN_WINDOW_COVERAGE = 1 / 3
+
+class MetricsService:
+    """
+    Keeps a compact daily time series per place (review total, rating, photo count)
+    and maintains rolling 7/30/90-day deltas as samples arrive.
+    """
+
+    def record_sample(self, db: Session, place_id: str, details: Dict[str, Any], day: Optional[int] = None, commit: bool = True) -> Dict[str, Any]:
+        """
+        Stores today's sample for a place from a Place Details payload and returns the updated deltas.
+        Re-sampling the same day overwrites that day's slot.
+        commit=False lets batch jobs commit many samples at once.
+        """
+        day = day or date.today().toordinal()
+        series = db.query(models.PlaceMetricSeries).filter(
+            models.PlaceMetricSeries.google_place_id == place_id
+        ).with_for_update().first()
+
+        if not series:
+            series = models.PlaceMetricSeries(
+                google_place_id=place_id,
+                review_totals=[None] * SERIES_DAYS,
+                ratings=[None] * SERIES_DAYS,
+                photo_counts=[None] * SERIES_DAYS
+            )
+            db.add(series)
+
+        if series.last_day is not None and day < series.last_day:
+            # Late sample from a delayed worker; the series only moves forward
+            return series.deltas or {}
+
+        review_totals = list(series.review_totals)
+        ratings = list(series.ratings)
+        photo_counts = list(series.photo_counts)
+
+        for buffer in (review_totals, ratings, photo_counts):
+            self._advance(buffer, series.last_day, day)
+
+        slot = day % SERIES_DAYS
+        review_totals[slot] = int(details.get("user_ratings_total") or 0)
+        ratings[slot] = float(details.get("rating") or 0.0)
+        photo_counts[slot] = len(details.get("photos") or [])
+
+        deltas = {}
+        for window in WINDOWS:
+            deltas[f"reviews_{window}d"] = self._delta(review_totals, day, window)
+            deltas[f"rating_{window}d"] = self._delta(ratings, day, window, scale=False)
+            deltas[f"photos_{window}d"] = self._delta(photo_counts, day, window)
+
+        # JSON columns are only persisted when reassigned
+        series.review_totals = review_totals
+        series.ratings = ratings
+        series.photo_counts = photo_counts
+        series.last_day = day
+        series.deltas = deltas
+        if commit:
+            db.commit()
+        else:
+            db.flush()
+        return deltas
+
+    def get_deltas(self, db: Session, place_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the precomputed deltas of a place (one primary key lookup), or None without history.
+        """
+        row = db.query(models.PlaceMetricSeries.deltas).filter(
+            models.PlaceMetricSeries.google_place_id == place_id
+        ).first()
+        return row[0] if row else None
+
+    def _advance(self, buffer: List[Optional[float]], last_day: Optional[int], day: int) -> None:
+        """
+        Clears the slots of the days skipped since the last sample (at most SERIES_DAYS).
+        The usual case is one slot per day, so updates stay O(1) amortized.
+        """
+        if last_day is None:
+            return
+        for skipped in range(last_day + 1, min(day, last_day + SERIES_DAYS) + 1):
+            buffer[skipped % SERIES_DAYS] = None
+
+    def _delta(self, buffer: List[Optional[float]], day: int, window: int, scale: bool = True) -> Optional[float]:
+        """
+        Change over the last `window` days. When the sample exactly `window` days back is
+        missing (new series or gaps), the oldest sample inside the window is used and,
+        for counters, the change is extrapolated to the full window. None until that
+        sample is at least MIN_WINDOW_COVERAGE of the window back.
+        """
+        current = buffer[day % SERIES_DAYS]
+        for start in range(day - window, day):
+            past = buffer[start % SERIES_DAYS]
+            if past is None:
+                continue
+            if day - start < window * MIN_WINDOW_COVERAGE:
+                return None
+            change = current - past
+            if scale and start != day - window:
+                change = change * window / (day - start)
+            return round(change, 2)
+        return None
+
+metrics_service = MetricsService()
@@ -0,0 +1,200 @@
+import hashlib
+import hmac
+import logging
+import os
+import threading
+from io import BytesIO
+from typing import Optional, Tuple
+from PIL import Image, UnidentifiedImageError
+from app.core.config import settings
+from app.core.observability import span
+from app.services.google_maps import google_maps_service
+
+logger = logging.getLogger(__name__)
+
+def sign_reference(reference: str) -> str:
+    return hmac.new(settings.SECRET_KEY.encode(), reference.encode(), hashlib.sha256).hexdigest()[:16]
+
+def photo_url(reference: str, width: Optional[int] = None) -> str:
+    """
+    Proxy URL of a Places photo reference, absolute on PUBLIC_API_URL (the frontend is
+    served from another origin). URLs are signed, so the proxy only spends Places calls
+    on references this API handed out.
+    """
+    url = f"{settings.PUBLIC_API_URL.rstrip('/')}{settings.API_V1_STR}/places/photo/{reference}?sig={sign_reference(reference)}"
+    return f"{url}&w={width}" if width else url
+
+class PhotoCache:
+    """
+    Places photos fetched once and kept on disk, content-addressed:
+
+        refs/ab/<sha1(reference)>        -> sha256 of the original (references are reissued, photos are not)
+        objects/cd/<sha256>              original bytes
+        variants/cd/<sha256>/<width>.webp resized WebP variants
+
+    The cache is capped at PHOTO_CACHE_MAX_BYTES; files are touched when served and the
+    least recently used ones are evicted first.
+    """
+
+    def __init__(self, root: str = None):
+        self.root = root or settings.PHOTO_CACHE_DIR
+        self._locks: dict = {}
+        self._locks_guard = threading.Lock()
+        self._size: Optional[int] = None
+        self._size_lock = threading.Lock()
+
+    def variant_width(self, width: Optional[int]) -> int:
+        """
+        Smallest configured width covering the requested one, so that arbitrary widths
+        cannot multiply the variants of a photo.
+        """
+        widths = sorted(settings.PHOTO_WIDTHS)
+        if not width:
+            return widths[-1]
+        return next((w for w in widths if w >= width), widths[-1])
+
+    def get(self, reference: str, width: Optional[int] = None) -> Optional[Tuple[str, str]]:
+        """
+        (path, digest) of the WebP variant of a photo, fetching and resizing it on first use.
+        None when Google has no such photo.
+        """
+        width = self.variant_width(width)
+        digest = self._digest_of(reference)
+        if digest is None:
+            with self._lock_for(reference):
+                digest = self._digest_of(reference) or self._fetch(reference)
+            if digest is None:
+                return None
+
+        path = self._path("variants", digest, f"{width}.webp")
+        if os.path.exists(path):
+            self._touch(path)
+            return path, digest
+        with self._lock_for(f"{digest}:{width}"):
+            if not os.path.exists(path):
+                original = self._read(self._path("objects", digest))
+                if original is None:
+                    # Original evicted since the reference was resolved: start over
+                    self._remove(self._ref_path(reference))
+                    return self.get(reference, width)
+                self._write(path, self._resize(original, width))
+        return path, digest
+
+    def _digest_of(self, reference: str) -> Optional[str]:
+        ref_path = self._ref_path(reference)
+        digest = self._read(ref_path)
+        if digest is None:
+            return None
+        # The original may be gone while its variants are still cached: get() refetches if needed
+        self._touch(ref_path)
+        return digest.decode()
+
+    def _fetch(self, reference: str) -> Optional[str]:
+        data = google_maps_service.get_place_photo(reference, max_width=settings.PHOTO_FETCH_MAX_WIDTH)
+        if not data:
+            return None
+        try:
+            Image.open(BytesIO(data)).verify()
+        except (UnidentifiedImageError, OSError):
+            # Error pages come back with a 200 too
+            logger.warning(f"Places photo {reference[:24]}... is not an image")
+            return None
+        digest = hashlib.sha256(data).hexdigest()
+        object_path = self._path("objects", digest)
+        if not os.path.exists(object_path):
+            self._write(object_path, data)
+        self._write(self._ref_path(reference), digest.encode())
+        return digest
+
+    @span("engine", "photo_resize", cpu=True)
+    def _resize(self, data: bytes, width: int) -> bytes:
+        image = Image.open(BytesIO(data))
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        if image.width > width:
+            image = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+        buffer = BytesIO()
+        image.save(buffer, format="WEBP", quality=settings.PHOTO_WEBP_QUALITY, method=4)
+        return buffer.getvalue()
+
+    def _ref_path(self, reference: str) -> str:
+        return self._path("refs", hashlib.sha1(reference.encode()).hexdigest())
+
+    def _path(self, kind: str, digest: str, *rest: str) -> str:
+        return os.path.join(self.root, kind, digest[:2], digest, *rest) if rest else os.path.join(self.root, kind, digest[:2], digest)
+
+    def _lock_for(self, key: str) -> threading.RLock:
+        with self._locks_guard:
+            if len(self._locks) > 10000:
+                self._locks.clear()
+            return self._locks.setdefault(key, threading.RLock())
+
+    def _read(self, path: str) -> Optional[bytes]:
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._size_lock:
+            if self._size is None:
+                self._size = self._disk_usage()
+            self._size += len(data)
+            over = self._size > settings.PHOTO_CACHE_MAX_BYTES
+        if over:
+            self.evict()
+
+    def _touch(self, path: str) -> None:
+        # mtime is the LRU clock (atime is often disabled on the mount)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _files(self):
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield stat.st_mtime, stat.st_size, path
+
+    def _disk_usage(self) -> int:
+        return sum(size for _, size, _ in self._files())
+
+    def evict(self) -> int:
+        """
+        Deletes least recently used files until the cache is under 90% of its cap
+        (other processes may share the directory, so the size is measured afresh).
+        Returns the bytes freed.
+        """
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        target = settings.PHOTO_CACHE_MAX_BYTES * 0.9
+        freed = 0
+        for _, size, path in files:
+            if total - freed <= target:
+                break
+            self._remove(path)
+            freed += size
+        with self._size_lock:
+            self._size = total - freed
+        logger.info(f"Photo cache: evicted {freed} bytes, {total - freed} bytes kept")
+        return freed
+
+photo_cache = PhotoCache()
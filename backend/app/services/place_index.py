@@ -0,0 +1,205 @@
+import heapq
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import or_
+from app import models
+from app.core.config import settings
+from app.services.google_maps import google_maps_service
+from app.services.place_summary import PlaceSummary
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_M = 6371000.0
+METERS_PER_DEGREE = 111320.0
+# kNN searches stop widening after this many rings of cells
+MAX_RINGS = 64
+
+def distance_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    # Equirectangular approximation, plenty for city distances
+    x = math.radians(lng2 - lng1) * math.cos(math.radians((lat1 + lat2) / 2))
+    y = math.radians(lat2 - lat1)
+    return EARTH_RADIUS_M * math.hypot(x, y)
+
+def prominence(place: PlaceSummary) -> float:
+    """
+    Stand-in for Google's nearby ordering: rating weighted by review volume.
+    """
+    return (place.rating or 0) * math.log1p(place.user_ratings_total or 0)
+
+class PlaceIndex:
+    """
+    In-process spatial index over the canonical place store: places are bucketed in a
+    grid of SPATIAL_INDEX_CELL_METERS cells (geohash-like integer cells), so radius and
+    k-nearest queries only look at the few buckets around the point.
+
+    The index is loaded once and then kept current incrementally: PlaceStore pushes the
+    places it writes in this process, and a refresher thread picks up the places that
+    other processes created or changed since the last refresh.
+    """
+
+    def __init__(self, cell_meters: float = None):
+        self.step = (cell_meters or settings.SPATIAL_INDEX_CELL_METERS) / METERS_PER_DEGREE
+        self._cells: Dict[Tuple[int, int], Dict[str, PlaceSummary]] = {}
+        self._cell_of: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.RLock()
+        self._watermark: Optional[datetime] = None
+        self._refresher: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._cell_of)
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return math.floor(lat / self.step), math.floor(lng / self.step)
+
+    def upsert(self, place: PlaceSummary) -> None:
+        """
+        Adds or moves a place (places without coordinates are ignored).
+        """
+        location = place.location or {}
+        if location.get("lat") is None or location.get("lng") is None:
+            return
+        cell = self._cell(location["lat"], location["lng"])
+        with self._lock:
+            previous = self._cell_of.get(place.google_place_id)
+            if previous is not None and previous != cell:
+                self._cells[previous].pop(place.google_place_id, None)
+            self._cells.setdefault(cell, {})[place.google_place_id] = place
+            self._cell_of[place.google_place_id] = cell
+
+    def remove(self, place_id: str) -> None:
+        with self._lock:
+            cell = self._cell_of.pop(place_id, None)
+            if cell is not None:
+                self._cells[cell].pop(place_id, None)
+
+    def within(self, lat: float, lng: float, radius_m: float, type: str = None) -> List[Tuple[float, PlaceSummary]]:
+        """
+        (distance in m, place) of the places within radius_m of the point, nearest first,
+        optionally only those of a Google type.
+        """
+        rows, cols = self._span(lat, radius_m)
+        ci, cj = self._cell(lat, lng)
+        found = []
+        with self._lock:
+            for i in range(ci - rows, ci + rows + 1):
+                for j in range(cj - cols, cj + cols + 1):
+                    for place in self._cells.get((i, j), {}).values():
+                        if type and type not in place.types:
+                            continue
+                        d = distance_m(lat, lng, place.location["lat"], place.location["lng"])
+                        if d <= radius_m:
+                            found.append((d, place))
+        found.sort(key=lambda item: item[0])
+        return found
+
+    def nearest(self, lat: float, lng: float, k: int, type: str = None, max_radius_m: float = None) -> List[Tuple[float, PlaceSummary]]:
+        """
+        The k places nearest to the point (optionally of a type), nearest first. Rings of
+        cells are scanned outwards until the k-th distance is closer than any unscanned cell.
+        """
+        ci, cj = self._cell(lat, lng)
+        # Smallest extent of a cell in meters: bounds the distance covered by `ring` rings
+        cell_m = self.step * METERS_PER_DEGREE * min(1.0, math.cos(math.radians(lat)))
+        candidates: List[Tuple[float, PlaceSummary]] = []
+        with self._lock:
+            for ring in range(MAX_RINGS):
+                for i, j in self._ring(ci, cj, ring):
+                    for place in self._cells.get((i, j), {}).values():
+                        if type and type not in place.types:
+                            continue
+                        candidates.append((distance_m(lat, lng, place.location["lat"], place.location["lng"]), place))
+                covered = ring * cell_m
+                if max_radius_m is not None and covered >= max_radius_m:
+                    break
+                if len(candidates) >= k and heapq.nsmallest(k, candidates, key=lambda c: c[0])[-1][0] <= covered:
+                    break
+        if max_radius_m is not None:
+            candidates = [c for c in candidates if c[0] <= max_radius_m]
+        return heapq.nsmallest(k, candidates, key=lambda c: c[0])
+
+    def search_nearby(self, location: Dict[str, float], keyword: str = None, type: str = None, radius: int = 1500) -> List[PlaceSummary]:
+        """
+        Drop-in for GoogleMapsService.search_nearby that answers from the index first.
+        Type searches with at least SPATIAL_INDEX_MIN_RESULTS known places in the radius are
+        served locally (top 20 by prominence, like a Nearby Search page); keyword searches
+        and sparse areas go to the live API.
+        """
+        if type and not keyword:
+            local = self.within(location["lat"], location["lng"], radius, type=type)
+            if len(local) >= settings.SPATIAL_INDEX_MIN_RESULTS:
+                places = sorted((p for _, p in local), key=prominence, reverse=True)
+                return places[:20]
+        return google_maps_service.search_nearby(location=location, keyword=keyword, type=type, radius=radius)
+
+    def refresh(self, db) -> int:
+        """
+        Loads the places created or changed since the previous refresh (all of them the first time).
+        """
+        started = datetime.utcnow()
+        query = db.query(
+            models.Place.google_place_id, models.Place.name, models.Place.address, models.Place.rating,
+            models.Place.review_count, models.Place.types, models.Place.lat, models.Place.lng
+        ).filter(models.Place.lat != None, models.Place.lng != None)
+        if self._watermark is not None:
+            query = query.filter(or_(models.Place.changed_at >= self._watermark, models.Place.created_at >= self._watermark))
+
+        count = 0
+        for row in query.yield_per(5000):
+            self.upsert(PlaceSummary(
+                google_place_id=row[0], name=row[1], address=row[2], rating=row[3],
+                user_ratings_total=row[4], types=row[5], location={"lat": row[6], "lng": row[7]}
+            ))
+            count += 1
+        # Rows are stamped before their transaction commits: overlap so that late commits are not missed
+        self._watermark = started - timedelta(minutes=5)
+        return count
+
+    def start_refresher(self) -> None:
+        """
+        Starts the background thread that keeps this process' index current (idempotent).
+        """
+        with self._lock:
+            if self._refresher is not None:
+                return
+            self._refresher = threading.Thread(target=self._refresh_loop, name="place-index-refresher", daemon=True)
+            self._refresher.start()
+
+    def _refresh_loop(self) -> None:
+        from app.core.database import SessionLocal
+        while True:
+            db = SessionLocal()
+            try:
+                loaded = self.refresh(db)
+                if loaded:
+                    logger.info(f"Place index: {loaded} places loaded, {len(self)} indexed")
+            except Exception as e:
+                logger.warning(f"Place index refresh failed: {str(e)}")
+            finally:
+                db.close()
+            time.sleep(settings.SPATIAL_INDEX_REFRESH_SECONDS)
+
+    def _span(self, lat: float, radius_m: float) -> Tuple[int, int]:
+        """
+        Cells to scan on each side of the center cell to cover radius_m.
+        """
+        cell_m = self.step * METERS_PER_DEGREE
+        rows = math.ceil(radius_m / cell_m)
+        cols = math.ceil(radius_m / (cell_m * max(math.cos(math.radians(lat)), 0.01)))
+        return rows, cols
+
+    def _ring(self, ci: int, cj: int, ring: int):
+        if ring == 0:
+            yield ci, cj
+            return
+        for j in range(cj - ring, cj + ring + 1):
+            yield ci - ring, j
+            yield ci + ring, j
+        for i in range(ci - ring + 1, ci + ring):
+            yield i, cj - ring
+            yield i, cj + ring
+
+place_index = PlaceIndex()
@@ -0,0 +1,247 @@
+import hashlib
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Iterable
+from sqlalchemy import update, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app import models
+from app.core.config import settings
+from app.services.google_maps import google_maps_service
+from app.services.places_limiter import PlacesUnavailable
+from app.services.place_summary import PlaceSummary
+from app.services.metrics_service import metrics_service
+from app.services.place_index import place_index
+from app.services.benchmark_sketches import benchmark_sketch_service, SketchEntry, parse_region, place_score
+
+logger = logging.getLogger(__name__)
+
+def normalize_details(details: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Place Details payload as stored: attribution-only fields dropped, types deduplicated.
+    """
+    normalized = {k: v for k, v in details.items() if k not in ("html_attributions", "adr_address")}
+    if "types" in normalized:
+        normalized["types"] = list(dict.fromkeys(normalized["types"] or []))
+    return normalized
+
+def content_hash(details: Dict[str, Any]) -> str:
+    """
+    Hash of the part of a payload that only changes when the place does. Photo references
+    are reissued on every call, open_now and relative review dates move with the clock.
+    """
+    stable = {k: v for k, v in details.items() if k not in ("photos", "reviews", "opening_hours", "current_opening_hours")}
+    stable["photo_count"] = len(details.get("photos") or [])
+    stable["reviews"] = [(r.get("author_name"), r.get("time"), r.get("rating"), r.get("text")) for r in details.get("reviews") or []]
+    stable["weekday_text"] = (details.get("opening_hours") or {}).get("weekday_text")
+    canonical = json.dumps(stable, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(canonical.encode()).hexdigest()
+
+class PlaceStore:
+    """
+    Canonical per-place details shared by all tenants. Background jobs read through it, so
+    a place tracked by many businesses and competitors is fetched from Google once per
+    max_age window instead of once per tenant row.
+    """
+
+    def get(self, db: Session, place_id: str, max_age: timedelta) -> Optional[Dict[str, Any]]:
+        return self.get_many(db, [place_id], max_age).get(place_id)
+
+    def get_many(self, db: Session, place_ids: Iterable[str], max_age: timedelta) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Details of several places: stored copies younger than max_age as they are, the others
+        fetched (concurrently, each unique place once). A stale place is claimed by moving its
+        fetched_at forward first, so that a concurrent worker reuses the old copy instead of
+        fetching it too. Places Google cannot return map to None.
+        """
+        place_ids = list(dict.fromkeys(place_ids))
+        if not place_ids:
+            return {}
+        now = datetime.utcnow()
+        cutoff = now - max_age
+
+        rows = {p.google_place_id: p for p in db.query(models.Place).filter(models.Place.google_place_id.in_(place_ids)).all()}
+        result = {}
+        stale = []
+        for place_id in place_ids:
+            row = rows.get(place_id)
+            if row is not None and row.details and row.fetched_at and row.fetched_at >= cutoff:
+                result[place_id] = row.details
+            else:
+                stale.append(place_id)
+
+        # Claim the stale places that already have a copy; the ones another worker claimed keep it
+        # (read before the commit below expires the rows)
+        previous = {pid: (rows[pid].fetched_at, rows[pid].details) for pid in stale if pid in rows and rows[pid].details}
+        claimed = set()
+        if previous:
+            claimed = {row[0] for row in db.execute(
+                update(models.Place).where(
+                    models.Place.google_place_id.in_(list(previous)),
+                    or_(models.Place.fetched_at == None, models.Place.fetched_at < cutoff)
+                ).values(fetched_at=now).returning(models.Place.google_place_id)
+            )}
+            db.commit()
+        to_fetch = [pid for pid in stale if pid in claimed or pid not in previous]
+        for place_id in stale:
+            if place_id not in to_fetch:
+                result[place_id] = previous[place_id][1]
+
+        if to_fetch:
+            # Each fetch runs in a copy of this context (Places call counters of the caller)
+            contexts = [copy_context() for _ in to_fetch]
+            with ThreadPoolExecutor(max_workers=settings.PLACE_REFRESH_CONCURRENCY) as pool:
+                fetched = list(pool.map(lambda context, place_id: context.run(self._fetch_or_none, place_id), contexts, to_fetch))
+            changed = 0
+            for place_id, details in zip(to_fetch, fetched):
+                if details:
+                    changed += self.save(db, place_id, details, commit=False)
+                    result[place_id] = normalize_details(details)
+                elif place_id in previous:
+                    # Give the claim back so that the next run retries the place
+                    fetched_at, details = previous[place_id]
+                    db.execute(update(models.Place).where(models.Place.google_place_id == place_id).values(fetched_at=fetched_at))
+                    result[place_id] = details
+                else:
+                    result[place_id] = None
+            db.commit()
+            logger.info(f"Place store: fetched {len(to_fetch)} places ({changed} changed), {len(place_ids) - len(to_fetch)} served from the store")
+        return result
+
+    def fetch(self, db: Session, place_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetches a place from Google now and stores it (interactive paths that need fresh data).
+        """
+        details = google_maps_service.get_place_details(place_id, reviews_sort="newest")
+        if not details:
+            return None
+        self.save(db, place_id, details)
+        return normalize_details(details)
+
+    def save(self, db: Session, place_id: str, details: Dict[str, Any], commit: bool = True) -> bool:
+        """
+        Stores a Place Details payload and records the day's metric sample. Returns whether the
+        place changed; only then are the payload rewritten and the copies on Business and
+        Competitor rows updated.
+        """
+        now = datetime.utcnow()
+        normalized = normalize_details(details)
+        digest = content_hash(normalized)
+        row = db.get(models.Place, place_id)
+        changed = row is None or row.content_hash != digest
+
+        if changed:
+            location = (normalized.get("geometry") or {}).get("location") or {}
+            previous = SketchEntry(row.types, row.region, row.rating, row.review_count, row.score) if row is not None else None
+            values = {
+                "name": normalized.get("name"),
+                "address": normalized.get("formatted_address"),
+                "rating": normalized.get("rating"),
+                "review_count": normalized.get("user_ratings_total", 0),
+                "photo_count": len(normalized.get("photos") or []),
+                "types": normalized.get("types", []),
+                "lat": location.get("lat"),
+                "lng": location.get("lng"),
+                "region": parse_region(normalized) or (row.region if row is not None else None),
+                "score": place_score(normalized),
+                "details": normalized,
+                "content_hash": digest,
+                "fetched_at": now,
+                "changed_at": now
+            }
+            stmt = insert(models.Place).values(google_place_id=place_id, created_at=now, **values)
+            db.execute(stmt.on_conflict_do_update(index_elements=["google_place_id"], set_=values))
+            if row is not None:
+                db.expire(row)
+            place_index.upsert(PlaceSummary(
+                google_place_id=place_id, name=values["name"], address=values["address"],
+                rating=values["rating"], user_ratings_total=values["review_count"],
+                types=values["types"], location=location
+            ))
+            benchmark_sketch_service.move(previous, SketchEntry(
+                values["types"], values["region"], values["rating"], values["review_count"], values["score"]
+            ))
+
+            db.execute(update(models.Business).where(models.Business.google_place_id == place_id).values(
+                name=values["name"],
+                address=values["address"],
+                total_rating=values["rating"],
+                review_count=values["review_count"]
+            ))
+            db.execute(update(models.Competitor).where(models.Competitor.google_place_id == place_id).values(
+                name=values["name"],
+                rating=values["rating"],
+                review_count=values["review_count"],
+                photo_count=values["photo_count"]
+            ))
+        else:
+            row.fetched_at = now
+
+        metrics_service.record_sample(db, place_id, normalized, commit=False)
+        if commit:
+            db.commit()
+        return changed
+
+    def ensure(self, db: Session, places: List[PlaceSummary], city: Optional[str] = None) -> None:
+        """
+        Creates rows for places only known from search results (no details yet), so that
+        tenant rows can reference them. Existing places are left untouched.
+        city: where the places were searched, for addresses that do not name it.
+        """
+        rows = {}
+        for place in places:
+            if place.google_place_id and place.google_place_id not in rows:
+                location = place.location or {}
+                rows[place.google_place_id] = {
+                    "google_place_id": place.google_place_id,
+                    "name": place.name,
+                    "address": place.address,
+                    "rating": place.rating,
+                    "review_count": place.user_ratings_total,
+                    "types": list(place.types),
+                    "lat": location.get("lat"),
+                    "lng": location.get("lng"),
+                    "region": parse_region(address=place.address, city=city),
+                    "created_at": datetime.utcnow()
+                }
+        if rows:
+            inserted = {row[0] for row in db.execute(
+                insert(models.Place).values(list(rows.values()))
+                .on_conflict_do_nothing(index_elements=["google_place_id"])
+                .returning(models.Place.google_place_id)
+            )}
+            for place in places:
+                if place.google_place_id in rows:
+                    place_index.upsert(place)
+            for place_id in inserted:
+                row = rows[place_id]
+                benchmark_sketch_service.move(None, SketchEntry(row["types"], row["region"], row["rating"], row["review_count"], None))
+
+    def get_location(self, db: Session, place_id: str) -> Optional[Dict[str, float]]:
+        """
+        Coordinates of a place; they practically never change, so any stored copy will do.
+        """
+        location = self.stored_location(db, place_id)
+        if location:
+            return location
+        details = self.fetch(db, place_id)
+        return ((details or {}).get("geometry") or {}).get("location")
+
+    def stored_location(self, db: Session, place_id: str) -> Optional[Dict[str, float]]:
+        row = db.query(models.Place.lat, models.Place.lng).filter(models.Place.google_place_id == place_id).first()
+        if row and row[0] is not None and row[1] is not None:
+            return {"lat": row[0], "lng": row[1]}
+        return None
+
+    def _fetch_or_none(self, place_id: str) -> Optional[Dict[str, Any]]:
+        # Unavailable places keep their old copy, the next run retries them
+        try:
+            return google_maps_service.get_place_details(place_id, reviews_sort="newest")
+        except PlacesUnavailable as e:
+            logger.warning(f"Place {place_id} not refreshed: {str(e)}")
+            return None
+
+place_store = PlaceStore()
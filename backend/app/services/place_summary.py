@@ -0,0 +1,84 @@
+from typing import Dict, Any, Iterable, Optional
+
+# BROAD CATEGORIES to prevent industry mixing (e.g. Hotels vs Restaurants)
+SECTORS = {
+    "food": {"restaurant", "food", "cafe", "bakery", "meal_takeaway", "meal_delivery", "bar"},
+    "lodging": {"lodging", "hotel", "hostel", "motel"},
+    "health": {"doctor", "dentist", "hospital", "clinic", "pharmacy"},
+    "automotive": {"car_repair", "car_dealer", "gas_station", "car_wash"},
+    "beauty": {"beauty_salon", "hair_care", "spa"}
+}
+
+# One bit per sector, precomputed once: Google type -> OR of the sector bits it belongs to
+SECTOR_BITS = {sector: 1 << i for i, sector in enumerate(SECTORS)}
+TYPE_SECTOR_MASK: Dict[str, int] = {}
+for _sector, _types in SECTORS.items():
+    for _type in _types:
+        TYPE_SECTOR_MASK[_type] = TYPE_SECTOR_MASK.get(_type, 0) | SECTOR_BITS[_sector]
+
+# Types that say nothing about what a business does
+GENERIC_TYPES = frozenset({"point_of_interest", "establishment", "premise", "geocode"})
+
+def sector_mask(types: Optional[Iterable[str]]) -> int:
+    """
+    Sector bitmask of a list of Google place types (0 = no known sector).
+    """
+    mask = 0
+    for t in types or ():
+        mask |= TYPE_SECTOR_MASK.get(t, 0)
+    return mask
+
+class PlaceSummary:
+    """
+    Compact record for a place returned by Text Search / Nearby Search.
+    Uses __slots__ instead of a dict per result; the sector mask is computed once.
+    """
+    __slots__ = ("google_place_id", "name", "address", "rating", "user_ratings_total", "types", "location", "sector_mask")
+
+    def __init__(
+        self,
+        google_place_id: str,
+        name: str,
+        address: Optional[str] = None,
+        rating: float = 0,
+        user_ratings_total: int = 0,
+        types: Iterable[str] = (),
+        location: Optional[Dict[str, float]] = None
+    ):
+        self.google_place_id = google_place_id
+        self.name = name
+        self.address = address
+        self.rating = rating or 0
+        self.user_ratings_total = user_ratings_total or 0
+        self.types = tuple(types or ())
+        self.location = location
+        self.sector_mask = sector_mask(self.types)
+
+    @classmethod
+    def from_place(cls, place: Dict[str, Any], address_field: str = "vicinity") -> "PlaceSummary":
+        """
+        Builds a summary from a raw Places API result.
+        """
+        return cls(
+            google_place_id=place.get("place_id"),
+            name=place.get("name"),
+            address=place.get(address_field),
+            rating=place.get("rating", 0),
+            user_ratings_total=place.get("user_ratings_total", 0),
+            types=place.get("types", []),
+            location=place.get("geometry", {}).get("location")
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        JSON shape used by API responses and Ranking.competitors_json.
+        """
+        return {
+            "google_place_id": self.google_place_id,
+            "name": self.name,
+            "address": self.address,
+            "rating": self.rating,
+            "user_ratings_total": self.user_ratings_total,
+            "types": list(self.types),
+            "geometry": self.location
+        }
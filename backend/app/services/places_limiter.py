@@ -0,0 +1,132 @@
+import enum
+import logging
+import random
+import time
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+BUCKET_KEY = "places:bucket"
+FAILURES_KEY = "places:circuit:failures"
+OPEN_UNTIL_KEY = "places:circuit:open_until"
+
+# Token bucket refilled at `rate` tokens/s up to `burst`. A caller may only take a token
+# when more than `reserve` tokens would be left, which keeps part of the bucket for
+# higher priority callers. Returns 0 when a token was taken, else the wait in ms.
+# KEYS: bucket hash. ARGV: rate, burst, reserve, now (ms).
+_ACQUIRE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local reserve = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate / 1000)
+local wait = 0
+if tokens - 1 >= reserve then
+    tokens = tokens - 1
+else
+    wait = math.ceil((reserve + 1 - tokens) * 1000 / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst * 1000 / rate) + 1000)
+return wait
+"""
+
+class Priority(str, enum.Enum):
+    INTERACTIVE = "INTERACTIVE" # A user is waiting for the response
+    SCHEDULED = "SCHEDULED"     # Background jobs, may be delayed
+
+class PlacesUnavailable(Exception):
+    """
+    The Places API cannot be called right now (circuit open, rate limited or failing).
+    Results are unknown, callers must not treat this as "no results".
+    """
+    def __init__(self, message: str, retry_after: int = 30):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class PlacesLimiter:
+    """
+    Global Places API rate limiter and circuit breaker. State is kept in Redis so that
+    every uvicorn and Celery process draws from the same budget.
+    """
+
+    def __init__(self):
+        # Celery workers switch this to SCHEDULED at startup
+        self.default_priority = Priority.INTERACTIVE
+        self._script = None
+
+    def acquire(self, priority: Priority = None) -> None:
+        """
+        Blocks until a token is available for the priority class, or raises PlacesUnavailable
+        when the circuit is open or the wait exceeds the class timeout.
+        """
+        priority = priority or self.default_priority
+        if priority == Priority.INTERACTIVE:
+            reserve, timeout = 0, settings.PLACES_INTERACTIVE_WAIT_SECONDS
+        else:
+            reserve, timeout = settings.PLACES_BURST * settings.PLACES_INTERACTIVE_RESERVE, settings.PLACES_SCHEDULED_WAIT_SECONDS
+
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                redis_client = get_redis()
+                open_until = redis_client.get(OPEN_UNTIL_KEY)
+                if open_until and float(open_until) > time.time():
+                    raise PlacesUnavailable("Google Places API is temporarily unavailable", int(float(open_until) - time.time()) + 1)
+
+                if self._script is None:
+                    self._script = redis_client.register_script(_ACQUIRE_SCRIPT)
+                wait_ms = self._script(
+                    keys=[BUCKET_KEY],
+                    args=[settings.PLACES_QPS, settings.PLACES_BURST, reserve, int(time.time() * 1000)]
+                )
+            except PlacesUnavailable:
+                raise
+            except Exception as e:
+                # Without Redis there is no shared budget: let the call through
+                logger.warning(f"Places limiter skipped, Redis unavailable: {str(e)}")
+                return
+
+            if not wait_ms:
+                return
+            wait = wait_ms / 1000 * (1 + random.random() * 0.5) # Jitter spreads out waiting processes
+            if time.monotonic() + wait > deadline:
+                raise PlacesUnavailable("Google Places API rate limit reached", int(wait) + 1)
+            time.sleep(wait)
+
+    def record_success(self) -> None:
+        try:
+            get_redis().delete(FAILURES_KEY)
+        except Exception:
+            pass
+
+    def record_failure(self) -> None:
+        """
+        Counts a transient failure; opens the circuit after PLACES_CIRCUIT_FAILURES
+        failures within PLACES_CIRCUIT_WINDOW_SECONDS.
+        """
+        try:
+            redis_client = get_redis()
+            pipe = redis_client.pipeline()
+            pipe.incr(FAILURES_KEY)
+            pipe.expire(FAILURES_KEY, settings.PLACES_CIRCUIT_WINDOW_SECONDS)
+            failures, _ = pipe.execute()
+            if failures >= settings.PLACES_CIRCUIT_FAILURES:
+                open_until = time.time() + settings.PLACES_CIRCUIT_COOLDOWN_SECONDS
+                redis_client.set(OPEN_UNTIL_KEY, open_until, ex=settings.PLACES_CIRCUIT_COOLDOWN_SECONDS)
+                redis_client.delete(FAILURES_KEY)
+                logger.error(f"Places API circuit opened for {settings.PLACES_CIRCUIT_COOLDOWN_SECONDS}s after {failures} failures")
+        except Exception as e:
+            logger.warning(f"Could not record Places API failure: {str(e)}")
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Exponential backoff with full jitter: random delay in [0, base * 2^attempt].
+        """
+        return random.uniform(0, settings.PLACES_BACKOFF_BASE_SECONDS * (2 ** attempt))
+
+places_limiter = PlacesLimiter()
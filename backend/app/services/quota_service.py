@@ -0,0 +1,213 @@
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Any
+from sqlalchemy import insert, func
+from sqlalchemy.orm import Session
+from app import models
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Fixed quota windows, in seconds
+WINDOWS = {"minute": 60, "day": 86400}
+
+USAGE_QUEUE_KEY = "usage:pending"
+# Events that cannot be parsed, or whose batch failed to insert USAGE_MAX_ATTEMPTS times,
+# are kept here for inspection instead of being retried forever
+USAGE_DEAD_KEY = "usage:dead"
+USAGE_MAX_ATTEMPTS = 3
+
+# Checks every window first and only then increments them all, so a rejected
+# request consumes nothing. Returns 0 when admitted, else the 1-based index of the
+# first exhausted window. 0 units only checks that a window has room for one call.
+# KEYS: one counter per window. ARGV: units, then (limit, ttl) per window.
+_ADMIT_SCRIPT = """
+local units = tonumber(ARGV[1])
+for i, key in ipairs(KEYS) do
+    local used = tonumber(redis.call('GET', key) or '0')
+    if used + math.max(units, 1) > tonumber(ARGV[2 * i]) then
+        return i
+    end
+end
+if units == 0 then
+    return 0
+end
+for i, key in ipairs(KEYS) do
+    if redis.call('INCRBY', key, units) == units then
+        redis.call('EXPIRE', key, ARGV[2 * i + 1])
+    end
+end
+return 0
+"""
+
+class QuotaExceeded(Exception):
+    def __init__(self, window: str, retry_after: int):
+        super().__init__(f"Places API quota exceeded ({window})")
+        self.window = window
+        self.retry_after = retry_after
+
+class QuotaService:
+    """
+    Per-tenant Places API quota. Counters live in Redis (shared by API and workers),
+    usage events are queued there too and flushed to UsageLog in batches by a worker.
+    Costs are counted in Places API calls.
+    """
+
+    def __init__(self):
+        self._script = None
+
+    def admit(self, tenant: models.Tenant, action: models.ActionType, units: int = 1) -> None:
+        """
+        Reserves `units` calls for the tenant or raises QuotaExceeded. With 0 units it only
+        checks that the tenant has calls left; the operation is charged once its cost is known.
+        If Redis is unreachable the request is let through (and not counted).
+        """
+        limits = self.get_limits(tenant)
+        now = time.time()
+        keys, args = [], [units]
+        for window, seconds in WINDOWS.items():
+            keys.append(self._counter_key(tenant.id, window, now))
+            args.extend([limits[window], seconds])
+
+        try:
+            redis_client = get_redis()
+            if self._script is None:
+                self._script = redis_client.register_script(_ADMIT_SCRIPT)
+            rejected = self._script(keys=keys, args=args)
+            if not rejected and units:
+                redis_client.rpush(USAGE_QUEUE_KEY, self._usage_event(tenant, action, units))
+        except Exception as e:
+            logger.warning(f"Quota check skipped, Redis unavailable: {str(e)}")
+            return
+
+        if rejected:
+            window = list(WINDOWS)[rejected - 1]
+            seconds = WINDOWS[window]
+            raise QuotaExceeded(window, int(seconds - now % seconds) + 1)
+
+    def charge(self, tenant: models.Tenant, action: models.ActionType, units: int) -> None:
+        """
+        Counts `units` calls that were already made, without an admission check: the part
+        of an operation whose cost is only known once it ran.
+        """
+        if units <= 0:
+            return
+        now = time.time()
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            for window, seconds in WINDOWS.items():
+                key = self._counter_key(tenant.id, window, now)
+                pipe.incrby(key, units)
+                pipe.expire(key, seconds)
+            pipe.rpush(USAGE_QUEUE_KEY, self._usage_event(tenant, action, units))
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Usage not counted, Redis unavailable: {str(e)}")
+
+    def get_limits(self, tenant: models.Tenant) -> Dict[str, int]:
+        plan = tenant.plan_type.value if tenant.plan_type else models.PlanType.FREE.value
+        return settings.PLACES_QUOTA.get(plan, settings.PLACES_QUOTA[models.PlanType.FREE.value])
+
+    def get_usage(self, db: Session, tenant: models.Tenant) -> Dict[str, Any]:
+        """
+        Current window counters and month-to-date usage per action.
+        """
+        now = time.time()
+        limits = self.get_limits(tenant)
+        windows = {}
+        try:
+            values = get_redis().mget([self._counter_key(tenant.id, w, now) for w in WINDOWS])
+        except Exception as e:
+            logger.warning(f"Quota counters unavailable: {str(e)}")
+            values = [None] * len(WINDOWS)
+        for (window, seconds), value in zip(WINDOWS.items(), values):
+            windows[window] = {
+                "used": int(value or 0),
+                "limit": limits[window],
+                "resets_in": int(seconds - now % seconds)
+            }
+
+        month_start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        rows = db.query(
+            models.UsageLog.action_type,
+            func.sum(models.UsageLog.units)
+        ).filter(
+            models.UsageLog.tenant_id == tenant.id,
+            models.UsageLog.timestamp >= month_start
+        ).group_by(models.UsageLog.action_type).all()
+
+        return {
+            "plan": tenant.plan_type.value if tenant.plan_type else models.PlanType.FREE.value,
+            "windows": windows,
+            "month_to_date": {action.value: int(total or 0) for action, total in rows}
+        }
+
+    def flush_usage(self, db: Session, batch_size: int = 1000) -> int:
+        """
+        Moves queued usage events from Redis into UsageLog (runs in the worker).
+        Returns the number of events stored.
+        """
+        redis_client = get_redis()
+        flushed = 0
+        while True:
+            pipe = redis_client.pipeline()
+            pipe.lrange(USAGE_QUEUE_KEY, 0, batch_size - 1)
+            pipe.ltrim(USAGE_QUEUE_KEY, batch_size, -1)
+            raw, _ = pipe.execute()
+            if not raw:
+                break
+
+            rows, events, dead = [], [], []
+            for item in raw:
+                try:
+                    event = json.loads(item)
+                    rows.append({
+                        "tenant_id": event["tenant_id"],
+                        "action_type": models.ActionType(event["action_type"]),
+                        "units": event["units"],
+                        "timestamp": datetime.fromisoformat(event["timestamp"])
+                    })
+                    events.append(event)
+                except Exception as e:
+                    logger.warning(f"Malformed usage event moved to {USAGE_DEAD_KEY}: {e}")
+                    dead.append(item)
+
+            try:
+                if rows:
+                    db.execute(insert(models.UsageLog), rows)
+                    db.commit()
+            except Exception:
+                db.rollback()
+                # Put the batch back so that it is retried on the next run, up to USAGE_MAX_ATTEMPTS times
+                retry = []
+                for event in events:
+                    event["attempts"] = event.get("attempts", 0) + 1
+                    (retry if event["attempts"] < USAGE_MAX_ATTEMPTS else dead).append(json.dumps(event))
+                if retry:
+                    redis_client.rpush(USAGE_QUEUE_KEY, *retry)
+                if dead:
+                    redis_client.rpush(USAGE_DEAD_KEY, *dead)
+                raise
+            if dead:
+                redis_client.rpush(USAGE_DEAD_KEY, *dead)
+
+            flushed += len(rows)
+            if len(raw) < batch_size:
+                break
+        return flushed
+
+    def _usage_event(self, tenant: models.Tenant, action: models.ActionType, units: int) -> str:
+        return json.dumps({
+            "tenant_id": str(tenant.id),
+            "action_type": action.value,
+            "units": units,
+            "timestamp": datetime.utcnow().isoformat()
+        })
+
+    def _counter_key(self, tenant_id, window: str, now: float) -> str:
+        return f"quota:{tenant_id}:{window}:{int(now // WINDOWS[window])}"
+
+quota_service = QuotaService()
@@ -4,70 +4,390 @@ from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image as ReportLabImage
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from io import BytesIO
-from app.models import Business, User
-from datetime import datetime
+from typing import Optional, Tuple, Dict, Any, Iterator, List
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models import Business, Ranking, Report, ReportExport, GridRankSnapshot
+from app.services.heatmap_service import heatmap_service
+from datetime import datetime, timedelta
+import logging
+import multiprocessing
+import os
+import re
+import zipfile
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the document layout changes: cached PDFs of older templates are not reused
+REPORT_TEMPLATE_VERSION = "2"
+
+TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.indigo),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+])
+
+# Paragraph styles are built once per process and shared by every document it renders
+_STYLES: Dict[str, ParagraphStyle] = {}
+
+def get_report_styles() -> Dict[str, ParagraphStyle]:
+    if not _STYLES:
+        styles = getSampleStyleSheet()
+        _STYLES.update({
+            "title": styles["Title"],
+            "heading": styles["Heading2"],
+            "normal": styles["Normal"],
+            "meta": ParagraphStyle('Meta', parent=styles['Normal'], textColor=colors.gray),
+            "footer": ParagraphStyle('Footer', parent=styles['Normal'], fontSize=8, textColor=colors.gray, alignment=1)
+        })
+    return _STYLES
+
+def _render_pdf_bytes(content: Dict[str, Any]) -> bytes:
+    """
+    Process pool entry point for bulk exports (must be a picklable module-level function).
+    """
+    return report_service.generate_business_report(content).getvalue()
 
 class ReportService:
-    def generate_business_report(self, business: Business, user: User) -> BytesIO:
+    def get_latest_ranking(self, db: Session, business: Business) -> Optional[Ranking]:
+        return db.query(Ranking).filter(
+            Ranking.business_id == business.id
+        ).order_by(Ranking.snapshot_date.desc()).first()
+
+    def get_latest_snapshot(self, db: Session, business: Business) -> Optional[GridRankSnapshot]:
+        # The grid heatmap of a report shows the latest scan
+        return db.query(GridRankSnapshot).filter(
+            GridRankSnapshot.business_id == business.id
+        ).order_by(GridRankSnapshot.created_at.desc()).first()
+
+    def get_cached_report(self, db: Session, business: Business, ranking_id: Optional[int], snapshot_id: Optional[Any] = None) -> Optional[Report]:
+        """
+        Latest non-failed report for (business, ranking, grid snapshot, template version), if any.
+        A ready report whose file disappeared (e.g. redeploy with local disk) is ignored, and a
+        pending one older than REPORT_PENDING_TIMEOUT_SECONDS (its job was lost, e.g. the
+        broker or worker went down) is marked failed so that a new render is queued.
+        """
+        report = self._find_live(db, business, ranking_id, snapshot_id)
+
+        # Unusable reports are marked failed, which also frees their cache key (uq_reports_cache_key)
+        if report and report.status == "ready" and not (report.file_path and os.path.exists(report.file_path)):
+            report.status = "failed"
+            report.error = "Rendered file missing"
+            db.commit()
+            return None
+        if report and report.status == "pending" and datetime.utcnow() - report.created_at > timedelta(seconds=settings.REPORT_PENDING_TIMEOUT_SECONDS):
+            logger.warning(f"Report {report.id} pending since {report.created_at}, queueing it again")
+            report.status = "failed"
+            report.error = "Render timed out"
+            db.commit()
+            return None
+        return report
+
+    def _find_live(self, db: Session, business: Business, ranking_id: Optional[int], snapshot_id: Optional[Any]) -> Optional[Report]:
+        return db.query(Report).filter(
+            Report.business_id == business.id,
+            Report.ranking_id == ranking_id,
+            Report.snapshot_id == snapshot_id,
+            Report.template_version == REPORT_TEMPLATE_VERSION,
+            Report.status.in_(["pending", "ready"])
+        ).order_by(Report.created_at.desc()).first()
+
+    def _create_pending(self, db: Session, business: Business, ranking_id: Optional[int], snapshot_id: Optional[Any]) -> Tuple[Report, bool]:
+        """
+        Inserts the pending report of a cache key, unless a concurrent request just did: then
+        that one is returned. The boolean tells whether this call created it.
+        """
+        stmt = insert(Report).values(
+            title=f"Performance Report: {business.name}",
+            content_json={},
+            business_id=business.id,
+            ranking_id=ranking_id,
+            snapshot_id=snapshot_id,
+            template_version=REPORT_TEMPLATE_VERSION,
+            status="pending"
+        ).on_conflict_do_nothing().returning(Report.id)
+        report_id = db.execute(stmt).scalar()
+        db.commit()
+        if report_id is None:
+            return self._find_live(db, business, ranking_id, snapshot_id), False
+        return db.get(Report, report_id), True
+
+    def request_report(self, db: Session, business: Business) -> Tuple[Report, bool]:
+        """
+        Returns the cached report for the business' current data, or creates a pending one.
+        The boolean tells the caller whether a render job has to be queued.
+        """
+        ranking = self.get_latest_ranking(db, business)
+        ranking_id = ranking.id if ranking else None
+        snapshot = self.get_latest_snapshot(db, business)
+        snapshot_id = snapshot.id if snapshot else None
+
+        cached = self.get_cached_report(db, business, ranking_id, snapshot_id)
+        if cached:
+            return cached, False
+        return self._create_pending(db, business, ranking_id, snapshot_id)
+
+    def render(self, db: Session, report: Report) -> Report:
+        """
+        Renders a pending report to REPORTS_DIR and marks it ready (runs in the worker).
+        """
+        business = report.business
+        ranking = db.query(Ranking).filter(Ranking.id == report.ranking_id).first() if report.ranking_id else None
+        snapshot = db.get(GridRankSnapshot, report.snapshot_id) if report.snapshot_id else None
+
+        try:
+            content = self.build_content(business, ranking, snapshot)
+            pdf_buffer = self.generate_business_report(content)
+
+            self._mark_ready(report, content, pdf_buffer.getvalue())
+        except Exception as e:
+            logger.error(f"Report render failed for {report.id}: {str(e)}")
+            report.status = "failed"
+            report.error = str(e)
+
+        db.commit()
+        db.refresh(report)
+        return report
+
+    def store_rendered(self, db: Session, business: Business, ranking_id: Optional[int], snapshot_id: Optional[Any], content: Dict[str, Any], pdf: bytes) -> Report:
+        """
+        Records a PDF rendered outside of render() (bulk export) as the cached report of the business.
+        A report of the same data still pending is completed with it.
+        """
+        report, _ = self._create_pending(db, business, ranking_id, snapshot_id)
+        self._mark_ready(report, content, pdf)
+        db.commit()
+        return report
+
+    def _mark_ready(self, report: Report, content: Dict[str, Any], pdf: bytes) -> None:
+        path = os.path.join(settings.REPORTS_DIR, str(report.business_id), f"{report.id}.pdf")
+        self._write_file(path, pdf)
+        report.content_json = content
+        report.file_path = path
+        report.status = "ready"
+        report.rendered_at = datetime.utcnow()
+
+    def _write_file(self, path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so a download never streams a half-written file
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def run_export(self, db: Session, export: ReportExport) -> ReportExport:
+        """
+        Bulk multi-location export (runs in the worker).
+        Businesses with an up-to-date cached PDF reuse it; the rest are rendered in
+        parallel across a process pool where possible, since ReportLab rendering is CPU-bound.
+        """
+        export.status = "running"
+        db.commit()
+
+        ids = export.business_ids or []
+        businesses = db.query(Business).filter(
+            Business.id.in_(ids),
+            Business.tenant_id == export.tenant_id
+        ).all()
+        order = {str(b): i for i, b in enumerate(ids)}
+        businesses.sort(key=lambda b: order.get(str(b.id), len(order)))
+
+        export.total = len(businesses)
+        export.completed = 0
+        paths: List[Optional[str]] = [None] * len(businesses)
+        jobs = []
+        for i, business in enumerate(businesses):
+            ranking = self.get_latest_ranking(db, business)
+            ranking_id = ranking.id if ranking else None
+            snapshot = self.get_latest_snapshot(db, business)
+            snapshot_id = snapshot.id if snapshot else None
+            cached = self.get_cached_report(db, business, ranking_id, snapshot_id)
+            if cached and cached.status == "ready":
+                paths[i] = cached.file_path
+                export.completed += 1
+            else:
+                jobs.append((i, business, ranking_id, snapshot_id, self.build_content(business, ranking, snapshot)))
+        db.commit()
+
+        errors = []
+        for (i, business, ranking_id, snapshot_id, content), pdf in self._render_jobs(jobs):
+            try:
+                if isinstance(pdf, Exception):
+                    raise pdf
+                paths[i] = self.store_rendered(db, business, ranking_id, snapshot_id, content, pdf).file_path
+            except Exception as e:
+                logger.error(f"Export {export.id}: render failed for {business.id}: {str(e)}")
+                errors.append(f"{business.name}: {str(e)}")
+                db.rollback()
+            # store_rendered commits, which also persists the progress counter
+            export.completed += 1
+            db.commit()
+
+        try:
+            names = [self._safe_filename(f"{i + 1:03d}_{b.name}") for i, b in enumerate(businesses)]
+            ready = [(name, path) for name, path in zip(names, paths) if path]
+            extension = "pdf" if export.output_format == "pdf" else "zip"
+            out_path = os.path.join(settings.REPORTS_DIR, "exports", f"{export.id}.{extension}")
+            os.makedirs(os.path.dirname(out_path), exist_ok=True)
+            tmp_path = f"{out_path}.tmp"
+            if extension == "pdf":
+                self._merge_pdfs([path for _, path in ready], tmp_path)
+            else:
+                with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                    for name, path in ready:
+                        archive.write(path, arcname=f"{name}.pdf")
+            os.replace(tmp_path, out_path)
+
+            export.file_path = out_path
+            export.status = "ready" if ready or not businesses else "failed"
+        except Exception as e:
+            logger.error(f"Export {export.id} packaging failed: {str(e)}")
+            errors.append(str(e))
+            export.status = "failed"
+
+        export.error = "\n".join(errors) or None
+        export.finished_at = datetime.utcnow()
+        db.commit()
+        db.refresh(export)
+        return export
+
+    def _render_jobs(self, jobs: List[tuple]) -> Iterator[Tuple[tuple, Any]]:
+        """
+        Renders export jobs (content last), yielding (job, PDF bytes or the exception) as they finish.
+        Celery's prefork workers are daemonic processes, which may not start a process pool:
+        there the jobs are rendered one after the other in this process.
+        """
+        if not jobs:
+            return
+        if multiprocessing.current_process().daemon or settings.REPORT_EXPORT_PROCESSES <= 1:
+            for job in jobs:
+                try:
+                    yield job, _render_pdf_bytes(job[-1])
+                except Exception as e:
+                    yield job, e
+            return
+
+        with ProcessPoolExecutor(max_workers=settings.REPORT_EXPORT_PROCESSES, initializer=get_report_styles) as pool:
+            futures = {pool.submit(_render_pdf_bytes, job[-1]): job for job in jobs}
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except Exception as e:
+                    yield futures[future], e
+
+    def _merge_pdfs(self, paths: List[str], out_path: str) -> None:
+        from pypdf import PdfWriter
+        writer = PdfWriter()
+        for path in paths:
+            writer.append(path)
+        with open(out_path, "wb") as f:
+            writer.write(f)
+
+    def _safe_filename(self, name: str) -> str:
+        return re.sub(r"[^\w\-]+", "_", name, flags=re.UNICODE).strip("_")[:80]
+
+    def build_content(self, business: Business, ranking: Optional[Ranking], snapshot: Optional[GridRankSnapshot]) -> Dict[str, Any]:
+        """
+        Data shown in the document, stored in Report.content_json.
+        """
+        grid = None
+        if snapshot:
+            try:
+                heatmap_path = heatmap_service.get_raster(snapshot, fmt="png", size=512)
+            except Exception as e:
+                logger.warning(f"Heatmap render failed for snapshot {snapshot.id}: {str(e)}")
+                heatmap_path = None
+            grid = {
+                "keyword": snapshot.keyword,
+                "grid_size": snapshot.grid_size,
+                "radius_km": snapshot.radius_km,
+                "average_rank": snapshot.average_rank,
+                "visibility_score": snapshot.visibility_score,
+                "heatmap_path": heatmap_path
+            }
+
+        return {
+            "business_name": business.name,
+            "tenant_name": business.tenant.name if business.tenant else None,
+            "rank_position": ranking.rank_position if ranking else None,
+            "score": ranking.score if ranking else None,
+            "review_count": business.review_count,
+            "rating": business.total_rating,
+            "grid": grid,
+            "generated_at": datetime.utcnow().strftime('%Y-%m-%d %H:%M')
+        }
+
+    def generate_business_report(self, content: Dict[str, Any]) -> BytesIO:
         """
         Generates a PDF report for a business.
         """
         buffer = BytesIO()
         doc = SimpleDocTemplate(buffer, pagesize=letter)
-        styles = getSampleStyleSheet()
+        styles = get_report_styles()
         story = []
 
         # -- Header (White Label) --
         # Ideally, we'd fetch the generic "Agency" logo if configured, or MapRank logo
-        title_style = styles["Title"]
-        story.append(Paragraph(f"Performance Report: {business.name}", title_style))
+        story.append(Paragraph(f"Performance Report: {content['business_name']}", styles["title"]))
         story.append(Spacer(1, 12))
-        
-        meta_style = ParagraphStyle('Meta', parent=styles['Normal'], textColor=colors.gray)
-        story.append(Paragraph(f"Generated for: {user.full_name or user.email}", meta_style))
-        story.append(Paragraph(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}", meta_style))
+
+        meta_style = styles["meta"]
+        story.append(Paragraph(f"Generated for: {content['tenant_name'] or content['business_name']}", meta_style))
+        story.append(Paragraph(f"Date: {content['generated_at']}", meta_style))
         story.append(Spacer(1, 24))
 
         # -- Current Ranking --
-        story.append(Paragraph("Current Search Ranking", styles["Heading2"]))
-        rank = business.latest_ranking.rank_position if business.latest_ranking else "N/A"
-        score = business.latest_ranking.map_rank_score if business.latest_ranking else "N/A"
-        
+        story.append(Paragraph("Current Search Ranking", styles["heading"]))
+        rank = content["rank_position"] or "N/A"
+        score = content["score"] if content["score"] is not None else "N/A"
+
         data = [
             ["Metric", "Value"],
             ["Rank Position", f"#{rank}"],
             ["MapRank Score", f"{score}/100"],
-            ["Total Reviews", business.total_reviews or "N/A"],
-            ["Average Rating", f"{business.average_rating or 'N/A'} ⭐"]
+            ["Total Reviews", content["review_count"] or "N/A"],
+            ["Average Rating", f"{content['rating'] or 'N/A'} ⭐"]
         ]
-        
+
         t = Table(data, colWidths=[200, 200])
-        t.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.indigo),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
+        t.setStyle(TABLE_STYLE)
         story.append(t)
         story.append(Spacer(1, 24))
 
+        # -- Grid Visibility Heatmap --
+        grid = content.get("grid")
+        if grid:
+            story.append(Paragraph(f"Local Visibility: \"{grid['keyword']}\"", styles["heading"]))
+            story.append(Paragraph(
+                f"{grid['grid_size']}x{grid['grid_size']} grid, {grid['radius_km']} km radius - "
+                f"Visibility {grid['visibility_score'] or 0}/100, average rank {round(grid['average_rank'] or 21, 1)}",
+                meta_style
+            ))
+            if grid.get("heatmap_path") and os.path.exists(grid["heatmap_path"]):
+                story.append(Spacer(1, 8))
+                story.append(ReportLabImage(grid["heatmap_path"], width=300, height=300))
+            story.append(Spacer(1, 24))
+
         # -- AI Insights (Mock) --
-        story.append(Paragraph("AI Performance Insights", styles["Heading2"]))
+        story.append(Paragraph("AI Performance Insights", styles["heading"]))
         insight_text = (
             "Your business is performing well in local search results. "
             "To improve your MapRank Score, focus on generating more reviews with keywords "
             "related to your primary services. Competitor analysis suggests that responding "
             "faster to negative reviews could boost your conversion rate by 15%."
         )
-        story.append(Paragraph(insight_text, styles["Normal"]))
+        story.append(Paragraph(insight_text, styles["normal"]))
 
         # -- Footer --
         story.append(Spacer(1, 48))
         footer_text = "Powered by MapRank SaaS - White Label Solution"
-        story.append(Paragraph(footer_text, ParagraphStyle('Footer', parent=styles['Normal'], fontSize=8, textColor=colors.gray, alignment=1)))
+        story.append(Paragraph(footer_text, styles["footer"]))
 
         doc.build(story)
         buffer.seek(0)
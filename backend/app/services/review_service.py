@@ -1,27 +1,156 @@
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
 from typing import List, Dict, Any
-from app.services.google_maps import google_maps_service
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app import models
+from app.core.config import settings
+from app.services.place_store import place_store
+
+logger = logging.getLogger(__name__)
+
+# Words ignored when extracting keywords from review text
+COMMON_TERMS = {"ve", "bir", "bu", "da", "de", "çok", "için", "olan", "the", "and", "is", "was", "for", "with"}
+
+def tokenize_review(text: str) -> List[str]:
+    """
+    Splits a review into keyword tokens (lowercase, >3 chars, no stop words).
+    """
+    text = (text or "").lower()
+    return [w.strip(".,!?") for w in text.split() if len(w) > 3 and w not in COMMON_TERMS]
 
 class ReviewService:
-    def get_reviews(self, place_id: str) -> List[Dict[str, Any]]:
+    def get_reviews(self, db: Session, place_id: str, limit: int = 50) -> List[models.Review]:
         """
-        Fetches reviews from Google Maps and adds sentiment analysis.
+        Serves reviews from the local corpus, syncing new ones from Google Maps when stale.
         """
-        details = google_maps_service.get_place_details(place_id)
+        self.sync_reviews(db, place_id)
+        return db.query(models.Review).filter(
+            models.Review.google_place_id == place_id
+        ).order_by(models.Review.time.desc()).limit(limit).all()
+
+    def sync_reviews(self, db: Session, place_id: str, force: bool = False) -> List[Dict[str, Any]]:
+        """
+        Fetches the newest reviews of a place unless it was synced within REVIEW_SYNC_INTERVAL_MINUTES.
+        Returns the reviews that were not in the corpus yet.
+        """
+        if not force:
+            state = db.query(models.ReviewSyncState).filter(
+                models.ReviewSyncState.google_place_id == place_id
+            ).first()
+            interval = timedelta(minutes=settings.REVIEW_SYNC_INTERVAL_MINUTES)
+            if state and state.last_synced_at and datetime.utcnow() - state.last_synced_at < interval:
+                return []
+
+        details = place_store.fetch(db, place_id)
         if not details:
             return []
-        
-        reviews = details.get("reviews", [])
-        
-        # Enriched reviews with mock sentiment
-        processed_reviews = []
-        for review in reviews:
-            sentiment = self._analyze_sentiment(review.get("text", ""), review.get("rating", 0))
-            processed_reviews.append({
-                **review,
-                "sentiment": sentiment
+        return self.ingest_from_details(db, place_id, details)
+
+    def ingest_from_details(self, db: Session, place_id: str, details: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Stores the reviews of an already fetched Place Details payload.
+        Only reviews newer than the place's high-water mark are considered, so callers
+        that already hold the details (analyze, alerts) never trigger an extra API call.
+        The payload must be fetched with reviews_sort="newest": the mark moves to its latest
+        review, so newer reviews left out of a relevance-sorted payload would never be stored.
+        """
+        state = db.query(models.ReviewSyncState).filter(
+            models.ReviewSyncState.google_place_id == place_id
+        ).first()
+        high_water_mark = state.last_review_time if state and state.last_review_time else 0
+
+        rows = []
+        for review in details.get("reviews", []) or []:
+            review_time = int(review.get("time") or 0)
+            if review_time <= high_water_mark or not review.get("author_name"):
+                continue
+            text = review.get("text", "") or ""
+            rating = review.get("rating", 0)
+            rows.append({
+                "google_place_id": place_id,
+                "author_name": review.get("author_name"),
+                "time": review_time,
+                "rating": rating,
+                "text": text,
+                "language": review.get("language"),
+                "relative_time_description": review.get("relative_time_description"),
+                "profile_photo_url": review.get("profile_photo_url"),
+                "sentiment": self._analyze_sentiment(text, rating),
+                "tokens": tokenize_review(text),
+                "created_at": datetime.utcnow()
             })
-            
-        return processed_reviews
+
+        inserted = []
+        if rows:
+            stmt = insert(models.Review).values(rows).on_conflict_do_nothing(
+                index_elements=["google_place_id", "author_name", "time"]
+            ).returning(models.Review.author_name, models.Review.time)
+            new_keys = {(r.author_name, r.time) for r in db.execute(stmt)}
+            inserted = [r for r in rows if (r["author_name"], r["time"]) in new_keys]
+
+        new_mark = max([high_water_mark] + [r["time"] for r in rows])
+        state_stmt = insert(models.ReviewSyncState).values(
+            google_place_id=place_id,
+            last_review_time=new_mark,
+            last_synced_at=datetime.utcnow()
+        )
+        state_stmt = state_stmt.on_conflict_do_update(
+            index_elements=["google_place_id"],
+            set_={
+                "last_review_time": func.greatest(models.ReviewSyncState.last_review_time, state_stmt.excluded.last_review_time),
+                "last_synced_at": state_stmt.excluded.last_synced_at
+            }
+        )
+        db.execute(state_stmt)
+        db.commit()
+
+        if inserted:
+            logger.info(f"Ingested {len(inserted)} new reviews for place {place_id}")
+        return inserted
+
+    def get_review_stats(self, db: Session, place_id: str, keyword_limit: int = 5, sample_size: int = 500) -> Dict[str, Any]:
+        """
+        Aggregates the stored corpus of a place for the sentiment/keyword widgets
+        and the ranking engine (real 30-day review velocity).
+        """
+        sentiment_rows = db.query(models.Review.sentiment, func.count(models.Review.id)).filter(
+            models.Review.google_place_id == place_id
+        ).group_by(models.Review.sentiment).all()
+        sentiment_counts = {sentiment: count for sentiment, count in sentiment_rows}
+        total = sum(sentiment_counts.values())
+
+        if total == 0:
+            return {"total": 0, "sentiment": None, "keywords": [], "velocity_30d": None}
+
+        cutoff = int((datetime.utcnow() - timedelta(days=30)).timestamp())
+        velocity = db.query(func.count(models.Review.id)).filter(
+            models.Review.google_place_id == place_id,
+            models.Review.time >= cutoff
+        ).scalar() or 0
+
+        token_rows = db.query(models.Review.tokens).filter(
+            models.Review.google_place_id == place_id
+        ).order_by(models.Review.time.desc()).limit(sample_size).all()
+        counter = Counter()
+        for (tokens,) in token_rows:
+            counter.update(tokens or [])
+
+        return {
+            "total": total,
+            "sentiment": {
+                "positive": round(sentiment_counts.get("positive", 0) / total * 100),
+                "neutral": round(sentiment_counts.get("neutral", 0) / total * 100),
+                "negative": round(sentiment_counts.get("negative", 0) / total * 100)
+            },
+            "keywords": [
+                {"keyword": k, "count": c, "impact": "Önemli" if c > 2 else "Normal"}
+                for k, c in counter.most_common(keyword_limit)
+            ],
+            "velocity_30d": float(velocity)
+        }
 
     def _analyze_sentiment(self, text: str, rating: int) -> str:
         """
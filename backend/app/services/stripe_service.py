@@ -1,7 +1,10 @@
+import logging
 import stripe
 from typing import Optional
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 stripe.api_key = settings.STRIPE_API_KEY
 
 class StripeService:
@@ -37,7 +40,7 @@ class StripeService:
             )
             return checkout_session.url
         except Exception as e:
-            print(f"Stripe Error: {e}")
+            logger.error(f"Stripe Error: {e}")
             # Mock return for development if no real key
             if "sk_test" in settings.STRIPE_API_KEY:
                  return f"{success_url}?session_id=mock_session_id"
@@ -51,7 +54,7 @@ class StripeService:
             )
             return portal_session.url
         except Exception as e:
-            print(f"Stripe Error: {e}")
+            logger.error(f"Stripe Error: {e}")
             raise e
 
 stripe_service = StripeService()
@@ -0,0 +1,3 @@
+# Importing any task module binds @shared_task to the configured app (Redis broker),
+# including in the web process, which only imports the tasks it enqueues
+from .celery_app import celery_app
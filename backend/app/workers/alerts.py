@@ -3,7 +3,11 @@ from sqlalchemy.orm import Session
 from app.db.session import SessionLocal
 from app import models
 from app.services.ranking_engine import ranking_engine
-from app.services.google_maps import google_maps_service
+from app.services.place_store import place_store
+from app.core.config import settings
+from datetime import datetime, timedelta
+from app.services.review_service import review_service
+from app.services.alert_service import alert_service
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,39 +21,61 @@ def check_competitor_alerts():
     try:
         # Get all active businesses
         businesses = db.query(models.Business).all()
+        # One fetch per distinct place, however many tenants track it
+        details_by_place = place_store.get_many(
+            db, [b.google_place_id for b in businesses],
+            max_age=timedelta(minutes=settings.PLACE_DETAILS_MAX_AGE_MINUTES)
+        )
         
         for business in businesses:
             logger.info(f"Checking alerts for business: {business.name}")
             
             # 1. Check Ranking Changes
-            current_rank = business.latest_ranking.rank_position if business.latest_ranking else None
+            latest_ranking = db.query(models.Ranking).filter(
+                models.Ranking.business_id == business.id
+            ).order_by(models.Ranking.snapshot_date.desc()).first()
+            current_rank = latest_ranking.rank_position if latest_ranking else None
             
             # Fetch fresh data (using existing analysis logic)
-            details = google_maps_service.get_place_details(business.google_place_id)
+            details = details_by_place.get(business.google_place_id)
             if details:
-                analysis = ranking_engine.analyze_business(details)
+                # Rank position needs the competitor search, the snapshot also stores the score
+                analysis = ranking_engine.analyze_business(details, sections={"score", "competitors"})
                 new_rank = analysis.get("metrics", {}).get("rank_position")
+
+                # A changed rank becomes the new baseline, so each change is alerted once
+                if new_rank and new_rank != current_rank:
+                    db.add(models.Ranking(
+                        business_id=business.id,
+                        rank_position=new_rank,
+                        score=analysis.get("score"),
+                        competitors_json=analysis.get("competitors"),
+                        snapshot_date=datetime.utcnow()
+                    ))
+                    db.commit()
                 
                 if current_rank and new_rank and new_rank > current_rank:
                      # Rank dropped (lower number is better rank, so higher number is worse)
                      alert_msg = f"📉 ALERT: {business.name} ranking dropped from #{current_rank} to #{new_rank}!"
                      logger.warning(alert_msg)
+                     alert_service.create(db, business, "critical", "Sıralama düştü", alert_msg)
                      # TODO: Integrate EmailService.send_alert(user.email, alert_msg)
                 elif new_rank and new_rank <= 3 and (not current_rank or current_rank > 3):
                      alert_msg = f"🚀 CONGRATS: {business.name} is now in top 3 (Rank #{new_rank})!"
                      logger.info(alert_msg)
+                     alert_service.create(db, business, "success", "İlk 3'e girdiniz", alert_msg)
                      # TODO: Integrate EmailService.send_alert(user.email, alert_msg)
 
             # 2. Check Negative Reviews
-            # In a real scenario, we would query the database for reviews created_at > last_check_time
-            # For now, we simulate checking the latest review
-            reviews = details.get('reviews', [])
-            if reviews:
-                latest_review = reviews[0] # Assuming sorted by time
-                if latest_review.get('rating', 5) <= 2:
-                     review_alert = f"⚠️ NEW NEGATIVE REVIEW: {latest_review.get('author_name')} gave 1-2 stars!"
-                     logger.warning(review_alert)
-                     # TODO: Integrate EmailService.send_alert(user.email, review_alert)
+            # Only reviews that were not in the corpus yet (newer than the place's high-water mark)
+            if details:
+                new_reviews = review_service.ingest_from_details(db, business.google_place_id, details)
+                for review in new_reviews:
+                    if review.get('rating', 5) <= 2:
+                         review_alert = f"⚠️ NEW NEGATIVE REVIEW: {review.get('author_name')} gave 1-2 stars!"
+                         logger.warning(review_alert)
+                         alert_service.create(db, business, "warning", "Yeni olumsuz yorum", review_alert)
+                         # TODO: Integrate EmailService.send_alert(user.email, review_alert)
             
     except Exception as e:
         logger.error(f"Error in check_competitor_alerts: {e}")
@@ -1,7 +1,13 @@
 from celery import Celery
+from celery.signals import worker_init, worker_process_init
 from app.core.config import settings
 
-celery_app = Celery("worker", broker=settings.REDIS_URL, backend=settings.REDIS_URL)
+celery_app = Celery(
+    "worker",
+    broker=settings.REDIS_URL,
+    backend=settings.REDIS_URL,
+    include=["app.workers.tasks", "app.workers.alerts", "app.workers.competitors", "app.workers.reports", "app.workers.grid", "app.workers.usage", "app.workers.market"]
+)
 
 celery_app.conf.task_routes = {"app.workers.tasks.*": "main-queue"}
 
@@ -14,4 +20,36 @@ celery_app.conf.beat_schedule = {
         "task": "app.workers.alerts.check_competitor_alerts",
         "schedule": 1800.0, # 30 mins
     },
+    "refresh-competitors-every-6-hours": {
+        "task": "app.workers.competitors.refresh_competitor_metrics",
+        "schedule": 21600.0, # 6 hours
+    },
+    "plan-grid-scans-every-15-mins": {
+        "task": "app.workers.grid.plan_grid_scans",
+        "schedule": 900.0, # 15 mins
+    },
+    "flush-usage-every-minute": {
+        "task": "app.workers.usage.flush_usage_logs",
+        "schedule": 60.0, # 1 min
+    },
+    "resume-market-sweeps-every-15-mins": {
+        "task": "app.workers.market.resume_market_sweeps",
+        "schedule": 900.0, # 15 mins
+    },
+    "rebuild-benchmark-sketches-daily": {
+        "task": "app.workers.market.rebuild_benchmark_sketches",
+        "schedule": 86400.0, # 24 hours
+    },
 }
+
+@worker_process_init.connect
+def start_place_index(**kwargs):
+    # Each pool process keeps its own copy of the spatial index
+    from app.services.place_index import place_index
+    place_index.start_refresher()
+
+@worker_init.connect
+def use_scheduled_places_priority(**kwargs):
+    # Worker calls yield to interactive API requests on the shared Places budget
+    from app.services.places_limiter import places_limiter, Priority
+    places_limiter.default_priority = Priority.SCHEDULED
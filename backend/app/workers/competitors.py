@@ -0,0 +1,21 @@
+from celery import shared_task
+from sqlalchemy.orm import Session
+from app.db.session import SessionLocal
+from app.services.ai_expansion_service import competitor_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+@shared_task
+def refresh_competitor_metrics():
+    """
+    Periodic task to refresh rating/review/photo metrics of tracked competitors.
+    """
+    db: Session = SessionLocal()
+    try:
+        competitor_service.refresh_tracked_competitors(db)
+    except Exception as e:
+        logger.error(f"Error in refresh_competitor_metrics: {e}")
+        db.rollback()
+    finally:
+        db.close()
@@ -0,0 +1,40 @@
+from celery import shared_task
+from sqlalchemy.orm import Session
+from typing import List
+from app.db.session import SessionLocal
+from app.services.grid_service import grid_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+@shared_task
+def plan_grid_scans():
+    """
+    Periodic task: claims due grid scan schedules and queues one batch per keyword.
+    """
+    db: Session = SessionLocal()
+    try:
+        groups = grid_service.plan_due_schedules(db)
+        for schedule_ids in groups:
+            run_grid_scan_batch.delay(schedule_ids)
+        if groups:
+            logger.info(f"Planned {sum(len(g) for g in groups)} grid scans in {len(groups)} batches")
+    except Exception as e:
+        logger.error(f"Error in plan_grid_scans: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+@shared_task
+def run_grid_scan_batch(schedule_ids: List[str]):
+    """
+    Runs the scheduled scans of one keyword with shared nearby searches.
+    """
+    db: Session = SessionLocal()
+    try:
+        grid_service.run_scheduled_batch(db, schedule_ids)
+    except Exception as e:
+        logger.error(f"Error in run_grid_scan_batch: {e}")
+        db.rollback()
+    finally:
+        db.close()
@@ -0,0 +1,62 @@
+from datetime import datetime
+from celery import shared_task
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from app import models
+from app.db.session import SessionLocal
+from app.services.market_sweep_service import market_sweep_service
+from app.services.places_limiter import PlacesUnavailable
+from app.services.benchmark_sketches import benchmark_sketch_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+@shared_task
+def run_market_sweep(sweep_id: str):
+    """
+    Runs a market sweep from its checkpoint until done (or until the Places API gives out).
+    """
+    db: Session = SessionLocal()
+    try:
+        sweep = market_sweep_service.run(db, sweep_id)
+        if sweep is None:
+            logger.info(f"Market sweep {sweep_id} is already running or finished")
+    except PlacesUnavailable as e:
+        logger.warning(f"Market sweep {sweep_id} paused: {e}")
+    except Exception as e:
+        logger.error(f"Error in run_market_sweep {sweep_id}: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+@shared_task
+def resume_market_sweeps():
+    """
+    Periodic task re-queueing paused sweeps and sweeps whose worker died (expired lease).
+    """
+    db: Session = SessionLocal()
+    try:
+        sweeps = db.query(models.MarketSweep.id).filter(
+            models.MarketSweep.status.in_(["pending", "running", "paused"]),
+            or_(models.MarketSweep.locked_until == None, models.MarketSweep.locked_until < datetime.utcnow())
+        ).all()
+        for (sweep_id,) in sweeps:
+            run_market_sweep.delay(str(sweep_id))
+        if sweeps:
+            logger.info(f"Resumed {len(sweeps)} market sweeps")
+    finally:
+        db.close()
+
+@shared_task
+def rebuild_benchmark_sketches():
+    """
+    Periodic task recomputing the benchmark sketches from the places table.
+    """
+    db: Session = SessionLocal()
+    try:
+        benchmark_sketch_service.rebuild(db)
+    except Exception as e:
+        logger.error(f"Error in rebuild_benchmark_sketches: {e}")
+        db.rollback()
+    finally:
+        db.close()
@@ -0,0 +1,55 @@
+from celery import shared_task
+from sqlalchemy.orm import Session
+from app.db.session import SessionLocal
+from app import models
+from app.services.report_service import report_service
+from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+@shared_task
+def render_business_report(report_id: str):
+    """
+    Renders a pending PDF report to disk (queued by the reports endpoints).
+    """
+    db: Session = SessionLocal()
+    try:
+        report = db.query(models.Report).filter(models.Report.id == report_id).first()
+        if not report:
+            logger.error(f"Report {report_id} not found")
+            return
+        if report.status != "pending":
+            return
+        report_service.render(db, report)
+        logger.info(f"Report {report_id} rendered: {report.status}")
+    finally:
+        db.close()
+
+@shared_task
+def export_business_reports(export_id: str):
+    """
+    Renders a bulk multi-location export (ZIP or merged PDF) for agencies.
+    """
+    db: Session = SessionLocal()
+    try:
+        export = db.query(models.ReportExport).filter(models.ReportExport.id == export_id).first()
+        if not export:
+            logger.error(f"Report export {export_id} not found")
+            return
+        if export.status != "pending":
+            return
+        try:
+            report_service.run_export(db, export)
+        except Exception as e:
+            # Never leave the export "running": the client polls it until it finishes
+            logger.exception(f"Report export {export_id} failed")
+            db.rollback()
+            export.status = "failed"
+            export.error = str(e)
+            export.finished_at = datetime.utcnow()
+            db.commit()
+            return
+        logger.info(f"Report export {export_id} finished: {export.status} ({export.completed}/{export.total})")
+    finally:
+        db.close()
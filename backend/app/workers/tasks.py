@@ -1,10 +1,13 @@
 from app.workers.celery_app import celery_app
 from app.core.database import SessionLocal
+from app.core.config import settings
 from app.models.tenant import Tenant
 from app.models.business import Business
-from app.services.google_maps import google_maps_service
+from app.services.place_store import place_store
 from app.services.ranking_engine import ranking_engine
+from app.services.metrics_service import metrics_service
 from sqlalchemy.orm import Session
+from datetime import timedelta
 import logging
 
 logger = logging.getLogger(__name__)
@@ -21,13 +24,19 @@ def refresh_rankings(tenant_id: str):
         logger.info(f"Refreshing rankings for tenant {tenant.name} ({tenant_id})")
         
         businesses = db.query(Business).filter(Business.tenant_id == tenant_id).all()
+        # Places tracked by other tenants too were most likely refreshed by their jobs already
+        details_by_place = place_store.get_many(
+            db, [b.google_place_id for b in businesses],
+            max_age=timedelta(minutes=settings.PLACE_DETAILS_MAX_AGE_MINUTES)
+        )
         for business in businesses:
             try:
-                # fetch fresh details
-                details = google_maps_service.get_place_details(business.google_place_id)
+                details = details_by_place.get(business.google_place_id)
                 if details:
-                    # analyze and update score
-                    analysis = ranking_engine.analyze_business(details)
+                    # the store recorded today's metric sample when it fetched the place
+                    deltas = metrics_service.get_deltas(db, business.google_place_id)
+                    # Only the score is used: no competitor search per business
+                    analysis = ranking_engine.analyze_business(details, series_deltas=deltas, sections={"score"})
                     # Here we would update the business model with new stats
                     # For now just log
                     logger.info(f"Updated {business.name}: Score {analysis['score']}")
@@ -0,0 +1,22 @@
+from celery import shared_task
+from sqlalchemy.orm import Session
+from app.db.session import SessionLocal
+from app.services.quota_service import quota_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+@shared_task
+def flush_usage_logs():
+    """
+    Periodic task to persist queued quota usage events into UsageLog.
+    """
+    db: Session = SessionLocal()
+    try:
+        flushed = quota_service.flush_usage(db)
+        if flushed:
+            logger.info(f"Flushed {flushed} usage events")
+    except Exception as e:
+        logger.error(f"Error in flush_usage_logs: {e}")
+    finally:
+        db.close()
@@ -0,0 +1,33 @@
+"""
+Micro-benchmarks of the CPU hot paths (pytest-benchmark). No database, Redis or
+network is used: the Maps backend is the synthetic city and the competitor search
+inside analyze_business is served from fixtures.
+
+Run from backend/:
+
+    # Record a baseline on the reference machine
+    pytest benchmarks --benchmark-only --benchmark-storage=benchmarks/baselines --benchmark-save=baseline
+
+    # Regression gate: fails when a median is more than 20% slower than the baseline
+    pytest benchmarks --benchmark-only --benchmark-storage=benchmarks/baselines \\
+        --benchmark-compare --benchmark-compare-fail=median:20%
+
+Baselines are only comparable on the machine that recorded them.
+"""
+import os
+
+# Settings are read at import time; none of these services are reached by the benchmarks
+os.environ.setdefault("MAPS_BACKEND", "synthetic")
+os.environ.setdefault("GOOGLE_MAPS_API_KEY", "unused")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("POSTGRES_USER", "benchmark")
+os.environ.setdefault("POSTGRES_PASSWORD", "benchmark")
+os.environ.setdefault("POSTGRES_SERVER", "localhost")
+os.environ.setdefault("POSTGRES_DB", "benchmark")
+
+import pytest
+from app.services.maps_backends import SyntheticCity
+
+@pytest.fixture(scope="session")
+def city() -> SyntheticCity:
+    return SyntheticCity(seed=7, size=5000)
@@ -0,0 +1,37 @@
+import random
+from typing import Dict, Any, List
+from app.services.maps_backends import SyntheticCity, REVIEW_TEXTS
+from app.services.place_summary import PlaceSummary
+
+def business_details(city: SyntheticCity, review_count: int) -> Dict[str, Any]:
+    """
+    Place Details payload of a food business carrying `review_count` reviews.
+    """
+    place = next(p for p in city.catalog if "restaurant" in p["types"] and p["user_ratings_total"] > 50)
+    details = city.place(place_id=place["place_id"])["result"]
+    details["reviews"] = reviews(review_count, seed=review_count)
+    return details
+
+def competitors(city: SyntheticCity, details: Dict[str, Any], count: int) -> List[PlaceSummary]:
+    """
+    `count` places around the business, mixed sectors, as Nearby Search would return them.
+    """
+    location = details["geometry"]["location"]
+    nearby = sorted(
+        city.catalog,
+        key=lambda p: abs(p["geometry"]["location"]["lat"] - location["lat"]) + abs(p["geometry"]["location"]["lng"] - location["lng"])
+    )[1:count + 1]
+    return [PlaceSummary.from_place(p) for p in nearby]
+
+def reviews(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    result = []
+    for n in range(count):
+        stars = rng.choice([1, 2, 3, 4, 4, 5, 5, 5])
+        result.append({
+            "author_name": f"Kullanıcı {n}",
+            "rating": stars,
+            "text": " ".join(rng.choice(REVIEW_TEXTS[s]) for s in (stars, rng.choice([3, 4, 5]))),
+            "time": 1700000000 - n * 3600
+        })
+    return result
@@ -0,0 +1,33 @@
+import pytest
+from app.services.benchmark_sketches import QuantileSketch
+
+@pytest.fixture(scope="module")
+def sketches(city):
+    result = {metric: QuantileSketch(metric) for metric in ("rating", "reviews")}
+    for place in city.catalog:
+        result["rating"].add(place["rating"])
+        result["reviews"].add(place["user_ratings_total"])
+    return result
+
+@pytest.mark.parametrize("metric, value", [("rating", 4.4), ("reviews", 120)])
+def test_percentile_rank(benchmark, sketches, metric, value):
+    # A fresh copy, as read from Redis, has no cumulative counts yet
+    counts = sketches[metric].to_mapping()
+
+    result = benchmark(lambda: QuantileSketch.from_mapping(metric, counts).percentile_rank(value))
+
+    assert 0 <= result <= 100
+
+def test_merge(benchmark, sketches):
+    # One city rolled up from 40 district sketches
+    districts = [QuantileSketch("reviews").merge(sketches["reviews"]) for _ in range(40)]
+
+    def roll_up():
+        merged = QuantileSketch("reviews")
+        for district in districts:
+            merged.merge(district)
+        return merged
+
+    result = benchmark(roll_up)
+
+    assert result.total == 40 * sketches["reviews"].total
@@ -0,0 +1,20 @@
+import random
+import pytest
+from app.services.grid_engine import grid_engine
+
+GRID_SIZES = [3, 5, 9, 15]
+
+@pytest.mark.parametrize("grid_size", GRID_SIZES)
+def test_generate_grid(benchmark, grid_size):
+    points = benchmark(grid_engine.generate_grid, 41.0082, 28.9784, 2.0, grid_size)
+
+    assert len(points) == grid_size * grid_size
+
+@pytest.mark.parametrize("grid_size", GRID_SIZES)
+def test_calculate_visibility_score(benchmark, grid_size):
+    rng = random.Random(grid_size)
+    ranks = [rng.choice([1, 2, 3, 5, 8, 13, 21]) for _ in range(grid_size * grid_size)]
+
+    score = benchmark(grid_engine.calculate_visibility_score, ranks)
+
+    assert 0 <= score <= 100
@@ -0,0 +1,26 @@
+import pytest
+from app.services.place_index import PlaceIndex
+from app.services.place_summary import PlaceSummary
+
+@pytest.fixture(scope="module")
+def index(city):
+    index = PlaceIndex()
+    for place in city.catalog:
+        index.upsert(PlaceSummary.from_place(place))
+    return index
+
+@pytest.mark.parametrize("k", [5, 20])
+def test_nearest(benchmark, city, index, k):
+    lat, lng = city.center
+
+    result = benchmark(index.nearest, lat, lng, k, type="restaurant")
+
+    assert len(result) == k
+
+@pytest.mark.parametrize("radius", [500, 1500, 3000])
+def test_within(benchmark, city, index, radius):
+    lat, lng = city.center
+
+    result = benchmark(index.within, lat, lng, radius, type="restaurant")
+
+    assert all(distance <= radius for distance, _ in result)
@@ -0,0 +1,30 @@
+import pytest
+from app.services.ranking_engine import ranking_engine
+from app.services.google_maps import google_maps_service
+from benchmarks import data
+
+@pytest.mark.parametrize("competitor_count", [20, 40, 60])
+@pytest.mark.parametrize("review_count", [5, 50, 500])
+def test_analyze_business(benchmark, monkeypatch, city, competitor_count, review_count):
+    details = data.business_details(city, review_count)
+    nearby = data.competitors(city, details, competitor_count)
+    monkeypatch.setattr(google_maps_service, "search_nearby", lambda **kwargs: nearby)
+
+    result = benchmark(ranking_engine.analyze_business, details, is_my_business=True)
+
+    assert "score" in result
+
+def test_analyze_business_score_only(benchmark, monkeypatch, city):
+    # What the background jobs ask for: no competitor search
+    details = data.business_details(city, 50)
+    monkeypatch.setattr(google_maps_service, "search_nearby", lambda **kwargs: pytest.fail("no nearby search expected"))
+
+    result = benchmark(ranking_engine.analyze_business, details, sections={"score"})
+
+    assert "score" in result
+
+def test_calculate_score(benchmark, city):
+    details = data.business_details(city, 5)
+    metrics = ranking_engine.calculate_advanced_metrics(details)
+
+    benchmark(ranking_engine.calculate_score, details, metrics)
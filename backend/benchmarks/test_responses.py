@@ -0,0 +1,38 @@
+import gzip
+import json
+import pytest
+from fastapi.encoders import jsonable_encoder
+from app import schemas
+from app.core.responses import encode
+from app.services.ranking_engine import ranking_engine
+from app.services.google_maps import google_maps_service
+from benchmarks import data
+
+@pytest.fixture(scope="module")
+def analysis(city):
+    details = data.business_details(city, 50)
+    nearby = data.competitors(city, details, 40)
+    google_maps_service.search_nearby, original = (lambda **kwargs: nearby), google_maps_service.search_nearby
+    try:
+        return ranking_engine.analyze_business(details, is_my_business=True)
+    finally:
+        google_maps_service.search_nearby = original
+
+def test_serialize_analysis_default(benchmark, analysis):
+    # What FastAPI does with a response_model and JSONResponse
+    def serialize():
+        model = schemas.BusinessAnalysis.model_validate(analysis)
+        return json.dumps(jsonable_encoder(model), ensure_ascii=False, separators=(",", ":")).encode()
+
+    assert benchmark(serialize)
+
+def test_serialize_analysis_orjson(benchmark, analysis):
+    assert benchmark(encode, schemas.BusinessAnalysis, analysis, "analysis")
+
+@pytest.mark.parametrize("level", [1, 6])
+def test_gzip_analysis(benchmark, analysis, level):
+    body = encode(schemas.BusinessAnalysis, analysis, "analysis")
+
+    compressed = benchmark(gzip.compress, body, compresslevel=level, mtime=0)
+
+    benchmark.extra_info["ratio"] = round(len(compressed) / len(body), 3)
@@ -0,0 +1,11 @@
+import pytest
+from app.services.ai_prediction_service import sentiment_service
+from benchmarks import data
+
+@pytest.mark.parametrize("review_count", [5, 50, 500])
+def test_extract_intelligence(benchmark, review_count):
+    reviews = data.reviews(review_count, seed=review_count)
+
+    result = benchmark(sentiment_service.extract_intelligence, reviews)
+
+    assert "sentiment_score" in result
@@ -0,0 +1,71 @@
+"""
+Load test for the MapRank API against an offline Maps backend.
+
+Start the API with a backend that does not spend Google quota, and limits high
+enough not to throttle the test itself:
+
+    MAPS_BACKEND=synthetic GOOGLE_MAPS_API_KEY=unused \\
+    PLACES_QPS=10000 PLACES_BURST=10000 \\
+    PLACES_QUOTA='{"FREE": {"minute": 1000000, "day": 1000000}}' \\
+    uvicorn app.main:app --workers 4
+
+then run, from backend/:
+
+    locust -f loadtest/locustfile.py --host http://localhost:8000 \\
+        --users 50 --spawn-rate 10 --run-time 5m --headless --csv loadtest/results
+
+Locust prints p50/p95 latency and requests/s per endpoint; --csv keeps them.
+MAPS_BACKEND=replay with MAPS_FIXTURES_DIR replays responses recorded with
+MAPS_BACKEND=record instead of the synthetic city.
+"""
+import random
+import uuid
+from locust import HttpUser, task, between
+
+API = "/api/v1"
+
+# Search terms that match the synthetic city's names and types
+QUERIES = ["kafe", "restoran", "otel", "klinik", "eczane", "kuaför", "spa", "oto servis"]
+
+class MapRankUser(HttpUser):
+    wait_time = between(1, 3)
+
+    def on_start(self):
+        email = f"loadtest-{uuid.uuid4().hex[:12]}@example.com"
+        password = "loadtest-password"
+        self.client.post(f"{API}/auth/register", json={"email": email, "password": password}, name="auth/register")
+        response = self.client.post(
+            f"{API}/auth/login/access-token",
+            data={"username": email, "password": password},
+            name="auth/login"
+        )
+        self.client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+        self.place_ids = []
+        self.business_id = None
+
+    @task(5)
+    def search(self):
+        response = self.client.get(f"{API}/businesses/search", params={"query": random.choice(QUERIES)}, name="businesses/search")
+        if response.ok:
+            self.place_ids = [r["google_place_id"] for r in response.json()] or self.place_ids
+
+    @task(3)
+    def analyze(self):
+        if not self.place_ids:
+            return self.search()
+        self.client.get(f"{API}/businesses/analyze", params={"place_id": random.choice(self.place_ids)}, name="businesses/analyze")
+
+    @task(1)
+    def grid_scan(self):
+        if not self.business_id:
+            if not self.place_ids:
+                return self.search()
+            response = self.client.post(f"{API}/businesses", json={"google_place_id": random.choice(self.place_ids), "name": "Load Test"}, name="businesses/create")
+            if not response.ok:
+                return
+            self.business_id = response.json()["id"]
+        self.client.post(
+            f"{API}/grid/{self.business_id}/analyze",
+            params={"keyword": random.choice(QUERIES), "radius_km": 1.0, "grid_size": 5},
+            name="grid/analyze"
+        )
@@ -0,0 +1,66 @@
+"""
+Times the Celery refresh jobs in-process against the configured Maps backend.
+
+    MAPS_BACKEND=synthetic GOOGLE_MAPS_API_KEY=unused PLACES_QPS=10000 PLACES_BURST=10000 \\
+    python -m loadtest.refresh_bench --rounds 3
+
+Run the locust test first (or any workload) so that tenants, businesses and
+competitors exist. Prints p50/p95 per refresh_rankings call and the throughput
+of the competitor refresher.
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime
+from app.db.session import SessionLocal
+from app.models import Tenant, Competitor, Place
+from app.services.ai_expansion_service import competitor_service
+from app.workers.tasks import refresh_rankings
+
+def percentile(samples, q):
+    if len(samples) < 2:
+        return samples[0] if samples else 0.0
+    return statistics.quantiles(samples, n=100)[q - 1]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--tenants", type=int, default=200, help="Maximum tenants refreshed per round")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        tenant_ids = [str(t.id) for t in db.query(Tenant.id).limit(args.tenants).all()]
+        competitor_places = db.query(Competitor.google_place_id).distinct().count()
+    finally:
+        db.close()
+
+    timings = []
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        for tenant_id in tenant_ids:
+            t0 = time.perf_counter()
+            refresh_rankings(tenant_id) # Runs the task body synchronously
+            timings.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+
+    print(f"refresh_rankings: {len(timings)} runs over {len(tenant_ids)} tenants")
+    print(f"  p50 {percentile(timings, 50) * 1000:.1f} ms  p95 {percentile(timings, 95) * 1000:.1f} ms  "
+          f"throughput {len(timings) / elapsed:.1f} tenants/s")
+
+    db = SessionLocal()
+    try:
+        # Force every tracked competitor (and its stored place) to be due
+        db.query(Competitor).update({Competitor.updated_at: datetime(2000, 1, 1)})
+        db.query(Place).update({Place.fetched_at: None})
+        db.commit()
+        t0 = time.perf_counter()
+        refreshed = competitor_service.refresh_tracked_competitors(db)
+        elapsed = time.perf_counter() - t0
+    finally:
+        db.close()
+    print(f"refresh_tracked_competitors: {refreshed}/{competitor_places} places in {elapsed:.2f} s "
+          f"({refreshed / elapsed if elapsed else 0:.1f} places/s)")
+
+if __name__ == "__main__":
+    main()
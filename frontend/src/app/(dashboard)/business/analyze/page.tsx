@@ -5,6 +5,7 @@ import { useParams, useRouter, useSearchParams } from "next/navigation"
 // PDF Generation
 const html2pdf = typeof window !== 'undefined' ? require('html2pdf.js') : null;
 import api from "@/lib/api"
+import { resolveGrowth } from "@/lib/catalog"
 import { Button } from "@/components/ui/button"
 import { cn } from "@/lib/utils"
 import { CardContent, CardHeader, CardTitle, CardDescription } from "@/components/ui/card"
@@ -162,7 +163,7 @@ function AnalyzeContent() {
             setLoading(true) // Ensure it starts loading
             try {
                 const response = await api.get<AnalysisResult>(`/businesses/analyze?place_id=${encodeURIComponent(placeId)}`)
-                const analysisData = response.data
+                const analysisData = await resolveGrowth(response.data)
                 setData(analysisData)
 
                 if (analysisData.is_my_business) {
@@ -236,7 +237,7 @@ function AnalyzeContent() {
             toast({ title: "Keşif Tamamlandı", description: "Rakipler otomatik olarak bulundu ve takibe alındı." })
             // Refresh analysis to show new competitors
             const response = await api.get<AnalysisResult>(`/businesses/analyze?place_id=${encodeURIComponent(placeId!)}`)
-            setData(response.data)
+            setData(await resolveGrowth(response.data))
         } catch (err) {
             toast({ title: "Hata", description: "Rakip keşfi şu an başarısız.", variant: "destructive" })
         } finally {
@@ -3,6 +3,7 @@
 import { useEffect, useState, Suspense } from "react"
 import { useRouter, useSearchParams } from "next/navigation"
 import api from "@/lib/api"
+import { resolveGrowth } from "@/lib/catalog"
 // PDF Generation
 const html2pdf = typeof window !== 'undefined' ? require('html2pdf.js') : null;
 import { Button } from "@/components/ui/button"
@@ -60,6 +61,7 @@ function ConsultantContent() {
 
                 if (biz) {
                     const analysisRes = await api.get(`/businesses/analyze?place_id=${biz.google_place_id}`)
+                    analysisRes.data = await resolveGrowth(analysisRes.data)
                     setData({
                         name: biz.name,
                         score: analysisRes.data.score,
@@ -38,6 +38,7 @@ export default function GridRankPage() {
     const [snapshot, setSnapshot] = useState<any>(null)
     const [history, setHistory] = useState<any[]>([])
     const [businessId, setBusinessId] = useState<string | null>(null)
+    const [heatmapUrl, setHeatmapUrl] = useState<string | null>(null)
 
     useEffect(() => {
         // Find business ID from local storage or context (mocked for now)
@@ -60,6 +61,25 @@ export default function GridRankPage() {
         }
     }
 
+    useEffect(() => {
+        // Heatmap is rendered and cached server-side: one image instead of one element per grid point
+        if (!snapshot || !businessId) return
+        let objectUrl: string | null = null
+        api.get(`/grid/${businessId}/snapshots/${snapshot.id}/heatmap`, {
+            params: { format: 'webp' },
+            responseType: 'blob'
+        }).then((res) => {
+            objectUrl = URL.createObjectURL(res.data)
+            setHeatmapUrl(objectUrl)
+        }).catch((error) => {
+            console.error("Error fetching heatmap:", error)
+            setHeatmapUrl(null)
+        })
+        return () => {
+            if (objectUrl) URL.revokeObjectURL(objectUrl)
+        }
+    }, [snapshot, businessId])
+
     const fetchHistory = async (id: string) => {
         try {
             const res = await api.get(`/grid/${id}/history`)
@@ -239,7 +259,16 @@ export default function GridRankPage() {
 
                         <div className="flex-1 min-h-[400px] bg-slate-900/50 flex items-center justify-center p-8 relative overflow-hidden">
                             {/* Placeholder for real map initialization */}
-                            {snapshot ? (
+                            {snapshot && heatmapUrl ? (
+                                <div className="relative w-full h-full flex items-center justify-center">
+                                    <img
+                                        src={heatmapUrl}
+                                        alt={`Grid heatmap: ${snapshot.keyword}`}
+                                        className="rounded-lg shadow-lg"
+                                        style={{ width: '80%', maxWidth: '500px' }}
+                                    />
+                                </div>
+                            ) : snapshot ? (
                                 <div className="relative w-full h-full flex items-center justify-center">
                                     {/* Mock Grid Visualization */}
                                     <div
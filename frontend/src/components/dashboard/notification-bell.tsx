@@ -11,6 +11,7 @@ import {
     DropdownMenuTrigger,
 } from "@/components/ui/dropdown-menu"
 import api from "@/lib/api"
+import { subscribeAlerts } from "@/lib/alert-stream"
 import { cn } from "@/lib/utils"
 
 interface Alert {
@@ -24,7 +25,7 @@ interface Alert {
 
 export function NotificationBell() {
     const [alerts, setAlerts] = useState<Alert[]>([])
-    const unreadCount = alerts.filter(a => !a.is_read).length
+    const [unreadCount, setUnreadCount] = useState(0)
 
     useEffect(() => {
         const fetchAlerts = async () => {
@@ -37,14 +38,22 @@ export function NotificationBell() {
         }
         fetchAlerts()
 
-        const interval = setInterval(fetchAlerts, 60000)
-        return () => clearInterval(interval)
+        // New alerts and unread counts are pushed by the server instead of polled
+        const controller = new AbortController()
+        subscribeAlerts((event) => {
+            if (event.type === "alert") {
+                setAlerts(current => [event.alert, ...current.filter(a => a.id !== event.alert.id)])
+            }
+            setUnreadCount(event.unread_count)
+        }, controller.signal)
+        return () => controller.abort()
     }, [])
 
     const markAsRead = async (id: string) => {
         try {
             await api.post(`/alerts/${id}/read`)
             setAlerts(alerts.map(a => a.id === id ? { ...a, is_read: true } : a))
+            setUnreadCount(count => Math.max(count - (alerts.some(a => a.id === id && !a.is_read) ? 1 : 0), 0))
         } catch (err) {
             console.error("Mark read failed", err)
         }
@@ -0,0 +1,52 @@
+import api from "./api";
+
+export type AlertStreamEvent =
+    | { type: "unread"; unread_count: number }
+    | { type: "alert"; alert: any; unread_count: number };
+
+// Subscribes to /alerts/stream (Server-Sent Events). fetch() is used instead of EventSource
+// so that the bearer token goes in the Authorization header; the stream reconnects until aborted.
+export function subscribeAlerts(onEvent: (event: AlertStreamEvent) => void, signal: AbortSignal): void {
+    let retryMs = 1000;
+
+    const connect = async () => {
+        while (!signal.aborted) {
+            try {
+                const token = localStorage.getItem("token");
+                const res = await fetch(`${api.defaults.baseURL}/alerts/stream`, {
+                    headers: token ? { Authorization: `Bearer ${token}` } : {},
+                    signal,
+                });
+                if (!res.ok || !res.body) throw new Error(`Alert stream failed: ${res.status}`);
+                retryMs = 1000;
+
+                const reader = res.body.getReader();
+                const decoder = new TextDecoder();
+                let buffer = "";
+                while (true) {
+                    const { value, done } = await reader.read();
+                    if (done) break;
+                    buffer += decoder.decode(value, { stream: true });
+                    let end;
+                    while ((end = buffer.indexOf("\n\n")) >= 0) {
+                        const frame = buffer.slice(0, end);
+                        buffer = buffer.slice(end + 2);
+                        let name = "";
+                        let data = "";
+                        frame.split("\n").forEach((line) => {
+                            if (line.startsWith("event: ")) name = line.slice(7);
+                            else if (line.startsWith("data: ")) data += line.slice(6);
+                        });
+                        if (name && data) onEvent({ type: name, ...JSON.parse(data) });
+                    }
+                }
+            } catch (err) {
+                if (signal.aborted) return;
+                console.warn("Alert stream disconnected", err);
+            }
+            await new Promise((resolve) => setTimeout(resolve, retryMs));
+            retryMs = Math.min(retryMs * 2, 30000);
+        }
+    };
+    connect();
+}
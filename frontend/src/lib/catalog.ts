@@ -0,0 +1,42 @@
+import api from "./api";
+
+// Analyses reference growth hacks and industry ideas by id ({ id, params });
+// the texts come from the versioned content catalog, fetched once per version.
+export type CatalogRef = { id: string; params?: Record<string, string | number> };
+type Catalog = { version: string; items: Record<string, string> };
+
+const catalogs: Record<string, Promise<Catalog>> = {};
+
+export function loadCatalog(version?: string): Promise<Catalog> {
+    const key = version || "latest";
+    if (!catalogs[key]) {
+        catalogs[key] = api.get<Catalog>(version ? `/catalog/${version}` : "/catalog")
+            .then((res) => res.data)
+            .catch((err) => {
+                delete catalogs[key];
+                throw err;
+            });
+    }
+    return catalogs[key];
+}
+
+export function renderRef(catalog: Catalog, ref: CatalogRef | string): string {
+    if (typeof ref === "string") return ref;
+    let text = catalog.items[ref.id] || "";
+    Object.entries(ref.params || {}).forEach(([key, value]) => {
+        text = text.split(`{${key}}`).join(String(value));
+    });
+    return text;
+}
+
+// Replaces the growth_hacks / growth_ideas references of an analysis with their texts
+export async function resolveGrowth<T>(analysis: T): Promise<T> {
+    const data = analysis as any;
+    if (!data?.growth_hacks && !data?.growth_ideas) return analysis;
+    const catalog = await loadCatalog(data.catalog_version);
+    return {
+        ...data,
+        growth_hacks: data.growth_hacks?.map((ref: CatalogRef) => renderRef(catalog, ref)),
+        growth_ideas: data.growth_ideas?.map((ref: CatalogRef) => renderRef(catalog, ref)),
+    };
+}